@@ -1,8 +1,12 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_init, post_save
 from django.contrib.auth.models import User
 from django.dispatch import receiver
+from django.utils import timezone
 from profiles.models import Profile
 
+# User fields shown as the candidate's name (e.g. on the recruiter map)
+NAME_FIELDS = ('first_name', 'last_name', 'username')
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
@@ -12,5 +16,32 @@ def create_user_profile(sender, instance, created, **kwargs):
             Profile.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    instance.profile.save()
+def save_user_profile(sender, instance, created, **kwargs):
+    """Persist edits made through ``user.profile`` when the user is saved.
+
+    Only a profile that was already loaded on this user object and has
+    modified fields is written, so routine User saves (e.g. the last_login
+    update on every login) no longer touch the profile at all.
+    """
+    if created or not User.profile.related.is_cached(instance):
+        return
+    profile = instance.profile
+    if profile._state.adding or profile.changed_fields:
+        profile.save()
+
+
+@receiver(post_init, sender=User)
+def remember_name(sender, instance, **kwargs):
+    # __dict__, not getattr: reading a deferred field here would query
+    instance._loaded_name = tuple(instance.__dict__.get(f) for f in NAME_FIELDS)
+
+
+@receiver(post_save, sender=User)
+def touch_profile_on_rename(sender, instance, created, update_fields=None, **kwargs):
+    """Bump ``Profile.updated_at`` so caches keyed on it (map ETags) see a new name."""
+    if created or (update_fields is not None and not set(update_fields) & set(NAME_FIELDS)):
+        return
+    name = tuple(instance.__dict__.get(f) for f in NAME_FIELDS)
+    if name != instance._loaded_name:
+        Profile.objects.filter(user=instance).update(updated_at=timezone.now())
+    instance._loaded_name = name
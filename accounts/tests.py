@@ -1,3 +1,52 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from geocoding.models import GeocodeTask
+from profiles.models import Profile
+
+
+class ProfileSignalTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='pass')
+        Profile.objects.filter(user=self.user).update(location='Atlanta, GA')
+
+    def test_login_does_not_touch_profile(self):
+        with mock.patch.object(Profile, 'save') as profile_save:
+            response = self.client.post('/accounts/login/', {'username': 'alice', 'password': 'pass'})
+        self.assertEqual(response.status_code, 302)
+        profile_save.assert_not_called()
+
+    def test_unchanged_profile_not_written(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.profile.headline  # load the profile without modifying it
+        user.email = 'alice@example.com'
+        with self.assertNumQueries(1):
+            user.save()
+
+    def test_rename_touches_profile(self):
+        before = Profile.objects.get(user=self.user).updated_at
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Alice'
+        with self.assertNumQueries(2):
+            user.save()
+        self.assertGreater(Profile.objects.get(user=user).updated_at, before)
+
+    def test_profile_edits_saved_with_user(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.profile.headline = 'Engineer'
+        user.save()
+        profile = Profile.objects.get(user=user)
+        self.assertEqual(profile.headline, 'Engineer')
+        self.assertFalse(GeocodeTask.objects.exists())
+
+    def test_geocode_only_when_location_changes(self):
+        profile = Profile.objects.get(user=self.user)
+        profile.bio = 'Hello'
+        profile.save()
+        self.assertFalse(GeocodeTask.objects.exists())
+
+        profile.location = 'Nowhere Special'
+        profile.save()
+        self.assertEqual(GeocodeTask.objects.get().location, 'Nowhere Special')
@@ -28,7 +28,7 @@ class ApplicationAdmin(admin.ModelAdmin):
     def save_model(self, request, obj, form, change):
         # Track status changes
         if change and 'status' in form.changed_data:
-            old_status = Application.objects.get(pk=obj.pk).status
+            old_status = obj.previous_value('status')
             super().save_model(request, obj, form, change)
             
             # Create status history entry
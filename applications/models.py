@@ -2,8 +2,9 @@ from django.db import models
 from django.contrib.auth.models import User
 from jobs.models import Job
 from django.utils import timezone
+from jobby.tracking import DirtyFieldsMixin
 
-class Application(models.Model):
+class Application(DirtyFieldsMixin, models.Model):
     STATUS_CHOICES = [
         ('applied', 'Applied'),
         ('review', 'Under Review'),
@@ -1,3 +1,41 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from jobs.models import Job
+from .models import Application, ApplicationStatusHistory
+
+
+class ApplicationStatusTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username='rec', password='pass')
+        self.recruiter.profile.user_type = 'recruiter'
+        self.recruiter.profile.save()
+        self.job = Job.objects.create(title='Eng', company_name='Acme', location='Remote',
+                                      posted_by=self.recruiter)
+        self.applicant = User.objects.create_user(username='cand', password='pw')
+        self.application = Application.objects.create(applicant=self.applicant, job=self.job)
+
+    def test_status_change_is_recorded_in_history(self):
+        self.client.login(username='rec', password='pass')
+        self.client.post(
+            f'/applications/recruiter/update-status/{self.application.id}/',
+            {'status': 'interview', 'recruiter_notes': ''},
+        )
+        history = ApplicationStatusHistory.objects.get(application=self.application)
+        self.assertEqual((history.old_status, history.new_status), ('applied', 'interview'))
+
+    def test_save_writes_only_changed_columns(self):
+        application = Application.objects.get(pk=self.application.pk)
+        self.assertEqual(application.changed_fields, set())
+        application.viewed_by_recruiter = True
+        self.assertEqual(application.changed_fields, {'viewed_by_recruiter'})
+        with self.assertNumQueries(1) as ctx:
+            application.save()
+        sql = ctx.captured_queries[0]['sql']
+        self.assertIn('"viewed_by_recruiter"', sql)
+        self.assertIn('"updated_at"', sql)
+        self.assertNotIn('"cover_note"', sql)
+
+        # Nothing left to write
+        with self.assertNumQueries(0):
+            application.save()
@@ -278,7 +278,8 @@ def update_application_status(request, application_id):
     if request.method == 'POST':
         form = ApplicationStatusUpdateForm(request.POST, instance=application)
         if form.is_valid():
-            old_status = application.status
+            # The form has already copied the new status onto the instance
+            old_status = application.previous_value('status')
             application = form.save()
             
             # Create status history entry if status changed
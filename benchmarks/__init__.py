@@ -0,0 +1,10 @@
+"""
+Latency and query-count benchmarks for the hot endpoints.
+
+The benchmarks run under the Django test runner against a throwaway
+database filled by ``generate_fake_data``, so they need no services:
+
+    python manage.py test benchmarks --pattern "bench_*.py"
+
+They are kept out of the regular test run by their ``bench_`` prefix.
+"""
@@ -0,0 +1,116 @@
+"""
+Benchmarks for the hot job board endpoints and the recommendation engine.
+
+The dataset size is ``BENCH_SCALE`` (default 1) times a few hundred jobs
+and candidates; baselines are recorded at the default scale.
+"""
+import math
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from jobs.models import Job
+from recommendations.models import CandidateRecommendation
+from recommendations.utils import generate_recommendations_for_job
+
+from .harness import BenchmarkCase, env_int
+
+
+class HotEndpointBenchmarks(BenchmarkCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        scale = env_int('BENCH_SCALE', 1)
+        call_command(
+            'generate_fake_data', jobs=400 * scale, profiles=400 * scale, recruiters=8 * scale,
+            applications=2000 * scale, messages=3000 * scale, prefix='bench', stdout=StringIO(),
+        )
+        # The busiest job, its recruiter and the candidate with the most conversations
+        cls.job = (Job.objects.filter(is_active=True)
+                   .annotate(n=Count('applications')).order_by('-n', 'pk').first())
+        cls.recruiter = cls.job.posted_by
+        cls.candidate = (User.objects.filter(profile__user_type='regular', profile__skills_text__gt='')
+                         .annotate(n=Count('conversations')).order_by('-n', 'pk').first())
+
+    def client_for(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def get(self, client, url, data=None):
+        def request():
+            response = client.get(url, data)
+            self.assertEqual(response.status_code, 200)
+            response.getvalue()  # drain streamed responses inside the measurement
+        return request
+
+    def test_jobs_index(self):
+        client = Client()
+        url = reverse('jobs.index')
+        self.bench('jobs.index', self.get(client, url))
+        self.bench('jobs.index[search]', self.get(client, url, {'search': 'engineer'}))
+        self.bench('jobs.index[skills]', self.get(client, url, {'skills': 'python, sql'}))
+        self.bench('jobs.index[filters]', self.get(client, url, {
+            'location': 'new york', 'employment_type': 'full-time', 'salary_min': 80000, 'page': 2,
+        }))
+
+    def test_job_recommendations_for_seeker(self):
+        client = self.client_for(self.candidate)
+        self.bench('jobs.recommendations', self.get(client, reverse('jobs.recommendations')))
+
+    def test_jobs_geo_json(self):
+        url = reverse('jobs.geo_json')
+        self.bench('jobs.geo_json', self.get(Client(), url), iterations=10)
+        self.bench('jobs.geo_json[radius]', self.get(Client(), url, {
+            'lat': 40.7128, 'lng': -74.0060, 'radius_km': 40,
+        }))
+        etag = Client().get(url)['ETag']
+        self.bench('jobs.geo_json[304]', lambda: self.assertEqual(
+            Client().get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304))
+
+    def test_jobs_geo_clusters(self):
+        url = reverse('jobs.geo_clusters')
+        self.bench('jobs.geo_clusters[world]', self.get(Client(), url, {'z': 2}))
+        self.bench('jobs.geo_clusters[city]', self.get(Client(), url, {
+            'z': 15, 'bbox': '-74.05,40.68,-73.95,40.76',
+        }))
+
+    def test_candidate_map_data(self):
+        client = self.client_for(self.recruiter)
+        url = reverse('recruiter:candidate_map_data')
+        self.bench('recruiter.candidate_map_data', self.get(client, url))
+        self.bench('recruiter.candidate_map_data[skill]', self.get(client, url, {'skill': 'python'}))
+
+    def test_candidate_search(self):
+        client = self.client_for(self.recruiter)
+        url = reverse('recruiter:candidate_search')
+        self.bench('recruiter.candidate_search', self.get(client, url))
+        self.bench('recruiter.candidate_search[skills]', self.get(client, url, {
+            'skills': 'python, react', 'location': 'san',
+        }))
+
+    def test_kanban_board(self):
+        client = self.client_for(self.recruiter)
+        url = reverse('recruiter:kanban_job', args=[self.job.pk])
+        self.bench('recruiter.kanban_board', self.get(client, url))
+
+    def test_internal_messages(self):
+        self.bench('messaging.internal_messages',
+                   self.get(self.client_for(self.recruiter), reverse('messaging:internal_messages')))
+        self.bench('messaging.internal_messages[seeker]',
+                   self.get(self.client_for(self.candidate), reverse('messaging:internal_messages')))
+
+    def test_generate_recommendations_for_job(self):
+        measurement = self.bench('recommendations.generate_for_job',
+                                 lambda: generate_recommendations_for_job(self.job), iterations=10)
+        # Features, stale delete and top-N select, plus one INSERT per batch of
+        # the upsert (the backend caps the parameters of one statement)
+        rows = CandidateRecommendation.objects.filter(job=self.job).count()
+        fields = [f for f in CandidateRecommendation._meta.concrete_fields if not f.primary_key]
+        batches = math.ceil(rows / connection.ops.bulk_batch_size(fields, [None] * rows))
+        self.assertLessEqual(measurement.queries, 3 + batches)
@@ -0,0 +1,154 @@
+"""
+Measurement and baseline comparison for the benchmark suite.
+
+Every benchmark runs a callable a few times to warm up, then ``iterations``
+times while timing it and counting its SQL queries. The result is compared
+with the entry of the same name in ``baselines.json``:
+
+- more queries than the baseline is always a regression;
+- a p95 latency above ``baseline * (1 + BENCH_TOLERANCE) + BENCH_SLACK_MS``
+  is a regression (latency is machine dependent, hence the generous margin).
+
+Environment variables:
+
+    BENCH_ITERATIONS         timed runs per benchmark (default 20)
+    BENCH_TOLERANCE          allowed relative p95 slowdown (default 0.5)
+    BENCH_SLACK_MS           allowed absolute p95 slowdown (default 5)
+    BENCH_UPDATE_BASELINES   when set, record the results as the new baselines
+"""
+import json
+import math
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+BASELINES_PATH = Path(__file__).resolve().parent / 'baselines.json'
+
+WARMUP = 2
+
+
+def env_int(name, default):
+    return int(os.environ.get(name) or default)
+
+
+def env_float(name, default):
+    return float(os.environ.get(name) or default)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list of numbers."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class Measurement:
+    name: str
+    queries: int
+    p50_ms: float
+    p95_ms: float
+
+    def baseline(self):
+        return {'queries': self.queries, 'p50_ms': round(self.p50_ms, 2), 'p95_ms': round(self.p95_ms, 2)}
+
+
+def measure(name, func, iterations=None):
+    """Time ``func`` and count its queries; the query count is the worst run's."""
+    iterations = iterations or env_int('BENCH_ITERATIONS', 20)
+    for _ in range(WARMUP):
+        func()
+    timings = []
+    queries = 0
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = max(queries, len(ctx.captured_queries))
+    return Measurement(name, queries, percentile(timings, 50), percentile(timings, 95))
+
+
+def load_baselines():
+    if not BASELINES_PATH.exists():
+        return {}
+    with open(BASELINES_PATH, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def save_baselines(measurements):
+    """Merge ``measurements`` into the baselines file."""
+    baselines = load_baselines()
+    for m in measurements:
+        baselines[m.name] = m.baseline()
+    with open(BASELINES_PATH, 'w', encoding='utf-8') as fh:
+        json.dump(dict(sorted(baselines.items())), fh, indent=2)
+        fh.write('\n')
+
+
+def regressions(measurement, baseline, tolerance, slack_ms):
+    """Human readable reasons ``measurement`` regressed against ``baseline``."""
+    problems = []
+    if measurement.queries > baseline['queries']:
+        problems.append(f"{measurement.queries} queries, baseline {baseline['queries']}")
+    allowed = baseline['p95_ms'] * (1 + tolerance) + slack_ms
+    if measurement.p95_ms > allowed:
+        problems.append(
+            f"p95 {measurement.p95_ms:.1f}ms, baseline {baseline['p95_ms']:.1f}ms "
+            f"(allowed {allowed:.1f}ms)"
+        )
+    return problems
+
+
+@override_settings(QUERY_BUDGET_ACTION='raise')
+class BenchmarkCase(TestCase):
+    """A TestCase whose ``bench()`` calls are checked against the stored baselines.
+
+    Views that declare a query budget raise when they go over it.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.measurements = []
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.measurements:
+            cls.report(cls.measurements)
+            if os.environ.get('BENCH_UPDATE_BASELINES'):
+                save_baselines(cls.measurements)
+        super().tearDownClass()
+
+    @staticmethod
+    def report(measurements):
+        baselines = load_baselines()
+        out = sys.stderr
+        out.write(f"\n{'benchmark':<40} {'queries':>8} {'p50 ms':>9} {'p95 ms':>9} {'base p95':>9}\n")
+        for m in measurements:
+            base = baselines.get(m.name)
+            base_p95 = f"{base['p95_ms']:.1f}" if base else '-'
+            out.write(f"{m.name:<40} {m.queries:>8} {m.p50_ms:>9.1f} {m.p95_ms:>9.1f} {base_p95:>9}\n")
+
+    def bench(self, name, func, iterations=None):
+        """Measure ``func`` under ``name`` and fail on a regression."""
+        measurement = measure(name, func, iterations)
+        type(self).measurements.append(measurement)
+        if os.environ.get('BENCH_UPDATE_BASELINES'):
+            return measurement
+        baseline = load_baselines().get(name)
+        if baseline is None:
+            self.fail(f"No baseline for {name!r}; run with BENCH_UPDATE_BASELINES=1 to record one.")
+        problems = regressions(
+            measurement, baseline,
+            env_float('BENCH_TOLERANCE', 0.5), env_float('BENCH_SLACK_MS', 5),
+        )
+        if problems:
+            self.fail(f"{name} regressed: " + '; '.join(problems))
+        return measurement
@@ -0,0 +1,23 @@
+from django.contrib import admin
+from .models import GeocodeCache, GeocoderThrottle, GeocodeTask
+
+
+@admin.register(GeocodeTask)
+class GeocodeTaskAdmin(admin.ModelAdmin):
+    list_display = ['location', 'content_type', 'object_id', 'status', 'attempts', 'next_attempt_at', 'updated_at']
+    list_filter = ['status', 'content_type']
+    search_fields = ['location', 'last_error']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(GeocodeCache)
+class GeocodeCacheAdmin(admin.ModelAdmin):
+    list_display = ['key', 'found', 'latitude', 'longitude', 'created_at', 'expires_at']
+    list_filter = ['found']
+    search_fields = ['key']
+    readonly_fields = ['created_at']
+
+
+@admin.register(GeocoderThrottle)
+class GeocoderThrottleAdmin(admin.ModelAdmin):
+    list_display = ['name', 'next_slot']
@@ -0,0 +1,159 @@
+"""
+Pluggable geocoder backends.
+
+The active backend is chosen with ``settings.GEOCODER_BACKEND`` (a dotted
+path). A backend's ``geocode(location)`` returns ``(lat, lon)``, ``None``
+when the location simply cannot be resolved, and raises ``GeocoderError``
+for transient failures (network errors, rate limiting) that are worth
+retrying later.
+"""
+import json
+import logging
+import ssl
+import time
+import urllib.parse
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class GeocoderError(Exception):
+    """A temporary geocoding failure; the lookup should be retried."""
+
+
+class BaseGeocoder:
+    def geocode(self, location):
+        raise NotImplementedError
+
+
+class NominatimGeocoder(BaseGeocoder):
+    """Geocoder backed by the public OpenStreetMap Nominatim API."""
+
+    base_url = 'https://nominatim.openstreetmap.org/search?format=json&limit=1&q='
+    user_agent = 'Jobby/1.0 (admin@jobby.example)'
+
+    # The usage policy allows about one request per second from all of
+    # our processes together; they share the schedule in GeocoderThrottle
+    throttle_name = 'nominatim'
+
+    def __init__(self, timeout=None, min_interval=None):
+        self.timeout = timeout or getattr(settings, 'GEOCODER_TIMEOUT', 8)
+        if min_interval is None:
+            min_interval = getattr(settings, 'GEOCODER_MIN_INTERVAL', 1.0)
+        self.min_interval = min_interval
+
+    def _reserve_slot(self):
+        """Claim the next free request slot; returns the seconds until it starts.
+
+        The slot is taken with a conditional UPDATE, so concurrent callers
+        each get their own without holding a lock while they wait for it.
+        """
+        from .models import GeocoderThrottle
+
+        interval = timedelta(seconds=self.min_interval)
+        throttle, _ = GeocoderThrottle.objects.get_or_create(name=self.throttle_name)
+        while True:
+            now = timezone.now()
+            slot = max(now, throttle.next_slot)
+            taken = GeocoderThrottle.objects.filter(
+                pk=throttle.pk, next_slot=throttle.next_slot,
+            ).update(next_slot=slot + interval)
+            if taken:
+                return (slot - now).total_seconds()
+            throttle.refresh_from_db(fields=['next_slot'])
+
+    def _wait_turn(self):
+        if self.min_interval <= 0:
+            return
+        wait = self._reserve_slot()
+        if wait > 0:
+            time.sleep(wait)
+
+    def geocode(self, location):
+        if not location:
+            return None
+        self._wait_turn()
+        url = self.base_url + urllib.parse.quote(location)
+        req = urllib.request.Request(url, headers={'User-Agent': self.user_agent})
+
+        # Create SSL context that doesn't verify certificates (for development)
+        # In production, you should install proper certificates
+        ctx = ssl.create_default_context()
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout, context=ctx) as resp:
+                arr = json.loads(resp.read().decode('utf-8'))
+        except Exception as e:
+            raise GeocoderError(str(e)) from e
+        if arr:
+            return float(arr[0]['lat']), float(arr[0]['lon'])
+        return None
+
+
+class StubGeocoder(BaseGeocoder):
+    """Offline geocoder with a handful of fixed cities, for tests and local development."""
+
+    KNOWN_LOCATIONS = {
+        'atlanta': (33.7490, -84.3880),
+        'atlanta, ga': (33.7490, -84.3880),
+        'dallas, tx': (32.7767, -96.7970),
+        'new york': (40.7128, -74.0060),
+        'new york, ny': (40.7128, -74.0060),
+        'san francisco, ca': (37.7749, -122.4194),
+    }
+
+    def geocode(self, location):
+        return self.KNOWN_LOCATIONS.get((location or '').strip().lower())
+
+
+class GazetteerGeocoder(BaseGeocoder):
+    """Offline geocoder answering from a memory-mapped GeoNames index.
+
+    Build the index with ``manage.py build_gazetteer`` (see
+    geocoding.gazetteer). Places it does not know are passed on to
+    ``settings.GAZETTEER_FALLBACK``, a backend path, or resolve to None
+    when that is empty.
+    """
+
+    def __init__(self, path=None, fallback=None):
+        from .gazetteer import GazetteerIndex
+
+        path = path or settings.GAZETTEER_PATH
+        try:
+            self.index = GazetteerIndex(path)
+        except FileNotFoundError:
+            logger.warning("No gazetteer index at %s; run manage.py build_gazetteer", path)
+            self.index = None
+        if fallback is None:
+            fallback_path = getattr(settings, 'GAZETTEER_FALLBACK', 'geocoding.backends.NominatimGeocoder')
+            fallback = import_string(fallback_path)() if fallback_path else None
+        self.fallback = fallback
+
+    def geocode(self, location):
+        if not location:
+            return None
+        coords = self.index.lookup(location) if self.index is not None else None
+        if coords is None and self.fallback is not None:
+            return self.fallback.geocode(location)
+        return coords
+
+
+_geocoder = None
+_geocoder_path = None
+
+
+def get_geocoder():
+    """Return an instance of the configured backend (created once per process)."""
+    global _geocoder, _geocoder_path
+    path = getattr(settings, 'GEOCODER_BACKEND', 'geocoding.backends.NominatimGeocoder')
+    if _geocoder is None or _geocoder_path != path:
+        _geocoder = import_string(path)()
+        _geocoder_path = path
+    return _geocoder
@@ -0,0 +1,163 @@
+"""
+Offline place-name index for ``GazetteerGeocoder``.
+
+``build_index`` reads a GeoNames cities dump (``cities15000.txt`` and
+friends: tab separated, one place per line) and files every place under a
+few normalized names: "atlanta", "atlanta, ga", "atlanta, us",
+"atlanta, ga, us" and, given the admin1 names, "atlanta, georgia, us".
+When two places share a name the most populous one wins.
+
+The index file keeps the names sorted, so ``GazetteerIndex`` memory-maps
+it and answers a lookup with a binary search; nothing is loaded up front
+and every process shares the same pages. Layout, little endian:
+
+    header   b'JGAZ', version (uint16), count (uint32)
+    offsets  count + 1 uint32; name i is blob[offsets[i]:offsets[i + 1]]
+    coords   count x (float64 latitude, float64 longitude)
+    blob     the UTF-8 names, concatenated
+"""
+import io
+import mmap
+import os
+import struct
+import unicodedata
+import zipfile
+
+from .services import normalize_location
+
+MAGIC = b'JGAZ'
+VERSION = 1
+HEADER = struct.Struct('<4sHI')
+OFFSET = struct.Struct('<I')
+COORDS = struct.Struct('<dd')
+
+# Trailing country names that mean the same as the ISO code in the dump
+COUNTRY_ALIASES = {
+    'usa': 'us',
+    'united states': 'us',
+    'united states of america': 'us',
+    'uk': 'gb',
+    'united kingdom': 'gb',
+    'canada': 'ca',
+}
+
+
+def normalize_key(location):
+    """``normalize_location`` without accents and with the country as its ISO code."""
+    text = unicodedata.normalize('NFKD', location or '')
+    text = normalize_location(''.join(c for c in text if not unicodedata.combining(c)))
+    head, sep, country = text.rpartition(', ')
+    if sep and country in COUNTRY_ALIASES:
+        text = f'{head}, {COUNTRY_ALIASES[country]}'
+    return text
+
+
+def read_admin1_names(lines):
+    """{'US.GA': 'Georgia', ...} from GeoNames' admin1CodesASCII.txt."""
+    names = {}
+    for line in lines:
+        fields = line.rstrip('\n').split('\t')
+        if len(fields) >= 3:
+            names[fields[0]] = fields[2] or fields[1]
+    return names
+
+
+def read_places(lines, admin1_names=None, min_population=0):
+    """(name, latitude, longitude, population) for every name of every place in a dump."""
+    admin1_names = admin1_names or {}
+    for line in lines:
+        fields = line.rstrip('\n').split('\t')
+        if len(fields) < 15 or line.startswith('#'):
+            continue
+        population = int(fields[14] or 0)
+        if population < min_population:
+            continue
+        lat, lng = float(fields[4]), float(fields[5])
+        country, admin1 = fields[8].lower(), fields[10]
+        qualifiers = [[], [country]]
+        # Numeric admin1 codes ("Paris, 11") are not what anybody types
+        if admin1 and not admin1.isdigit():
+            qualifiers += [[admin1], [admin1, country]]
+        if f'{country.upper()}.{admin1}' in admin1_names:
+            region = admin1_names[f'{country.upper()}.{admin1}']
+            qualifiers += [[region], [region, country]]
+        for name in {fields[1], fields[2]} - {''}:
+            for qualifier in qualifiers:
+                yield ', '.join([name] + qualifier), lat, lng, population
+
+
+def open_dump(path):
+    """Text lines of a GeoNames dump, plain or zipped as downloaded."""
+    if zipfile.is_zipfile(path):
+        archive = zipfile.ZipFile(path)
+        member = next(name for name in archive.namelist() if name.endswith('.txt'))
+        return io.TextIOWrapper(archive.open(member), encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+def build_index(places, path):
+    """Write the index for ``places`` (from ``read_places``) to ``path``. Returns the name count."""
+    best = {}
+    for name, lat, lng, population in places:
+        key = normalize_key(name).encode('utf-8')
+        if key and (key not in best or population > best[key][0]):
+            best[key] = (population, lat, lng)
+    keys = sorted(best)
+
+    offsets = bytearray()
+    coords = bytearray()
+    position = 0
+    for key in keys:
+        offsets += OFFSET.pack(position)
+        coords += COORDS.pack(*best[key][1:])
+        position += len(key)
+    offsets += OFFSET.pack(position)
+
+    # Write beside the target and swap it in, so running processes keep
+    # their mapping of the old file
+    tmp = f'{path}.tmp'
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+        f.write(offsets)
+        f.write(coords)
+        f.write(b''.join(keys))
+    os.replace(tmp, path)
+    return len(keys)
+
+
+class GazetteerIndex:
+    """Read-only, memory-mapped view of an index written by ``build_index``."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a gazetteer index (version {VERSION})")
+        self._offsets = HEADER.size
+        self._coords = self._offsets + OFFSET.size * (self.count + 1)
+        self._blob = self._coords + COORDS.size * self.count
+
+    def __len__(self):
+        return self.count
+
+    def _key(self, i):
+        start, end = struct.unpack_from('<II', self._map, self._offsets + OFFSET.size * i)
+        return self._map[self._blob + start:self._blob + end]
+
+    def lookup(self, location):
+        """(latitude, longitude) of ``location``, or None if it is not indexed."""
+        key = normalize_key(location).encode('utf-8')
+        if not key:
+            return None
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._key(lo) == key:
+            return COORDS.unpack_from(self._map, self._coords + COORDS.size * lo)
+        return None
@@ -0,0 +1,134 @@
+"""
+Geohash encoding and spatial prefiltering.
+
+A geohash interleaves longitude and latitude bits into a base-32 string;
+points in the same cell share a prefix, so an ordinary B-tree index on a
+geohash column answers "everything in this cell" with a range scan.
+``covering_cells`` picks a handful of cells covering a bounding box and
+``cell_filter`` turns them into such range lookups; callers then refine
+the candidates exactly (``haversine_km``).
+"""
+import math
+
+from django.db.models import Q
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+# Precision stored on rows (cells of about 4.8 x 4.8 m)
+PRECISION = 9
+# Never cover a query with more cells than this
+MAX_CELLS = 16
+EARTH_RADIUS_KM = 6371.0088
+
+
+def encode(lat, lng, precision=PRECISION):
+    """The geohash of (lat, lng) with ``precision`` characters."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # even bits encode longitude
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a cell with ``precision`` characters."""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def _cells_for(min_lat, min_lng, max_lat, max_lng, precision):
+    height, width = cell_size(precision)
+    cells = set()
+    # Step through the cell grid between the corners, aligned on cell edges
+    lat = math.floor((min_lat + 90) / height) * height - 90
+    while lat <= max_lat:
+        lng = math.floor((min_lng + 180) / width) * width - 180
+        while lng <= max_lng:
+            center_lat = min(lat + height / 2, 90.0)
+            center_lng = min(lng + width / 2, 180.0)
+            cells.add(encode(center_lat, center_lng, precision))
+            lng += width
+        lat += height
+    return cells
+
+
+def _cell_count(min_lat, min_lng, max_lat, max_lng, precision):
+    height, width = cell_size(precision)
+    rows = math.floor((max_lat + 90) / height) - math.floor((min_lat + 90) / height) + 1
+    cols = math.floor((max_lng + 180) / width) - math.floor((min_lng + 180) / width) + 1
+    return rows * cols
+
+
+def covering_cells(bbox, max_cells=MAX_CELLS, max_precision=PRECISION):
+    """The finest set of at most ``max_cells`` geohash cells covering ``bbox``.
+
+    ``bbox`` is (min_lat, min_lng, max_lat, max_lng); a box whose min_lng
+    is greater than its max_lng crosses the antimeridian. Cells are never
+    longer than ``max_precision`` characters.
+    """
+    min_lat, min_lng, max_lat, max_lng = bbox
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+    if min_lng > max_lng:
+        boxes = [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng)]
+    else:
+        boxes = [(min_lat, max(min_lng, -180.0), max_lat, min(max_lng, 180.0))]
+    for precision in range(max_precision, 0, -1):
+        if sum(_cell_count(*box, precision) for box in boxes) <= max_cells:
+            break
+    cells = set()
+    for box in boxes:
+        cells |= _cells_for(*box, precision)
+    return sorted(cells)
+
+
+def cell_filter(cells, field='geohash'):
+    """Q matching rows whose ``field`` lies in any of ``cells`` (index range scans)."""
+    query = Q()
+    for cell in cells:
+        # '~' sorts after every base-32 character
+        query |= Q(**{f'{field}__gte': cell, f'{field}__lt': cell + '~'})
+    return query
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat, lng, radius_km):
+    """(min_lat, min_lng, max_lat, max_lng) enclosing the circle around (lat, lng)."""
+    angle = radius_km / EARTH_RADIUS_KM
+    d_lat = math.degrees(angle)
+    max_lat, min_lat = lat + d_lat, lat - d_lat
+    ratio = math.sin(angle) / math.cos(math.radians(lat)) if abs(lat) < 90 else 2
+    if max_lat >= 90 or min_lat <= -90 or angle >= math.pi / 2 or ratio >= 1:
+        # The circle reaches a pole (or half the globe): every longitude is in range
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+    d_lng = math.degrees(math.asin(ratio))
+    min_lng, max_lng = lng - d_lng, lng + d_lng
+    # Wrap around the antimeridian (min_lng > max_lng then means "crossing")
+    if min_lng < -180:
+        min_lng += 360
+    if max_lng > 180:
+        max_lng -= 360
+    return min_lat, min_lng, max_lat, max_lng
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from geocoding.gazetteer import build_index, open_dump, read_admin1_names, read_places
+
+
+class Command(BaseCommand):
+    help = "Build the offline gazetteer index from a GeoNames cities dump (e.g. cities15000.zip)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='GeoNames cities file, .txt or .zip')
+        parser.add_argument('--admin1', default=None,
+                            help='admin1CodesASCII.txt, to also index "City, State name"')
+        parser.add_argument('--output', default=None,
+                            help='Index file to write (default: settings.GAZETTEER_PATH)')
+        parser.add_argument('--min-population', type=int, default=0,
+                            help='Skip smaller places (default: 0)')
+
+    def handle(self, *args, **options):
+        output = options['output'] or settings.GAZETTEER_PATH
+        try:
+            admin1_names = {}
+            if options['admin1']:
+                with open(options['admin1'], encoding='utf-8') as f:
+                    admin1_names = read_admin1_names(f)
+            with open_dump(options['source']) as lines:
+                count = build_index(read_places(lines, admin1_names, options['min_population']), output)
+        except OSError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} place names into {output}. Restart running workers to pick it up."
+        ))
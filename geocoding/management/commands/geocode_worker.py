@@ -0,0 +1,33 @@
+from functools import partial
+
+from django.core.management.base import BaseCommand
+
+from geocoding.queue import process_due_tasks
+from tasks.worker import run_worker
+
+
+class Command(BaseCommand):
+    help = ("Process queued geocoding lookups only. run_worker already does this alongside "
+            "background tasks; use this to give geocoding a process of its own.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Process the currently due lookups and exit')
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Lookups claimed per polling round (default: 50)')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Seconds to sleep when the queue is empty (default: 5)')
+
+    def handle(self, *args, **options):
+        self.stdout.write("Geocode worker started.")
+        try:
+            processed = run_worker(
+                once=options['once'],
+                interval=options['interval'],
+                pollers=[partial(process_due_tasks, limit=options['batch_size'])],
+                claim_tasks=False,
+            )
+        except KeyboardInterrupt:
+            self.stdout.write("Geocode worker stopped.")
+            return
+        self.stdout.write(f"Processed {processed} geocoding lookup(s).")
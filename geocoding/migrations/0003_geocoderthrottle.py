@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geocoding', '0002_geocodecache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocoderThrottle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('next_slot', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
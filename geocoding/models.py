@@ -0,0 +1,77 @@
+from django.db import models
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+
+class GeocodeTask(models.Model):
+    """A pending coordinate lookup for a model instance with a ``location`` field.
+
+    Saves only enqueue these rows; ``manage.py run_worker`` resolves them
+    and writes ``latitude``/``longitude`` back onto the target row.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    location = models.CharField(max_length=255)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+            models.Index(fields=['content_type', 'object_id']),
+        ]
+
+    def __str__(self):
+        return f"Geocode '{self.location}' for {self.content_type.model} #{self.object_id} ({self.status})"
+
+
+class GeocodeCache(models.Model):
+    """Shared result of geocoding one normalized location string.
+
+    Misses are cached too (``found=False``) but expire after
+    ``settings.GEOCODE_NEGATIVE_TTL`` so they are eventually retried.
+    """
+
+    key = models.CharField(max_length=255, unique=True, help_text="Normalized location string")
+    found = models.BooleanField(default=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(null=True, blank=True, help_text="Only set for negative entries")
+
+    class Meta:
+        verbose_name_plural = 'Geocode cache entries'
+
+    def __str__(self):
+        if self.found:
+            return f"{self.key} -> ({self.latitude}, {self.longitude})"
+        return f"{self.key} -> not found"
+
+
+class GeocoderThrottle(models.Model):
+    """The next free request slot of a rate-limited geocoder.
+
+    Shared by every thread, worker process and script, so together they
+    keep to the backend's request rate (see ``NominatimGeocoder``).
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    next_slot = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name}: next request at {self.next_slot}"
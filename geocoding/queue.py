@@ -0,0 +1,122 @@
+"""
+DB-backed geocoding queue.
+
+``enqueue_geocode`` is called from ``Job.save``/``Profile.save`` and returns
+immediately; ``process_due_tasks`` is registered as a poller (see
+geocoding.tasks) and driven by ``manage.py run_worker``.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from tasks.worker import CLAIM_LEASE
+from . import geohash
+from .backends import GeocoderError
+from .models import GeocodeTask
+from .services import geocode
+from .signals import coordinates_applied
+
+
+def _max_attempts():
+    return getattr(settings, 'GEOCODE_MAX_ATTEMPTS', 5)
+
+
+def retry_delay(attempts):
+    """Exponential backoff: 1, 2, 4, ... minutes, capped at one hour."""
+    return timedelta(minutes=min(2 ** (attempts - 1), 60))
+
+
+def enqueue_geocode(instance):
+    """Queue a lookup of ``instance.location``, replacing any older pending one."""
+    content_type = ContentType.objects.get_for_model(instance)
+    GeocodeTask.objects.update_or_create(
+        content_type=content_type,
+        object_id=instance.pk,
+        status='pending',
+        defaults={
+            'location': instance.location,
+            'attempts': 0,
+            'next_attempt_at': timezone.now(),
+            'last_error': '',
+        },
+    )
+
+
+def cancel_geocode(instance):
+    """Drop queued lookups for ``instance`` (e.g. a job that became remote)."""
+    content_type = ContentType.objects.get_for_model(instance)
+    GeocodeTask.objects.filter(
+        content_type=content_type, object_id=instance.pk, status__in=['pending', 'running']
+    ).delete()
+
+
+def _claim(task):
+    """Atomically mark a due task as running; False if another worker got it first."""
+    now = timezone.now()
+    return GeocodeTask.objects.filter(
+        pk=task.pk, status=task.status, next_attempt_at__lte=now
+    ).update(status='running', next_attempt_at=now + CLAIM_LEASE, updated_at=now) == 1
+
+
+def _apply_coordinates(task, coords):
+    model = task.content_type.model_class()
+    lat, lon = coords
+    values = {'latitude': lat, 'longitude': lon, 'updated_at': timezone.now()}
+    if any(field.name == 'geohash' for field in model._meta.concrete_fields):
+        values['geohash'] = geohash.encode(lat, lon)
+    # Only touch the row if its location is still the one we looked up.
+    rows = model.objects.filter(pk=task.object_id, location=task.location)
+    with transaction.atomic():
+        previous = rows.select_for_update().values_list('latitude', 'longitude').first()
+        if previous is None:
+            return
+        rows.update(**values)
+    coordinates_applied.send(
+        sender=model, object_id=task.object_id,
+        previous=None if None in previous else previous, coordinates=(lat, lon),
+    )
+
+
+def run_task(task, geocoder=None):
+    """Resolve one claimed task and record the outcome."""
+    task.attempts += 1
+    try:
+        coords = geocode(task.location, geocoder=geocoder)
+    except GeocoderError as e:
+        task.last_error = str(e)
+        if task.attempts >= _max_attempts():
+            task.status = 'failed'
+        else:
+            task.status = 'pending'
+            task.next_attempt_at = timezone.now() + retry_delay(task.attempts)
+        task.save()
+        return False
+
+    if coords:
+        _apply_coordinates(task, coords)
+        task.status = 'done'
+        task.last_error = ''
+    else:
+        task.status = 'failed'
+        task.last_error = 'Location could not be resolved'
+    task.save()
+    return coords is not None
+
+
+def process_due_tasks(limit=50, geocoder=None):
+    """Claim and run up to ``limit`` due tasks. Returns the number processed."""
+    now = timezone.now()
+    due = GeocodeTask.objects.filter(
+        status__in=['pending', 'running'], next_attempt_at__lte=now
+    ).select_related('content_type').order_by('next_attempt_at')[:limit]
+
+    processed = 0
+    for task in due:
+        if not _claim(task):
+            continue
+        run_task(task, geocoder=geocoder)
+        processed += 1
+    return processed
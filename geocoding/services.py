@@ -0,0 +1,129 @@
+"""
+The single entry point for turning a location string into coordinates.
+
+Lookups go through an in-process LRU, then the shared ``GeocodeCache``
+table, and only then the configured backend. Both hits and misses are
+cached; misses expire after ``settings.GEOCODE_NEGATIVE_TTL`` seconds.
+Transient backend failures (``GeocoderError``) are never cached.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .backends import get_geocoder
+from .models import GeocodeCache
+
+_MISS = object()
+
+
+def normalize_location(location):
+    """Canonical cache key: "  Atlanta ,GA " and "atlanta, ga" map to the same entry."""
+    text = ' '.join((location or '').lower().split())
+    text = re.sub(r'\s*,\s*', ', ', text)
+    return text.strip(' ,.')[:255]
+
+
+class _LRU:
+    """A small thread-safe LRU of key -> (coords or None, expiry timestamp or None)."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key, _MISS)
+            if entry is _MISS:
+                return _MISS
+            coords, expires = entry
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return _MISS
+            self._data.move_to_end(key)
+            return coords
+
+    def set(self, key, coords, ttl=None):
+        with self._lock:
+            expires = time.monotonic() + ttl if ttl is not None else None
+            self._data[key] = (coords, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_memory = _LRU(getattr(settings, 'GEOCODE_LRU_SIZE', 4096))
+
+
+def _negative_ttl():
+    return getattr(settings, 'GEOCODE_NEGATIVE_TTL', 7 * 24 * 3600)
+
+
+def clear_memory_cache():
+    _memory.clear()
+
+
+def cached_coordinates(location):
+    """Look ``location`` up in the caches only, never the backend.
+
+    Returns ``(hit, coords)``; ``hit`` is False when the backend would have
+    to be asked, and ``coords`` is None for a cached miss.
+    """
+    key = normalize_location(location)
+    if not key:
+        return True, None
+    coords = _memory.get(key)
+    if coords is not _MISS:
+        return True, coords
+
+    entry = GeocodeCache.objects.filter(key=key).first()
+    if entry is None:
+        return False, None
+    if not entry.found:
+        if entry.expires_at and entry.expires_at <= timezone.now():
+            return False, None
+        ttl = (entry.expires_at - timezone.now()).total_seconds() if entry.expires_at else None
+        _memory.set(key, None, ttl)
+        return True, None
+    coords = (entry.latitude, entry.longitude)
+    _memory.set(key, coords)
+    return True, coords
+
+
+def store(location, coords):
+    """Record a backend answer for ``location`` in both cache layers."""
+    key = normalize_location(location)
+    if not key:
+        return
+    if coords:
+        defaults = {'found': True, 'latitude': coords[0], 'longitude': coords[1], 'expires_at': None}
+        _memory.set(key, tuple(coords))
+    else:
+        ttl = _negative_ttl()
+        defaults = {'found': False, 'latitude': None, 'longitude': None,
+                    'expires_at': timezone.now() + timedelta(seconds=ttl)}
+        _memory.set(key, None, ttl)
+    GeocodeCache.objects.update_or_create(key=key, defaults=defaults)
+
+
+def geocode(location, geocoder=None):
+    """Resolve ``location`` to ``(lat, lon)`` or ``None``.
+
+    Raises ``geocoding.backends.GeocoderError`` if the backend had to be
+    consulted and failed transiently.
+    """
+    hit, coords = cached_coordinates(location)
+    if hit:
+        return coords
+    coords = (geocoder or get_geocoder()).geocode(location)
+    store(location, coords)
+    return coords
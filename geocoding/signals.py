@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent by the geocode worker after it stores coordinates with a queryset
+# update, which skips save() and post_save. Receivers get ``object_id``,
+# ``previous`` (the coordinates it replaced, or None) and ``coordinates``.
+coordinates_applied = Signal()
@@ -0,0 +1,12 @@
+from tasks.registry import poller, task
+from .queue import process_due_tasks
+from .services import geocode
+
+# run_worker drains the geocoding queue between tasks; geocode_worker runs it alone
+poller(process_due_tasks)
+
+
+@task
+def geocode_location(task, location):
+    """Resolve a location asked for by the lookup endpoint into the geocode cache."""
+    return {'found': geocode(location) is not None}
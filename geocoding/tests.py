@@ -0,0 +1,197 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job
+from tasks.models import Task
+from tasks.worker import run_worker
+from .backends import GazetteerGeocoder, GeocoderError, NominatimGeocoder, StubGeocoder
+from .geohash import encode
+from .models import GeocodeCache, GeocodeTask
+from .queue import process_due_tasks
+from .services import clear_memory_cache, geocode, normalize_location
+
+
+@override_settings(GEOCODER_BACKEND='geocoding.backends.StubGeocoder')
+class GeocodeQueueTests(TestCase):
+    def setUp(self):
+        clear_memory_cache()
+        self.recruiter = User.objects.create_user(username='rec', password='pass')
+
+    def create_job(self, location):
+        return Job.objects.create(title='Engineer', company_name='Acme', location=location,
+                                  posted_by=self.recruiter)
+
+    def test_save_enqueues_instead_of_geocoding(self):
+        with mock.patch.object(StubGeocoder, 'geocode') as geocode:
+            job = self.create_job('Atlanta, GA')
+        geocode.assert_not_called()
+        self.assertIsNone(job.latitude)
+        self.assertEqual(GeocodeTask.objects.filter(status='pending').count(), 1)
+
+    def test_worker_fills_in_coordinates(self):
+        job = self.create_job('Atlanta, GA')
+        self.assertEqual(process_due_tasks(), 1)
+        job.refresh_from_db()
+        self.assertAlmostEqual(job.latitude, 33.7490)
+        self.assertEqual(job.geohash, encode(job.latitude, job.longitude))
+        self.assertEqual(GeocodeTask.objects.get().status, 'done')
+
+    def test_geocode_worker_leaves_background_tasks_alone(self):
+        from .tasks import geocode_location
+
+        job = self.create_job('Atlanta, GA')
+        queued = geocode_location.enqueue('Dallas, TX')
+        out = StringIO()
+        call_command('geocode_worker', once=True, stdout=out)
+        self.assertIn('Processed 1 geocoding lookup(s).', out.getvalue())
+        job.refresh_from_db()
+        self.assertAlmostEqual(job.latitude, 33.7490)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'pending')
+
+    def test_stale_result_not_applied(self):
+        job = self.create_job('Atlanta, GA')
+        Job.objects.filter(pk=job.pk).update(location='Dallas, TX')
+        process_due_tasks()
+        job.refresh_from_db()
+        self.assertIsNone(job.latitude)
+
+    def test_transient_failure_backs_off_then_fails(self):
+        self.create_job('Atlanta, GA')
+        with mock.patch.object(StubGeocoder, 'geocode', side_effect=GeocoderError('timeout')):
+            process_due_tasks()
+            task = GeocodeTask.objects.get()
+            self.assertEqual((task.status, task.attempts), ('pending', 1))
+            self.assertGreater(task.next_attempt_at, timezone.now())
+
+            # Nothing is due until the backoff expires
+            self.assertEqual(process_due_tasks(), 0)
+            for _ in range(4):
+                GeocodeTask.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+                process_due_tasks()
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), ('failed', 5))
+
+
+@override_settings(GEOCODER_BACKEND='geocoding.backends.StubGeocoder')
+class GeocodeCacheTests(TestCase):
+    def setUp(self):
+        clear_memory_cache()
+
+    def test_normalization(self):
+        self.assertEqual(normalize_location('  Atlanta ,GA. '), 'atlanta, ga')
+        self.assertEqual(normalize_location('New   York'), 'new york')
+
+    def test_backend_called_once_per_normalized_location(self):
+        with mock.patch.object(StubGeocoder, 'geocode', return_value=(1.0, 2.0)) as backend:
+            self.assertEqual(geocode('Atlanta, GA'), (1.0, 2.0))
+            self.assertEqual(geocode('atlanta ,ga'), (1.0, 2.0))
+            clear_memory_cache()
+            self.assertEqual(geocode('ATLANTA, GA'), (1.0, 2.0))
+        backend.assert_called_once()
+        self.assertTrue(GeocodeCache.objects.get(key='atlanta, ga').found)
+
+    def test_negative_entries_expire(self):
+        with mock.patch.object(StubGeocoder, 'geocode', return_value=None) as backend:
+            self.assertIsNone(geocode('Nowhere'))
+            self.assertIsNone(geocode('Nowhere'))
+            self.assertEqual(backend.call_count, 1)
+
+            GeocodeCache.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+            clear_memory_cache()
+            geocode('Nowhere')
+            self.assertEqual(backend.call_count, 2)
+
+    def test_cached_location_skips_queue(self):
+        geocode('Dallas, TX')
+        recruiter = User.objects.create_user(username='rec', password='pass')
+        job = Job.objects.create(title='Engineer', company_name='Acme', location='dallas,  tx',
+                                 posted_by=recruiter)
+        self.assertAlmostEqual(job.latitude, 32.7767)
+        self.assertFalse(GeocodeTask.objects.exists())
+
+    def test_lookup_endpoint_never_waits_on_the_backend(self):
+        User.objects.create_user(username='seeker', password='pass')
+        url = reverse('geocoding:lookup')
+        with mock.patch.object(StubGeocoder, 'geocode', wraps=StubGeocoder().geocode) as backend:
+            self.assertEqual(self.client.get(url, {'q': 'Atlanta, GA'}).json(), {'found': False})
+            self.assertFalse(Task.objects.exists())  # anonymous misses are not queued
+
+            self.client.login(username='seeker', password='pass')
+            for q in ('Atlanta, GA', 'atlanta ,ga'):
+                response = self.client.get(url, {'q': q})
+                self.assertEqual(response.status_code, 202)
+                self.assertEqual(response.json(), {'found': False, 'pending': True})
+            backend.assert_not_called()
+            self.assertEqual(Task.objects.filter(status='pending').count(), 1)
+
+            run_worker(once=True)
+            backend.assert_called_once_with('atlanta, ga')
+        response = self.client.get(url, {'q': 'Atlanta, GA'})
+        self.assertEqual(response.json(), {'found': True, 'lat': 33.749, 'lon': -84.388})
+
+
+def geonames_row(name, ascii_name, lat, lng, country, admin1, population):
+    fields = ['0', name, ascii_name, '', str(lat), str(lng), 'P', 'PPL', country, '', admin1,
+              '', '', '', str(population), '', '0', 'UTC', '2024-01-01']
+    return '\t'.join(fields) + '\n'
+
+
+@override_settings(GAZETTEER_FALLBACK='geocoding.backends.StubGeocoder')
+class GazetteerTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'gazetteer.idx')
+        source = os.path.join(tmp.name, 'cities.txt')
+        admin1 = os.path.join(tmp.name, 'admin1.txt')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(geonames_row('Atlanta', 'Atlanta', 33.749, -84.38798, 'US', 'GA', 463878))
+            f.write(geonames_row('Springfield', 'Springfield', 39.80172, -89.64371, 'US', 'IL', 114394))
+            f.write(geonames_row('Springfield', 'Springfield', 37.21533, -93.29824, 'US', 'MO', 166810))
+            f.write(geonames_row('São Paulo', 'Sao Paulo', -23.5475, -46.63611, 'BR', '27', 10021295))
+        with open(admin1, 'w', encoding='utf-8') as f:
+            f.write('US.GA\tGeorgia\tGeorgia\t4197000\n')
+        call_command('build_gazetteer', source, admin1=admin1, output=self.path, stdout=StringIO())
+
+    def test_lookups(self):
+        geocoder = GazetteerGeocoder(self.path)
+        for location in ('Atlanta, GA', ' atlanta ,ga ', 'Atlanta, Georgia, USA', 'Atlanta, US'):
+            self.assertEqual(geocoder.geocode(location), (33.749, -84.38798), location)
+        self.assertEqual(geocoder.geocode('Springfield'), (37.21533, -93.29824))
+        self.assertEqual(geocoder.geocode('Springfield, IL'), (39.80172, -89.64371))
+        self.assertEqual(geocoder.geocode('sao paulo'), geocoder.geocode('São Paulo, BR'))
+        self.assertIsNone(geocoder.index.lookup('Paulo'))
+
+    def test_misses_fall_back_to_the_network_backend(self):
+        geocoder = GazetteerGeocoder(self.path)
+        with mock.patch.object(StubGeocoder, 'geocode', wraps=geocoder.fallback.geocode) as fallback:
+            geocoder.geocode('Atlanta, GA')
+            fallback.assert_not_called()
+            self.assertEqual(geocoder.geocode('Dallas, TX'), (32.7767, -96.7970))
+            fallback.assert_called_once_with('Dallas, TX')
+
+        with override_settings(GAZETTEER_FALLBACK=None):
+            self.assertIsNone(GazetteerGeocoder(self.path).geocode('Dallas, TX'))
+
+
+class NominatimThrottleTests(TestCase):
+    def test_instances_share_one_request_schedule(self):
+        # Separate instances stand in for separate worker processes
+        geocoders = [NominatimGeocoder(min_interval=1.0) for _ in range(3)]
+        with mock.patch('geocoding.backends.time.sleep') as sleep:
+            for geocoder in geocoders:
+                geocoder._wait_turn()
+        waits = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(waits), 2)  # the first request goes out at once
+        self.assertAlmostEqual(waits[0], 1.0, delta=0.2)
+        self.assertAlmostEqual(waits[1], 2.0, delta=0.2)
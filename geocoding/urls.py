@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'geocoding'
+
+urlpatterns = [
+    path('lookup/', views.lookup, name='lookup'),
+]
@@ -0,0 +1,30 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from .services import cached_coordinates, normalize_location
+from .tasks import geocode_location
+
+
+@require_GET
+def lookup(request):
+    """Resolve a location string through the shared geocode cache.
+
+    The request never waits on the upstream geocoder. For signed-in users a
+    cache miss queues the lookup for ``manage.py run_worker`` and answers
+    ``202 {"found": false, "pending": true}``; ask again shortly. Anonymous
+    visitors only get cached answers, so the endpoint can't be used to drive
+    traffic at the upstream geocoder.
+    """
+    location = request.GET.get('q', '').strip()
+    if not location:
+        return JsonResponse({'error': 'Missing q parameter'}, status=400)
+
+    hit, coords = cached_coordinates(location)
+    if not hit and request.user.is_authenticated:
+        # Queue the normalized form so spelling variants share one lookup
+        geocode_location.enqueue(normalize_location(location))
+        return JsonResponse({'found': False, 'pending': True}, status=202)
+
+    if not coords:
+        return JsonResponse({'found': False})
+    return JsonResponse({'found': True, 'lat': coords[0], 'lon': coords[1]})
@@ -46,16 +46,23 @@ INSTALLED_APPS = [
     'messaging',
     'recommendations',
     'analytics',
+    'geocoding',
+    'tasks',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    "monitoring.metrics.MetricsMiddleware",
+    "monitoring.slowlog.SlowQueryMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "monitoring.profiler.ProfilerMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "monitoring.middleware.QueryBudgetMiddleware",
 ]
 
 ROOT_URLCONF = "jobby.urls"
@@ -147,3 +154,52 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For developm
 # EMAIL_HOST_PASSWORD = 'your-password'
 
 DEFAULT_FROM_EMAIL = 'noreply@jobby.com'
+
+# Geocoding
+# Saves only enqueue lookups; run `python manage.py run_worker` to resolve them.
+# Use 'geocoding.backends.StubGeocoder' to work offline, or
+# 'geocoding.backends.GazetteerGeocoder' to answer from a local GeoNames
+# index (`python manage.py build_gazetteer cities15000.zip`) and only ask
+# GAZETTEER_FALLBACK (None: nobody) about places it does not know.
+GEOCODER_BACKEND = 'geocoding.backends.NominatimGeocoder'
+GEOCODER_TIMEOUT = 8
+GEOCODER_MIN_INTERVAL = 1.0  # seconds between Nominatim requests, across all processes
+GAZETTEER_PATH = os.environ.get('GAZETTEER_PATH', str(BASE_DIR / 'geocoding' / 'data' / 'gazetteer.idx'))
+GAZETTEER_FALLBACK = 'geocoding.backends.NominatimGeocoder'
+GEOCODE_MAX_ATTEMPTS = 5
+GEOCODE_NEGATIVE_TTL = 7 * 24 * 3600  # seconds before a failed lookup is retried
+GEOCODE_LRU_SIZE = 4096  # per-process cache entries in front of the GeocodeCache table
+
+# Recommendations
+# Skills found in job and work experience descriptions come from this
+# dictionary; edits are picked up by running processes within seconds.
+SKILL_DICTIONARY_PATH = BASE_DIR / 'jobby' / 'data' / 'skills.txt'
+
+# Query budgets
+# Views declare budgets with @monitoring.decorators.query_budget(n); going
+# over logs a warning, or raises with QUERY_BUDGET_ACTION = 'raise'.
+QUERY_BUDGET_ENABLED = DEBUG
+QUERY_BUDGET_ACTION = 'warn'
+QUERY_BUDGET_DEFAULT = None
+QUERY_REPEAT_THRESHOLD = 5  # same statement from the same line = likely N+1
+QUERY_CALL_SITE_SKIP = ['monitoring.']  # modules never reported as a query's call site
+
+# Metrics (/metrics, Prometheus text format; staff or METRICS_TOKEN bearer)
+# With several worker processes, point METRICS_MULTIPROCESS_DIR at a
+# directory shared by the workers and emptied on deploy.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+METRICS_MULTIPROCESS_DIR = os.environ.get('METRICS_MULTIPROCESS_DIR')
+METRICS_FLUSH_INTERVAL = 1.0  # seconds
+
+# Slow-query log (JSON lines, summarize with `manage.py slow_queries`);
+# off unless SLOW_QUERY_LOG is set
+SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG')
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 5
+
+# Request profiler: staff add ?__profile=1 (or an X-Profile: 1 header) to a
+# request; captures are listed in the admin. Map URL names to N to also
+# profile one in N of their requests, e.g. {'jobs.recommendations': 100}.
+PROFILER_SAMPLE_RATES = {}
+PROFILER_TOP_N = 40
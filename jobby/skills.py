@@ -0,0 +1,174 @@
+"""
+Skill parsing and dictionary-based skill extraction, shared by the job
+board (jobs.skills) and the recommendation engine.
+
+Skill lists ("Python, ReactJS") are split and normalized, and known
+aliases mapped to their canonical skill. Free text (job descriptions and requirements, work experience
+descriptions) is matched against a curated skill dictionary with an
+Aho-Corasick automaton: one pass over the text finds every dictionary
+term, so extraction is linear in the text length and only known skills
+come out. The dictionary file (``SKILL_DICTIONARY_PATH``, by default
+``jobby/data/skills.txt``) is compiled once per process and
+recompiled when its modification time changes.
+"""
+import os
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULT_PATH = Path(__file__).resolve().parent / 'data' / 'skills.txt'
+
+# Seconds between checks of the dictionary file for changes
+RELOAD_CHECK_INTERVAL = 5.0
+
+
+def _is_word_char(ch):
+    return ch.isalnum()
+
+
+class SkillDictionary:
+    """A compiled skill dictionary.
+
+    ``terms`` maps every term to look for in prose to its canonical skill;
+    ``aliases`` maps every known spelling (including names that are not
+    matched in prose) to the canonical skill.
+    """
+
+    def __init__(self, terms, aliases=None):
+        self.aliases = dict(aliases or terms)
+        # Trie: goto[state] maps a character to the next state
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+        for term, canonical in terms.items():
+            self._add(term, canonical)
+        self._link()
+
+    def _add(self, term, canonical):
+        state = 0
+        for ch in term:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(())
+            state = nxt
+        self.output[state] += ((len(term), canonical),)
+
+    def _link(self):
+        """Compute failure links breadth first and merge outputs along them."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.output[nxt] += self.output[self.fail[nxt]]
+
+    @classmethod
+    def parse(cls, lines):
+        """Build a dictionary from the lines of a dictionary file."""
+        terms = {}
+        aliases = {}
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            name, _, alternatives = line.partition('=')
+            name = name.strip()
+            prose = not name.startswith('!')
+            canonical = ' '.join(name.lstrip('!').lower().split())
+            spellings = [' '.join(a.lower().split()) for a in alternatives.split(',')]
+            spellings = [s for s in spellings if s]
+            aliases[canonical] = canonical
+            if prose:
+                terms[canonical] = canonical
+            for spelling in spellings:
+                aliases[spelling] = canonical
+                terms[spelling] = canonical
+        return cls(terms, aliases)
+
+    def canonical(self, skill):
+        """The canonical name of a normalized skill (itself if unknown)."""
+        return self.aliases.get(skill, skill)
+
+    def find(self, text):
+        """Set of canonical skills mentioned in ``text`` as whole words."""
+        if not text:
+            return set()
+        text = ' '.join(text.lower().split())
+        goto, fail, output = self.goto, self.fail, self.output
+        found = set()
+        state = 0
+        last = len(text) - 1
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, canonical in output[state]:
+                start = i - length + 1
+                if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                    continue
+                if i < last and _is_word_char(text[i + 1]) and _is_word_char(ch):
+                    continue
+                found.add(canonical)
+        return found
+
+
+_lock = threading.Lock()
+_state = {'path': None, 'mtime': None, 'checked_at': 0.0, 'dictionary': None}
+
+
+def dictionary_path():
+    return Path(getattr(settings, 'SKILL_DICTIONARY_PATH', None) or DEFAULT_PATH)
+
+
+def load_dictionary(path):
+    with open(path, encoding='utf-8') as fh:
+        return SkillDictionary.parse(fh)
+
+
+def get_skill_dictionary():
+    """The compiled dictionary, recompiled when the file changed on disk."""
+    now = time.monotonic()
+    path = dictionary_path()
+    if (_state['dictionary'] is not None and _state['path'] == path
+            and now - _state['checked_at'] < RELOAD_CHECK_INTERVAL):
+        return _state['dictionary']
+    with _lock:
+        mtime = os.stat(path).st_mtime_ns
+        if _state['dictionary'] is None or _state['path'] != path or _state['mtime'] != mtime:
+            _state.update(dictionary=load_dictionary(path), path=path, mtime=mtime)
+        _state['checked_at'] = now
+        return _state['dictionary']
+
+
+def normalize_skill(skill):
+    """Normalize skill name for comparison."""
+    return skill.strip().lower()
+
+
+def canonical_skill(skill):
+    """Normalized, canonical name of one skill ("ReactJS" -> "react")."""
+    return get_skill_dictionary().canonical(normalize_skill(skill))
+
+
+def extract_skills_from_text(text):
+    """Extract skills from a comma/semicolon/newline separated skill list."""
+    if not text:
+        return []
+    return [canonical_skill(s) for s in re.split(r'[,;\n]', text) if s.strip()]
+
+
+def find_skills_in_text(text):
+    """Find the dictionary skills mentioned in free text (descriptions, requirements)."""
+    return get_skill_dictionary().find(text)
@@ -0,0 +1,90 @@
+"""
+Field-level change tracking for models.
+
+``DirtyFieldsMixin`` snapshots the values a row had when it was loaded
+(``from_db``), so a model can tell what changed without re-selecting the
+row, and ``save()`` on a loaded instance writes only the changed columns.
+
+The snapshot is refreshed only after ``post_save`` has fired, so signal
+receivers can still call ``instance.changed_fields`` or
+``instance.previous_value(name)`` to decide what to invalidate.
+"""
+from django.db import models
+
+
+class DirtyFieldsMixin(models.Model):
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_fields()
+        return instance
+
+    def _snapshot_fields(self, fields=None):
+        """Remember the persisted values (of ``fields``, or all loaded fields)."""
+        if fields is None or not hasattr(self, '_loaded_values'):
+            self._loaded_values = {}
+            fields = None
+        for f in self._meta.concrete_fields:
+            if f.attname not in self.__dict__:
+                continue  # deferred and never touched
+            if fields is None or f.name in fields or f.attname in fields:
+                self._loaded_values[f.attname] = self.__dict__[f.attname]
+
+    @property
+    def changed_fields(self):
+        """Names of fields whose value differs from what was loaded.
+
+        Unsaved (or not loaded from the database) instances report every
+        concrete field as changed.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None or self._state.adding:
+            return {f.name for f in self._meta.concrete_fields}
+        changed = set()
+        for f in self._meta.concrete_fields:
+            if f.primary_key or f.attname not in self.__dict__:
+                continue
+            if f.attname not in loaded or getattr(self, f.attname) != loaded[f.attname]:
+                changed.add(f.name)
+        return changed
+
+    def has_changed(self, field_name):
+        return field_name in self.changed_fields
+
+    def previous_value(self, field_name):
+        """The value ``field_name`` had when loaded (None if unknown)."""
+        field = self._meta.get_field(field_name)
+        return getattr(self, '_loaded_values', {}).get(field.attname)
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._snapshot_fields(fields)
+
+    def save(self, *args, **kwargs):
+        """Save only the changed columns of an instance loaded from the database.
+
+        An explicit ``update_fields`` or ``force_insert`` is respected as is;
+        a loaded instance with no changes is not written at all.
+        """
+        tracked = (
+            hasattr(self, '_loaded_values')
+            and not self._state.adding
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+            and not args
+        )
+        if tracked:
+            changed = self.changed_fields
+            if changed:
+                changed |= {
+                    f.name for f in self._meta.concrete_fields
+                    if getattr(f, 'auto_now', False)
+                }
+            kwargs['update_fields'] = changed
+
+        super().save(*args, **kwargs)
+        self._snapshot_fields(kwargs.get('update_fields'))
@@ -29,6 +29,9 @@ urlpatterns = [
     path('applications/', include('applications.urls')),
     path('messaging/', include('messaging.urls')),
     path('recommendations/', include('recommendations.urls')),
+    path('geocoding/', include('geocoding.urls')),
+    path('tasks/', include('tasks.urls')),
+    path('', include('monitoring.urls')),
     # path('analytics/', include('analytics.urls')),
 ]
 urlpatterns += static(settings.MEDIA_URL,
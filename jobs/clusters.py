@@ -0,0 +1,154 @@
+"""
+Precomputed marker clusters for the jobs map.
+
+Every active, non-remote, geocoded job is counted in one ``JobCluster``
+per precision of ``CLUSTER_PRECISIONS``: the cell of that many geohash
+characters it falls in. Each map zoom level reads the precision whose
+cells are a few dozen pixels wide on screen (``ZOOM_PRECISIONS``); past
+``MAX_CLUSTER_ZOOM`` the map gets the individual jobs instead.
+
+``move_job`` applies one job's change to the counts (receivers in
+jobs.signals call it on save, delete and when the geocode worker fills in
+coordinates); ``rebuild_clusters`` recomputes everything after bulk loads.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from geocoding.geohash import cell_filter, covering_cells, encode
+
+from .models import Job, JobCluster
+
+# Geohash precision of the clusters shown at zoom 0, 1, 2, ...
+ZOOM_PRECISIONS = [1, 1, 2, 2, 2, 3, 3, 4, 4, 4, 5, 5, 6, 6]
+MAX_CLUSTER_ZOOM = len(ZOOM_PRECISIONS) - 1
+CLUSTER_PRECISIONS = sorted(set(ZOOM_PRECISIONS))
+# Job ids kept per cluster, for popups and "zoom to" links
+SAMPLE_SIZE = 5
+
+MAPPABLE = Q(is_active=True, is_remote=False, latitude__isnull=False, longitude__isnull=False)
+
+
+def mappable_point(is_active, is_remote, latitude, longitude):
+    """(latitude, longitude) of a job that belongs on the map, else None."""
+    if is_active and not is_remote and latitude is not None and longitude is not None:
+        return latitude, longitude
+    return None
+
+
+def move_job(job_id, old_point, new_point):
+    """Move job ``job_id`` from the clusters of ``old_point`` to those of ``new_point``.
+
+    Either point may be None: the job was not, or is no longer, on the map.
+    """
+    if old_point == new_point:
+        return
+    changes = []
+    for sign, point in ((-1, old_point), (1, new_point)):
+        if point is not None:
+            cell = encode(*point, max(CLUSTER_PRECISIONS))
+            changes += [(precision, cell[:precision], sign, point) for precision in CLUSTER_PRECISIONS]
+
+    with transaction.atomic():
+        clusters = _lock_clusters({(precision, cell) for precision, cell, _, _ in changes})
+        missing = {(precision, cell) for precision, cell, sign, _ in changes
+                   if sign > 0 and (precision, cell) not in clusters}
+        if missing:
+            # Insert empty rows and lock them like the others; a concurrent move
+            # creating the same cell makes ours a no-op instead of an IntegrityError
+            JobCluster.objects.bulk_create(
+                [JobCluster(precision=precision, cell=cell, sample_ids=[]) for precision, cell in missing],
+                ignore_conflicts=True,
+            )
+            clusters.update(_lock_clusters(missing))
+
+        short = set()
+        for precision, cell, sign, (lat, lng) in changes:
+            cluster = clusters.get((precision, cell))
+            if cluster is None:
+                continue
+            cluster.count += sign
+            cluster.latitude_sum += sign * lat
+            cluster.longitude_sum += sign * lng
+            if sign < 0 and job_id in cluster.sample_ids:
+                cluster.sample_ids.remove(job_id)
+                short.add(cluster)
+            elif sign > 0 and job_id not in cluster.sample_ids and len(cluster.sample_ids) < SAMPLE_SIZE:
+                cluster.sample_ids.append(job_id)
+
+        for cluster in short:
+            if len(cluster.sample_ids) < min(cluster.count, SAMPLE_SIZE):
+                _refill_samples(cluster, job_id)
+
+        empty = [cluster.pk for cluster in clusters.values() if cluster.count <= 0]
+        if empty:
+            JobCluster.objects.filter(pk__in=empty).delete()
+        changed = [cluster for cluster in clusters.values() if cluster.count > 0]
+        if changed:
+            JobCluster.objects.bulk_update(changed, ['count', 'latitude_sum', 'longitude_sum', 'sample_ids'])
+
+
+def _lock_clusters(keys):
+    """The existing clusters for ``keys`` = {(precision, cell)}, locked for update."""
+    match = Q()
+    for precision, cell in keys:
+        match |= Q(precision=precision, cell=cell)
+    return {
+        (cluster.precision, cluster.cell): cluster
+        for cluster in JobCluster.objects.select_for_update().filter(match)
+    }
+
+
+def _refill_samples(cluster, job_id):
+    """Top ``cluster.sample_ids`` back up from the jobs still in its cell."""
+    more = (Job.objects.filter(MAPPABLE, geohash__startswith=cluster.cell)
+            .exclude(pk__in=[job_id, *cluster.sample_ids])
+            .order_by('pk').values_list('pk', flat=True))
+    cluster.sample_ids += list(more[:SAMPLE_SIZE - len(cluster.sample_ids)])
+
+
+def rebuild_clusters(job_model=Job, cluster_model=JobCluster):
+    """Recompute every cluster from the jobs table. Returns the number of clusters."""
+    clusters = {}
+    points = job_model.objects.filter(MAPPABLE).order_by('pk').values_list('pk', 'latitude', 'longitude')
+    for pk, lat, lng in points.iterator(chunk_size=2000):
+        cell = encode(lat, lng, max(CLUSTER_PRECISIONS))
+        for precision in CLUSTER_PRECISIONS:
+            cluster = clusters.get((precision, cell[:precision]))
+            if cluster is None:
+                cluster = clusters[precision, cell[:precision]] = cluster_model(
+                    precision=precision, cell=cell[:precision], count=0,
+                    latitude_sum=0, longitude_sum=0, sample_ids=[],
+                )
+            cluster.count += 1
+            cluster.latitude_sum += lat
+            cluster.longitude_sum += lng
+            if len(cluster.sample_ids) < SAMPLE_SIZE:
+                cluster.sample_ids.append(pk)
+
+    with transaction.atomic():
+        cluster_model.objects.all().delete()
+        cluster_model.objects.bulk_create(clusters.values(), batch_size=2000)
+    return len(clusters)
+
+
+def zoom_precision(zoom):
+    """Cluster precision for map zoom ``zoom``, or None past MAX_CLUSTER_ZOOM."""
+    return ZOOM_PRECISIONS[zoom] if zoom <= MAX_CLUSTER_ZOOM else None
+
+
+def clusters_in_bbox(bbox, zoom):
+    """Clusters for ``zoom`` whose centroid lies in ``bbox`` = (south, west, north, east)."""
+    precision = zoom_precision(zoom)
+    south, west, north, east = bbox
+    rows = JobCluster.objects.filter(
+        cell_filter(covering_cells(bbox, max_precision=precision), field='cell'), precision=precision,
+    )
+    clusters = []
+    for cluster in rows:
+        lat, lng = cluster.centroid
+        inside_lng = west <= lng <= east if west <= east else (lng >= west or lng <= east)
+        if south <= lat <= north and inside_lng:
+            clusters.append(cluster)
+    return clusters
@@ -128,6 +128,13 @@ class JobSearchForm(forms.Form):
         help_text='Comma-separated skills'
     )
     
+    skills_match = forms.ChoiceField(
+        choices=[('any', 'Any of these'), ('all', 'All of these')],
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'}),
+        label='Match'
+    )
+    
     location = forms.CharField(
         max_length=255,
         required=False,
@@ -0,0 +1,81 @@
+"""
+Radius and bounding-box filters for geocoded jobs.
+
+Both narrow the queryset with the indexed ``Job.geohash`` column first (a
+few range scans over the cells covering the area) plus the exact
+latitude/longitude box; radius queries are then refined with the
+haversine distance in Python.
+"""
+from django.db.models import Q
+
+from geocoding.geohash import cell_filter, covering_cells, haversine_km, radius_bbox
+
+MAX_RADIUS_KM = 20000
+
+
+def parse_area(params):
+    """Read a spatial filter from query parameters.
+
+    ``lat``, ``lng`` and ``radius_km`` give ``('radius', (lat, lng, radius_km))``;
+    ``bbox=west,south,east,north`` (Leaflet's ``toBBoxString()``) gives
+    ``('bbox', (south, west, north, east))``. Returns None without a filter
+    and raises ValueError on malformed values.
+    """
+    if params.get('bbox'):
+        try:
+            west, south, east, north = (float(v) for v in params['bbox'].split(','))
+        except ValueError:
+            raise ValueError('bbox must be west,south,east,north')
+        if not -90 <= south <= north <= 90 or west > east:
+            raise ValueError('bbox is out of range')
+        if east - west >= 360:
+            west, east = -180.0, 180.0
+        else:
+            # A map panned across the antimeridian reports longitudes past +-180
+            west, east = _wrap(west), _wrap(east)
+        return 'bbox', (south, west, north, east)
+
+    if any(params.get(name) for name in ('lat', 'lng', 'radius_km')):
+        try:
+            lat, lng, radius_km = (float(params[name]) for name in ('lat', 'lng', 'radius_km'))
+        except (KeyError, ValueError):
+            raise ValueError('lat, lng and radius_km must all be numbers')
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180 and 0 < radius_km <= MAX_RADIUS_KM):
+            raise ValueError('lat, lng or radius_km is out of range')
+        return 'radius', (lat, lng, radius_km)
+    return None
+
+
+def _wrap(lng):
+    return lng if -180 <= lng <= 180 else (lng + 180) % 360 - 180
+
+
+def jobs_in_bbox(queryset, bbox):
+    """Jobs inside ``bbox`` = (south, west, north, east); west > east crosses the antimeridian."""
+    south, west, north, east = bbox
+    if west <= east:
+        longitude = Q(longitude__gte=west, longitude__lte=east)
+    else:
+        longitude = Q(longitude__gte=west) | Q(longitude__lte=east)
+    return queryset.filter(
+        cell_filter(covering_cells(bbox)), longitude, latitude__gte=south, latitude__lte=north,
+    )
+
+
+def jobs_near(queryset, lat, lng, radius_km):
+    """Prefilter for jobs within ``radius_km``: rows in the circle's bounding box.
+
+    Refine the result with ``within_radius``.
+    """
+    return jobs_in_bbox(queryset, radius_bbox(lat, lng, radius_km)).order_by()
+
+
+def within_radius(rows, lat, lng, radius_km, coordinates=lambda row: (row.latitude, row.longitude)):
+    """``(row, distance_km)`` for the rows within ``radius_km``, nearest first."""
+    matches = []
+    for row in rows:
+        distance = haversine_km(lat, lng, *coordinates(row))
+        if distance <= radius_km:
+            matches.append((row, distance))
+    matches.sort(key=lambda match: match[1])
+    return matches
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.models import Job, JobSkill
+from jobs.skills import job_skill_tokens
+
+
+class Command(BaseCommand):
+    help = "Rebuild JobSkill tokens for existing jobs, working through them in primary-key batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of jobs processed per transaction (default: 1000)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        jobs = Job.objects.order_by('pk').only('pk', 'skills_required', 'requirements', 'description')
+        last_pk = 0
+        processed = 0
+        tokens_written = 0
+
+        while True:
+            batch = list(jobs.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            rows = [
+                JobSkill(job_id=job.pk, name=name)
+                for job in batch
+                for name in job_skill_tokens(job)
+            ]
+            with transaction.atomic():
+                JobSkill.objects.filter(job_id__in=[job.pk for job in batch]).delete()
+                JobSkill.objects.bulk_create(rows, batch_size=batch_size)
+            last_pk = batch[-1].pk
+            processed += len(batch)
+            tokens_written += len(rows)
+            self.stdout.write(f"  {processed} jobs processed...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled {tokens_written} skill tokens for {processed} jobs."
+        ))
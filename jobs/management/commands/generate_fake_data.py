@@ -0,0 +1,410 @@
+import itertools
+import random
+from datetime import datetime, timedelta
+from functools import lru_cache
+from io import StringIO
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from applications.models import Application
+from geocoding import geohash
+from jobs import search
+from jobs.models import Job
+from messaging.models import Conversation, InternalMessage
+from profiles.models import Profile, Skill, WorkExperience
+
+# Skills in rough order of popularity; picked with a Zipf-like skew so a few
+# skills are everywhere and the long tail is rare, like real postings.
+SKILLS = [
+    'python', 'sql', 'javascript', 'java', 'aws', 'react', 'git', 'docker', 'linux',
+    'typescript', 'node.js', 'kubernetes', 'c#', 'postgresql', 'django', 'excel',
+    'agile', 'c++', 'communication', 'rest', 'html', 'css', 'azure', 'spring',
+    'machine learning', 'pandas', 'mongodb', 'go', 'redis', 'terraform', 'gcp',
+    'angular', 'vue', 'flask', 'graphql', 'kafka', 'spark', 'tableau', 'ruby',
+    'ruby on rails', 'php', 'laravel', 'kotlin', 'swift', 'scala', 'rust',
+    'elasticsearch', 'jenkins', 'figma', 'salesforce', 'power bi', 'airflow',
+    'pytorch', 'tensorflow', 'data analysis', 'project management', 'seo',
+    'selenium', 'cypress', 'snowflake', 'dbt', 'flutter', 'elixir', 'haskell',
+]
+
+# Metro areas weighted by rough job-market size, with coordinates so nothing
+# has to be geocoded.
+METROS = [
+    ('New York, NY', 40.7128, -74.0060, 20),
+    ('San Francisco, CA', 37.7749, -122.4194, 14),
+    ('Seattle, WA', 47.6062, -122.3321, 10),
+    ('Austin, TX', 30.2672, -97.7431, 8),
+    ('Boston, MA', 42.3601, -71.0589, 8),
+    ('Chicago, IL', 41.8781, -87.6298, 8),
+    ('Los Angeles, CA', 34.0522, -118.2437, 8),
+    ('Atlanta, GA', 33.7490, -84.3880, 7),
+    ('Dallas, TX', 32.7767, -96.7970, 6),
+    ('Denver, CO', 39.7392, -104.9903, 5),
+    ('Washington, DC', 38.9072, -77.0369, 5),
+    ('Raleigh, NC', 35.7796, -78.6382, 3),
+    ('Miami, FL', 25.7617, -80.1918, 3),
+    ('Phoenix, AZ', 33.4484, -112.0740, 3),
+    ('Minneapolis, MN', 44.9778, -93.2650, 2),
+    ('Portland, OR', 45.5152, -122.6784, 2),
+    ('Pittsburgh, PA', 40.4406, -79.9959, 2),
+    ('Salt Lake City, UT', 40.7608, -111.8910, 2),
+    ('Nashville, TN', 36.1627, -86.7816, 2),
+    ('Columbus, OH', 39.9612, -82.9988, 1),
+    ('Savannah, GA', 32.0809, -81.0912, 1),
+    ('Boise, ID', 43.6150, -116.2023, 1),
+]
+REMOTE_SHARE = 0.15
+
+ROLES = [
+    'Software Engineer', 'Backend Developer', 'Frontend Developer', 'Full Stack Developer',
+    'Data Engineer', 'Data Scientist', 'DevOps Engineer', 'Site Reliability Engineer',
+    'Mobile Developer', 'QA Engineer', 'Product Manager', 'Data Analyst',
+    'Machine Learning Engineer', 'Cloud Architect', 'UX Designer', 'Security Engineer',
+]
+SENIORITY = [('entry', 'Junior ', 25), ('mid', '', 40), ('senior', 'Senior ', 28), ('executive', 'Principal ', 7)]
+EMPLOYMENT_TYPES = [('full-time', 80), ('contract', 10), ('part-time', 5), ('internship', 3), ('freelance', 2)]
+COMPANY_PARTS = (
+    ['Acme', 'Globex', 'Initech', 'Umbrella', 'Stark', 'Wayne', 'Hooli', 'Vandelay', 'Wonka',
+     'Cyberdyne', 'Soylent', 'Tyrell', 'Aperture', 'Monarch', 'Pied Piper', 'Nakatomi'],
+    ['Labs', 'Systems', 'Software', 'Health', 'Analytics', 'Financial', 'Logistics', 'Media',
+     'Robotics', 'Cloud', 'Energy', 'Retail'],
+)
+FIRST_NAMES = ['James', 'Maria', 'Wei', 'Aisha', 'Carlos', 'Olivia', 'Noah', 'Priya', 'Liam', 'Fatima',
+               'Lucas', 'Emma', 'Mateo', 'Sofia', 'Kenji', 'Amara', 'Ethan', 'Zoe', 'Omar', 'Hana']
+LAST_NAMES = ['Smith', 'Garcia', 'Chen', 'Khan', 'Johnson', 'Nguyen', 'Okafor', 'Martin', 'Kim', 'Silva',
+              'Patel', 'Brown', 'Rossi', 'Cohen', 'Ivanova', 'Tanaka', 'Müller', 'Lopez', 'Ali', 'Jones']
+MESSAGE_LINES = [
+    "Thanks for applying, are you available for a quick call this week?",
+    "Yes, Tuesday afternoon works for me.",
+    "Great, I'll send over a calendar invite.",
+    "Could you share a bit more about the team?",
+    "We'd like to move you to the technical interview stage.",
+    "Thank you for the update!",
+    "Do you have any questions about the role?",
+    "What does the on-call rotation look like?",
+]
+
+CHUNK_SIZE = 5000
+# The generated history ends at this moment unless --now says otherwise,
+# so the same seed always produces the same rows, timestamps included
+DEFAULT_NOW = '2025-01-01T00:00:00'
+
+
+class RawInsertQuerySet(QuerySet):
+    """bulk_create that writes objects exactly as given, like loaddata does.
+
+    Raw inserts skip the fields' pre_save, so auto_now/auto_now_add fields
+    keep the created_at/updated_at values we generate, without touching the
+    (process-wide) field definitions.
+    """
+
+    def _insert(self, *args, **kwargs):
+        kwargs['raw'] = True
+        return super()._insert(*args, **kwargs)
+
+
+def bulk_create_dated(model, objs, batch_size=None):
+    """bulk_create ``objs`` in one write, keeping their generated timestamps."""
+    return RawInsertQuerySet(model).bulk_create(objs, batch_size=batch_size)
+
+
+@lru_cache(maxsize=None)
+def zipf_weights(n, exponent):
+    """Cumulative weights for a Zipf-like choice among ``n`` ranked items."""
+    return list(itertools.accumulate(1 / (i + 1) ** exponent for i in range(n)))
+
+
+def chunked(iterable, size=CHUNK_SIZE):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = ("Bulk-generate deterministic, realistically skewed fake data (users, profiles, jobs, "
+            "applications, messages) for load and benchmark testing.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=1000)
+        parser.add_argument('--profiles', type=int, default=500,
+                            help='Job seeker profiles to create')
+        parser.add_argument('--recruiters', type=int, default=None,
+                            help='Recruiter accounts to create (default: 1 per 50 jobs)')
+        parser.add_argument('--applications', type=int, default=5000)
+        parser.add_argument('--messages', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Random seed; the same seed produces the same data (default: 42)')
+        parser.add_argument('--now', default=DEFAULT_NOW,
+                            help='ISO date/time the generated history ends at (default: %(default)s)')
+        parser.add_argument('--prefix', default='fake',
+                            help='Username prefix of the generated accounts (default: fake)')
+        parser.add_argument('--flush', action='store_true',
+                            help='Delete the accounts (and everything they own) from a previous run first')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        try:
+            self.now = datetime.fromisoformat(options['now'])
+        except ValueError:
+            raise CommandError(f"--now must be an ISO date or date/time, not {options['now']!r}.")
+        if timezone.is_naive(self.now):
+            self.now = timezone.make_aware(self.now)
+
+        existing = User.objects.filter(username__startswith=f'{self.prefix}_')
+        if options['flush']:
+            deleted, _ = existing.delete()
+            self.stdout.write(f"Deleted {deleted} rows from a previous run.")
+        elif existing.exists():
+            raise CommandError(
+                f"Accounts named '{self.prefix}_*' already exist; pass --flush or another --prefix."
+            )
+
+        n_recruiters = options['recruiters'] or max(1, options['jobs'] // 50)
+        recruiters = self.create_users('recruiter', n_recruiters)
+        candidates = self.create_users('regular', options['profiles'])
+        jobs = self.create_jobs(options['jobs'], recruiters)
+        self.create_applications(options['applications'], jobs, candidates)
+        self.create_messages(options['messages'], recruiters, candidates)
+        self.build_indexes()
+        self.stdout.write(self.style.SUCCESS("Fake data generated."))
+
+    # -- helpers -----------------------------------------------------------
+
+    def skewed_index(self, n, exponent=1.1):
+        """Index in [0, n) drawn with a Zipf-like skew towards 0."""
+        return self.rng.choices(range(n), cum_weights=zipf_weights(n, exponent))[0]
+
+    def pick_skills(self, low, high):
+        count = self.rng.randint(low, high)
+        skills = []
+        while len(skills) < count:
+            skill = SKILLS[self.skewed_index(len(SKILLS))]
+            if skill not in skills:
+                skills.append(skill)
+        return skills
+
+    def pick_location(self, remote_share=REMOTE_SHARE):
+        if self.rng.random() < remote_share:
+            return 'Remote', None, None
+        name, lat, lon, _ = self.rng.choices(METROS, weights=[m[3] for m in METROS])[0]
+        return name, lat + self.rng.uniform(-0.15, 0.15), lon + self.rng.uniform(-0.15, 0.15)
+
+    def past(self, max_days=365):
+        return self.now - timedelta(days=self.rng.random() * max_days)
+
+    def progress(self, label, done, total):
+        self.stdout.write(f"  {label}: {done}/{total}")
+
+    # -- generators ----------------------------------------------------------
+
+    def create_users(self, user_type, count):
+        """Create ``count`` users with their profiles; returns their user ids."""
+        password = make_password('password')
+        kind = 'rec' if user_type == 'recruiter' else 'user'
+        user_ids = []
+        for chunk in chunked(range(count)):
+            users = []
+            for i in chunk:
+                first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+                username = f'{self.prefix}_{kind}{i}'
+                users.append(User(
+                    username=username, first_name=first, last_name=last,
+                    email=f'{username}@example.com', password=password,
+                    date_joined=self.past(720),
+                ))
+            # bulk_create sets primary keys on the backends we run (SQLite, PostgreSQL).
+            # Profiles are normally created by the User post_save signal.
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                profiles = [self.build_profile(user, user_type) for user in users]
+                bulk_create_dated(Profile, profiles)
+                if user_type == 'regular':
+                    skills, experiences = [], []
+                    for profile in profiles:
+                        skills.extend(self.build_skills(profile))
+                        experiences.extend(self.build_experience(profile))
+                    Skill.objects.bulk_create(skills)
+                    WorkExperience.objects.bulk_create(experiences)
+            user_ids.extend(user.pk for user in users)
+            self.progress(f'{user_type} users', len(user_ids), count)
+        return user_ids
+
+    def build_profile(self, user, user_type):
+        created = user.date_joined
+        if user_type == 'recruiter':
+            return Profile(user=user, user_type='recruiter', created_at=created, updated_at=created,
+                           headline='Technical Recruiter')
+        location, lat, lon = self.pick_location(remote_share=0.05)
+        return Profile(
+            user=user,
+            user_type='regular',
+            headline=f"{self.rng.choice(ROLES)}",
+            location=location,
+            latitude=lat,
+            longitude=lon,
+            skills_text=', '.join(s.title() if s.isalpha() and len(s) > 3 else s for s in self.pick_skills(2, 8)),
+            profile_visibility=self.rng.choices(['recruiters', 'public', 'private'], weights=[60, 30, 10])[0],
+            created_at=created,
+            updated_at=created + timedelta(days=self.rng.random() * 30),
+        )
+
+    def build_skills(self, profile):
+        if self.rng.random() < 0.5:
+            return []
+        proficiency = ['beginner', 'intermediate', 'advanced', 'expert']
+        return [
+            Skill(profile=profile, name=name, proficiency_level=self.rng.choice(proficiency))
+            for name in self.pick_skills(1, 5)
+        ]
+
+    def build_experience(self, profile):
+        experiences = []
+        end = self.now.date() if self.rng.random() < 0.7 else None
+        for _ in range(self.rng.choices([0, 1, 2, 3, 4], weights=[15, 30, 30, 15, 10])[0]):
+            finish = end or self.now.date()
+            start = finish - timedelta(days=self.rng.randint(180, 2200))
+            skills = self.pick_skills(1, 3)
+            experiences.append(WorkExperience(
+                profile=profile,
+                company=f"{self.rng.choice(COMPANY_PARTS[0])} {self.rng.choice(COMPANY_PARTS[1])}",
+                position=self.rng.choice(ROLES),
+                start_date=start,
+                end_date=end,
+                is_current=end is None,
+                description=f"Built and maintained services using {', '.join(skills)}.",
+            ))
+            end = start - timedelta(days=self.rng.randint(0, 120))
+        return experiences
+
+    def build_job(self, recruiter_id):
+        level, prefix, _ = self.rng.choices(SENIORITY, weights=[s[2] for s in SENIORITY])[0]
+        role = self.rng.choice(ROLES)
+        skills = self.pick_skills(3, 8)
+        location, lat, lon = self.pick_location()
+        created = self.past()
+        salary_base = {'entry': 60, 'mid': 90, 'senior': 130, 'executive': 180}[level] * 1000
+        salary_min = salary_base + self.rng.randint(-10, 20) * 1000
+        company = f"{self.rng.choice(COMPANY_PARTS[0])} {self.rng.choice(COMPANY_PARTS[1])}"
+        return Job(
+            title=f'{prefix}{role}',
+            company_name=company,
+            location=location,
+            latitude=lat,
+            longitude=lon,
+            geohash=geohash.encode(lat, lon) if lat is not None else '',
+            is_remote=location == 'Remote',
+            salary_min=salary_min,
+            salary_max=salary_min + self.rng.randint(10, 60) * 1000,
+            employment_type=self.rng.choices([e[0] for e in EMPLOYMENT_TYPES],
+                                             weights=[e[1] for e in EMPLOYMENT_TYPES])[0],
+            experience_level=level,
+            skills_required=', '.join(skills[:4]),
+            requirements='\n'.join(
+                f'{self.rng.randint(1, 8)}+ years of {skill}' for skill in skills
+            ),
+            description=(
+                f"{company} is hiring a {prefix}{role} to help build our platform. "
+                f"You will work with {', '.join(skills)} in a collaborative, agile team."
+            ),
+            visa_sponsorship=self.rng.random() < 0.2,
+            posted_by_id=recruiter_id,
+            is_active=self.rng.random() < 0.85,
+            created_at=created,
+            updated_at=created,
+        )
+
+    def create_jobs(self, count, recruiters):
+        job_ids = []
+        for chunk in chunked(range(count)):
+            jobs = [
+                self.build_job(recruiters[self.skewed_index(len(recruiters), 0.8)])
+                for _ in chunk
+            ]
+            with transaction.atomic():
+                created = bulk_create_dated(Job, jobs)
+            job_ids.extend(job.pk for job in created)
+            self.progress('jobs', len(job_ids), count)
+        return job_ids
+
+    def create_applications(self, count, jobs, candidates):
+        if not jobs or not candidates:
+            return
+        count = min(count, len(jobs) * len(candidates))
+        statuses = [('applied', 50), ('review', 25), ('interview', 12), ('offer', 3), ('closed', 10)]
+        seen = set()
+        done = 0
+        while done < count:
+            batch = []
+            while len(batch) < min(CHUNK_SIZE, count - done):
+                # Popular jobs get most applications; active seekers apply a lot
+                pair = (jobs[self.skewed_index(len(jobs), 0.7)],
+                        candidates[self.skewed_index(len(candidates), 0.5)])
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                applied = self.past(180)
+                batch.append(Application(
+                    job_id=pair[0], applicant_id=pair[1],
+                    status=self.rng.choices([s[0] for s in statuses], weights=[s[1] for s in statuses])[0],
+                    applied_at=applied, updated_at=applied,
+                    viewed_by_recruiter=self.rng.random() < 0.4,
+                ))
+            with transaction.atomic():
+                bulk_create_dated(Application, batch)
+            done += len(batch)
+            self.progress('applications', done, count)
+
+    def create_messages(self, count, recruiters, candidates):
+        if not count or not candidates:
+            return
+        # Conversations have a skewed length: many short threads, a few long ones
+        done = 0
+        while done < count:
+            conversations, pairs = [], []
+            planned = done
+            while len(conversations) < 1000 and planned < count:
+                length = min(self.rng.choices([1, 2, 4, 8, 20], weights=[30, 30, 20, 15, 5])[0],
+                             count - planned)
+                planned += length
+                started = self.past(180)
+                conversations.append(Conversation(created_at=started, updated_at=started))
+                pairs.append((self.rng.choice(recruiters),
+                              candidates[self.skewed_index(len(candidates), 0.5)], length, started))
+            with transaction.atomic():
+                bulk_create_dated(Conversation, conversations)
+                Participants = Conversation.participants.through
+                Participants.objects.bulk_create([
+                    Participants(conversation_id=conv.pk, user_id=user_id)
+                    for conv, (recruiter, candidate, _, _) in zip(conversations, pairs)
+                    for user_id in (recruiter, candidate)
+                ])
+                messages = []
+                for conv, (recruiter, candidate, length, started) in zip(conversations, pairs):
+                    sent = started
+                    for n in range(length):
+                        sender, recipient = (recruiter, candidate) if n % 2 == 0 else (candidate, recruiter)
+                        sent += timedelta(minutes=self.rng.randint(5, 3000))
+                        messages.append(InternalMessage(
+                            conversation_id=conv.pk, sender_id=sender, recipient_id=recipient,
+                            content=self.rng.choice(MESSAGE_LINES), created_at=sent,
+                            read_at=sent + timedelta(hours=2) if self.rng.random() < 0.8 else None,
+                        ))
+                bulk_create_dated(InternalMessage, messages, batch_size=CHUNK_SIZE)
+            done += len(messages)
+            self.progress('messages', done, count)
+
+    def build_indexes(self):
+        """Fill the derived tables that saves would normally maintain."""
+        self.stdout.write("Building search, skill, map cluster and candidate feature indexes...")
+        search.rebuild_index()
+        quiet = StringIO()
+        call_command('backfill_job_skills', stdout=quiet)
+        call_command('rebuild_job_clusters', stdout=quiet)
+        call_command('rebuild_candidate_features', stdout=quiet)
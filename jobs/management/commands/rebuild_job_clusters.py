@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from jobs.clusters import rebuild_clusters
+
+
+class Command(BaseCommand):
+    help = "Rebuild the jobs map clusters (needed after bulk imports that skip Job.save)."
+
+    def handle(self, *args, **options):
+        count = rebuild_clusters()
+        self.stdout.write(self.style.SUCCESS(f"Built {count} clusters."))
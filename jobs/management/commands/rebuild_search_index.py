@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from jobs import search
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Rebuild the job full-text search index (needed after bulk imports that skip Job.save)."
+
+    def handle(self, *args, **options):
+        search.create_index()
+        search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {Job.objects.filter(is_active=True).count()} active jobs."
+        ))
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# The DDL is spelled out here rather than imported from jobs.search so that
+# later changes to the live module cannot change what this migration does.
+# The GIN expression must match jobs.search.PG_SEARCH_VECTOR.
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_job_fts USING fts5("
+    "title, company_name, description, requirements, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+SQLITE_FILL = (
+    "INSERT INTO jobs_job_fts (rowid, title, company_name, description, requirements) "
+    "SELECT id, title, company_name, description, requirements FROM jobs_job WHERE is_active"
+)
+SQLITE_DROP = "DROP TABLE IF EXISTS jobs_job_fts"
+POSTGRES_CREATE = (
+    "CREATE INDEX IF NOT EXISTS jobs_job_search_gin ON jobs_job USING GIN ("
+    "to_tsvector('english', "
+    "coalesce(\"jobs_job\".\"title\", '') || ' ' || "
+    "coalesce(\"jobs_job\".\"company_name\", '') || ' ' || "
+    "coalesce(\"jobs_job\".\"description\", '') || ' ' || "
+    "coalesce(\"jobs_job\".\"requirements\", '')))"
+)
+POSTGRES_DROP = "DROP INDEX IF EXISTS jobs_job_search_gin"
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_CREATE)
+        schema_editor.execute("DELETE FROM jobs_job_fts")
+        schema_editor.execute(SQLITE_FILL)
+    elif vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_CREATE)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_DROP)
+    elif vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_latitude_job_longitude'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
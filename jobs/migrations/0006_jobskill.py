@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_tokens', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['name', 'job'], name='jobs_jobski_name_3570e4_idx')],
+                'unique_together': {('job', 'name')},
+            },
+        ),
+    ]
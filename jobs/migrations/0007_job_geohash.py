@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:57
+
+from django.db import migrations, models
+
+from geocoding.geohash import encode
+
+
+def fill_geohashes(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    jobs = Job.objects.filter(latitude__isnull=False, longitude__isnull=False).only('latitude', 'longitude')
+    batch = []
+    for job in jobs.iterator(chunk_size=2000):
+        job.geohash = encode(job.latitude, job.longitude)
+        batch.append(job)
+        if len(batch) == 2000:
+            Job.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    Job.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_jobskill'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=12),
+        ),
+        migrations.RunPython(fill_geohashes, migrations.RunPython.noop),
+    ]
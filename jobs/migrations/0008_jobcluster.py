@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:03
+
+from django.db import migrations, models
+
+
+def build_clusters(apps, schema_editor):
+    from jobs.clusters import rebuild_clusters
+    rebuild_clusters(apps.get_model('jobs', 'Job'), apps.get_model('jobs', 'JobCluster'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_job_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('precision', models.PositiveSmallIntegerField()),
+                ('cell', models.CharField(max_length=12)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('latitude_sum', models.FloatField(default=0)),
+                ('longitude_sum', models.FloatField(default=0)),
+                ('sample_ids', models.JSONField(default=list)),
+            ],
+            options={
+                'unique_together': {('precision', 'cell')},
+            },
+        ),
+        migrations.RunPython(build_clusters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+MAX_SKILL_LENGTH = 100
+BATCH_SIZE = 1000
+
+
+def index_description_skills(apps, schema_editor):
+    """Add the dictionary skills mentioned in job descriptions to the JobSkill index."""
+    from jobby.skills import find_skills_in_text
+
+    Job = apps.get_model('jobs', 'Job')
+    JobSkill = apps.get_model('jobs', 'JobSkill')
+    jobs = Job.objects.exclude(description='').order_by('pk').values_list('pk', 'description')
+    last_pk = 0
+    while True:
+        batch = list(jobs.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            break
+        JobSkill.objects.bulk_create(
+            [JobSkill(job_id=pk, name=name)
+             for pk, description in batch
+             for name in find_skills_in_text(description) if len(name) <= MAX_SKILL_LENGTH],
+            ignore_conflicts=True,
+        )
+        last_pk = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_jobcluster'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_description_skills, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
-import urllib.request
-import urllib.parse
-import json
+from jobby.tracking import DirtyFieldsMixin
 
-class Job(models.Model):
+class Job(DirtyFieldsMixin, models.Model):
     EMPLOYMENT_TYPE_CHOICES = [
         ('full-time', 'Full Time'),
         ('part-time', 'Part Time'),
@@ -28,6 +26,8 @@ class Job(models.Model):
     # Optional geographic coordinates (populated later via geocoding)
     latitude = models.FloatField(null=True, blank=True, help_text="Latitude of job location")
     longitude = models.FloatField(null=True, blank=True, help_text="Longitude of job location")
+    # Derived from the coordinates on save, for indexed radius/bbox queries (geocoding.geohash)
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True, editable=False)
     salary_min = models.IntegerField(null=True, blank=True, help_text="Minimum salary")
     salary_max = models.IntegerField(null=True, blank=True, help_text="Maximum salary")
     employment_type = models.CharField(max_length=20, choices=EMPLOYMENT_TYPE_CHOICES, default='full-time')
@@ -74,71 +74,111 @@ class Job(models.Model):
         return []
 
     def _geocode_location(self, location):
-        """Try to geocode a free-text location using Nominatim.
+        """Synchronously geocode a free-text location through the shared cache.
 
-        Returns (lat, lon) or None on failure. This is best-effort and
-        failures are silently ignored to avoid blocking saves.
+        Returns (lat, lon) or None on failure. Saves never call this; they
+        enqueue a lookup for ``manage.py run_worker`` instead.
         """
-        if not location:
-            return None
+        from geocoding.backends import GeocoderError
+        from geocoding.services import geocode
         try:
-            import ssl
-            base = 'https://nominatim.openstreetmap.org/search?format=json&limit=1&q='
-            url = base + urllib.parse.quote(location)
-            req = urllib.request.Request(url, headers={'User-Agent': 'Jobby/1.0 (admin@jobby.example)'})
-            
-            # Create SSL context that doesn't verify certificates (for development)
-            # In production, you should install proper certificates
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            
-            with urllib.request.urlopen(req, timeout=8, context=ctx) as resp:
-                data = resp.read().decode('utf-8')
-                arr = json.loads(data)
-                if arr:
-                    return float(arr[0]['lat']), float(arr[0]['lon'])
-        except Exception:
-            # Network errors, rate-limiting, or parsing issues are ignored.
+            return geocode(location)
+        except GeocoderError:
             return None
-        return None
 
     def save(self, *args, **kwargs):
-        """Override save to attempt geocoding when location changes or coords are missing."""
-        try:
-            # Auto-detect remote jobs based on location text
-            location_lower = (self.location or '').lower().strip()
-            if 'remote' in location_lower or location_lower in ['n/a', 'na', 'anywhere', 'virtual']:
-                self.is_remote = True
-            
-            # If the job is remote, clear coordinates
-            if self.is_remote:
+        """Override save to queue geocoding when location changes or coords are missing."""
+        # Auto-detect remote jobs based on location text
+        location_lower = (self.location or '').lower().strip()
+        if 'remote' in location_lower or location_lower in ['n/a', 'na', 'anywhere', 'virtual']:
+            self.is_remote = True
+
+        need_geocode = False
+        # If the job is remote, clear coordinates
+        if self.is_remote:
+            self.latitude = None
+            self.longitude = None
+        elif self._state.adding:
+            need_geocode = True
+        else:
+            if (self.latitude is None or self.longitude is None):
+                need_geocode = True
+            if self.has_changed('location'):
+                need_geocode = True
+                # Drop the coordinates of the old location until the lookup completes
                 self.latitude = None
                 self.longitude = None
-            else:
-                old_location = None
-                if self.pk:
-                    try:
-                        old_location = Job.objects.values_list('location', flat=True).get(pk=self.pk)
-                    except Job.DoesNotExist:
-                        old_location = None
 
+        if need_geocode and (self.location or '').strip():
+            # Known locations are answered by the geocode cache without queueing
+            from geocoding.services import cached_coordinates
+            hit, coords = cached_coordinates(self.location)
+            if hit:
                 need_geocode = False
-                if not self.pk:
-                    # new object
-                    need_geocode = True
-                else:
-                    if (self.latitude is None or self.longitude is None):
-                        need_geocode = True
-                    if old_location is not None and old_location != (self.location or ''):
-                        need_geocode = True
-
-                if need_geocode and (self.location or '').strip():
-                    coords = self._geocode_location(self.location)
-                    if coords:
-                        self.latitude, self.longitude = coords
-        except Exception:
-            # Ensure save proceeds even if geocoding fails
-            pass
+                if coords:
+                    self.latitude, self.longitude = coords
+
+        from geocoding.geohash import encode
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+
+        became_remote = self.is_remote and not self._state.adding and self.has_changed('is_remote')
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'is_remote', 'latitude', 'longitude', 'geohash'}
 
         super().save(*args, **kwargs)
+
+        from geocoding.queue import cancel_geocode, enqueue_geocode
+        if need_geocode and (self.location or '').strip():
+            enqueue_geocode(self)
+        elif became_remote:
+            cancel_geocode(self)
+
+
+class JobSkill(models.Model):
+    """A normalized skill token required by a job.
+
+    Rows are derived from ``Job.skills_required``, ``Job.requirements`` and
+    ``Job.description`` on every save (see jobs.skills.sync_job_skills) so
+    the job board can filter skills, and candidate rescores find the jobs
+    sharing a skill, with an indexed lookup instead of scanning the text
+    columns.
+    """
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='skill_tokens')
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        unique_together = ('job', 'name')
+        indexes = [
+            models.Index(fields=['name', 'job']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.job_id})"
+
+
+class JobCluster(models.Model):
+    """Active, geocoded jobs aggregated per geohash cell, for the zoomed-out map.
+
+    One set of rows per precision in ``jobs.clusters.CLUSTER_PRECISIONS``;
+    kept in sync incrementally as jobs move, appear or disappear (see
+    jobs.clusters). ``sample_ids`` holds a few of the jobs in the cell.
+    """
+    precision = models.PositiveSmallIntegerField()
+    cell = models.CharField(max_length=12)
+    count = models.PositiveIntegerField(default=0)
+    latitude_sum = models.FloatField(default=0)
+    longitude_sum = models.FloatField(default=0)
+    sample_ids = models.JSONField(default=list)
+
+    class Meta:
+        unique_together = ('precision', 'cell')
+
+    def __str__(self):
+        return f"{self.cell} ({self.count})"
+
+    @property
+    def centroid(self):
+        return self.latitude_sum / self.count, self.longitude_sum / self.count
@@ -0,0 +1,151 @@
+"""
+Full-text search over active job postings.
+
+SQLite keeps an FTS5 virtual table (``jobs_job_fts``) keyed by job id and
+ranked with bm25(). PostgreSQL uses a GIN expression index over
+to_tsvector() ranked with ts_rank_cd(), which the database maintains by
+itself. Both match every word of the search as a prefix. Any other
+backend falls back to the old icontains filter.
+
+Every backend annotates matching jobs with ``search_rank`` where lower
+means more relevant, so callers can simply ``order_by('search_rank')``.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'jobs_job_fts'
+SEARCH_COLUMNS = ('title', 'company_name', 'description', 'requirements')
+
+# Must stay identical to the expression used by the GIN index created in
+# jobs/migrations/0005_job_search_index.py (and by create_index) or
+# Postgres will not use it.
+PG_SEARCH_VECTOR = (
+    "to_tsvector('english', "
+    "coalesce(\"jobs_job\".\"title\", '') || ' ' || "
+    "coalesce(\"jobs_job\".\"company_name\", '') || ' ' || "
+    "coalesce(\"jobs_job\".\"description\", '') || ' ' || "
+    "coalesce(\"jobs_job\".\"requirements\", ''))"
+)
+
+
+def _words(term):
+    return re.findall(r'\w+', term.lower())
+
+
+def _fts5_query(term):
+    """Turn free text into an FTS5 query: every word must match as a prefix."""
+    return ' AND '.join(f'"{word}"*' for word in _words(term))
+
+
+def _tsquery(term):
+    """The to_tsquery() counterpart of ``_fts5_query``."""
+    return ' & '.join(f'{word}:*' for word in _words(term))
+
+
+def create_index(schema_editor=None):
+    """Create the backend specific search structures."""
+    conn = schema_editor.connection if schema_editor else connection
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{', '.join(SEARCH_COLUMNS)}, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        elif conn.vendor == 'postgresql':
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS jobs_job_search_gin "
+                f"ON jobs_job USING GIN ({PG_SEARCH_VECTOR})"
+            )
+
+
+def drop_index(schema_editor=None):
+    conn = schema_editor.connection if schema_editor else connection
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        elif conn.vendor == 'postgresql':
+            cursor.execute("DROP INDEX IF EXISTS jobs_job_search_gin")
+
+
+def index_job(job):
+    """Add, refresh or drop a single job in the index after it was saved."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [job.pk])
+        if job.is_active:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [job.pk] + [getattr(job, column) or '' for column in SEARCH_COLUMNS],
+            )
+
+
+def remove_job(job_id):
+    """Drop a deleted job from the index."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [job_id])
+
+
+def rebuild_index(schema_editor=None):
+    """Re-populate the index from every active job in one statement."""
+    conn = schema_editor.connection if schema_editor else connection
+    if conn.vendor != 'sqlite':
+        return
+    columns = ', '.join(SEARCH_COLUMNS)
+    with conn.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, {columns}) "
+            f"SELECT id, {columns} FROM jobs_job WHERE is_active"
+        )
+
+
+def search_jobs(queryset, term):
+    """Filter a Job queryset to the postings matching ``term``.
+
+    The result is annotated with ``search_rank`` (lower is better).
+    """
+    if connection.vendor == 'sqlite':
+        query = _fts5_query(term)
+        if not query:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        # Join the FTS table once: MATCH drives the lookup and bm25() ranks
+        # the same row, instead of a correlated rank subquery per job
+        return queryset.extra(
+            select={'search_rank': f'bm25({FTS_TABLE})'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE} MATCH %s', f'{FTS_TABLE}.rowid = "jobs_job"."id"'],
+            params=[query],
+        )
+
+    if connection.vendor == 'postgresql':
+        query = _tsquery(term)
+        if not query:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        return queryset.alias(
+            search_match=RawSQL(
+                f"{PG_SEARCH_VECTOR} @@ to_tsquery('english', %s)",
+                [query],
+                output_field=BooleanField(),
+            )
+        ).filter(search_match=True).annotate(
+            search_rank=RawSQL(
+                f"-ts_rank_cd({PG_SEARCH_VECTOR}, to_tsquery('english', %s))",
+                [query],
+                output_field=FloatField(),
+            )
+        )
+
+    return queryset.filter(
+        Q(title__icontains=term) |
+        Q(company_name__icontains=term) |
+        Q(description__icontains=term) |
+        Q(requirements__icontains=term)
+    ).annotate(search_rank=Value(0.0, output_field=FloatField()))
@@ -0,0 +1,54 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from geocoding.signals import coordinates_applied
+
+from . import clusters, search
+from .skills import sync_job_skills
+from .models import Job
+
+
+# Job.changed_fields still describes this save while post_save receivers run.
+SEARCH_INDEX_FIELDS = set(search.SEARCH_COLUMNS) | {'is_active'}
+SKILL_TOKEN_FIELDS = {'skills_required', 'requirements', 'description'}
+CLUSTER_FIELDS = ('is_active', 'is_remote', 'latitude', 'longitude')
+
+
+@receiver(post_save, sender=Job)
+def update_search_index(sender, instance, **kwargs):
+    if instance.changed_fields & SEARCH_INDEX_FIELDS:
+        search.index_job(instance)
+
+
+@receiver(post_save, sender=Job)
+def update_skill_tokens(sender, instance, **kwargs):
+    if instance.changed_fields & SKILL_TOKEN_FIELDS:
+        sync_job_skills(instance)
+
+
+@receiver(post_delete, sender=Job)
+def remove_from_search_index(sender, instance, **kwargs):
+    search.remove_job(instance.pk)
+
+
+@receiver(post_save, sender=Job)
+def update_clusters(sender, instance, created, **kwargs):
+    if not instance.changed_fields & set(CLUSTER_FIELDS):
+        return
+    old = None if created else clusters.mappable_point(*(instance.previous_value(f) for f in CLUSTER_FIELDS))
+    new = clusters.mappable_point(*(getattr(instance, f) for f in CLUSTER_FIELDS))
+    clusters.move_job(instance.pk, old, new)
+
+
+@receiver(post_delete, sender=Job)
+def remove_from_clusters(sender, instance, **kwargs):
+    point = clusters.mappable_point(*(getattr(instance, f) for f in CLUSTER_FIELDS))
+    clusters.move_job(instance.pk, point, None)
+
+
+@receiver(coordinates_applied, sender=Job)
+def move_geocoded_job(sender, object_id, previous, coordinates, **kwargs):
+    flags = Job.objects.filter(pk=object_id).values_list('is_active', 'is_remote').first()
+    if flags:
+        clusters.move_job(object_id, clusters.mappable_point(*flags, *(previous or (None, None))),
+                          clusters.mappable_point(*flags, *coordinates))
@@ -0,0 +1,69 @@
+"""
+Skill token parsing and the indexed JobSkill lookups used by the job board.
+
+Tokens are normalized like candidate skills (jobby.skills), so aliases
+such as "ReactJS" and "react" meet in the same token for jobs and
+candidates.
+"""
+from django.db.models import Count
+
+from jobby.skills import extract_skills_from_text, find_skills_in_text
+
+MAX_SKILL_LENGTH = 100
+
+
+def parse_skills(text):
+    """Split a comma/semicolon/newline separated list into unique normalized tokens."""
+    tokens = []
+    for token in extract_skills_from_text(text):
+        if len(token) <= MAX_SKILL_LENGTH and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def job_skill_tokens(job):
+    """Skill tokens a job is indexed under.
+
+    ``skills_required`` is a list; ``requirements`` and ``description`` are
+    prose ("3+ years of Python"), so only the dictionary skills they mention
+    are indexed. This is the skill set the recommendation engine scores
+    against (``get_job_skills``), minus oversized tokens.
+    """
+    tokens = parse_skills(job.skills_required)
+    prose = find_skills_in_text(job.requirements or '') | find_skills_in_text(job.description or '')
+    for token in sorted(prose):
+        if token not in tokens and len(token) <= MAX_SKILL_LENGTH:
+            tokens.append(token)
+    return tokens
+
+
+def sync_job_skills(job):
+    """Bring the JobSkill rows of ``job`` in line with its current text fields."""
+    from .models import JobSkill
+
+    wanted = set(job_skill_tokens(job))
+    existing = set(JobSkill.objects.filter(job=job).values_list('name', flat=True))
+    if existing - wanted:
+        JobSkill.objects.filter(job=job, name__in=existing - wanted).delete()
+    if wanted - existing:
+        JobSkill.objects.bulk_create(
+            [JobSkill(job=job, name=name) for name in wanted - existing],
+            ignore_conflicts=True,
+        )
+
+
+def filter_jobs_by_skills(queryset, skills, mode='any'):
+    """Restrict a Job queryset through the JobSkill index.
+
+    ``mode='any'`` keeps jobs with at least one of the skills, ``mode='all'``
+    only those carrying every one of them.
+    """
+    from .models import JobSkill
+
+    tokens = parse_skills(skills)
+    if not tokens:
+        return queryset
+    matches = JobSkill.objects.filter(name__in=tokens)
+    if mode == 'all':
+        matches = matches.values('job_id').annotate(matched=Count('name')).filter(matched=len(tokens))
+    return queryset.filter(id__in=matches.values('job_id'))
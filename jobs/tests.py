@@ -1,3 +1,362 @@
-from django.test import TestCase
+import json
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+
+from .models import Job
+
+
+class JobSearchIndexTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username='rec', password='pass')
+        self.django_job = Job.objects.create(
+            title='Backend Engineer', company_name='Acme', location='Remote',
+            description='Build APIs with Django', requirements='Python, Django',
+            posted_by=self.recruiter,
+        )
+        self.react_job = Job.objects.create(
+            title='Frontend Engineer', company_name='Beta', location='Remote',
+            description='Single page apps', requirements='React, TypeScript',
+            posted_by=self.recruiter,
+        )
+
+    def search(self, term):
+        response = self.client.get('/jobs/', {'search': term})
+        self.assertEqual(response.status_code, 200)
+        return list(response.context['template_data']['jobs'])
+
+    def test_search_matches_indexed_text(self):
+        self.assertEqual(self.search('django'), [self.django_job])
+        self.assertEqual(self.search('engin'), [self.react_job, self.django_job])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.react_job.requirements = 'React, Django REST'
+        self.react_job.save()
+        self.assertCountEqual(self.search('django'), [self.django_job, self.react_job])
+
+        self.react_job.is_active = False
+        self.react_job.save()
+        self.assertEqual(self.search('django'), [self.django_job])
+
+        self.django_job.delete()
+        self.assertEqual(self.search('django'), [])
+
+    def test_results_ordered_by_relevance(self):
+        Job.objects.create(
+            title='Django Django Developer', company_name='Gamma', location='Remote',
+            description='Django everywhere', requirements='Django',
+            posted_by=self.recruiter,
+        )
+        self.assertEqual(self.search('django')[0].company_name, 'Gamma')
+
+    def test_index_is_joined_once(self):
+        from .search import FTS_TABLE, _tsquery, search_jobs
+
+        sql = str(search_jobs(Job.objects.all(), 'backend django').query)
+        self.assertEqual(sql.count(f'{FTS_TABLE} MATCH'), 1)
+        self.assertEqual(_tsquery('Backend, Djan'), 'backend:* & djan:*')
+
+
+class JobSkillFilterTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username='rec', password='pass')
+        self.backend = Job.objects.create(
+            title='Backend', company_name='Acme', location='Remote',
+            skills_required='Python, Django', requirements='PostgreSQL',
+            posted_by=self.recruiter,
+        )
+        self.fullstack = Job.objects.create(
+            title='Fullstack', company_name='Beta', location='Remote',
+            skills_required='python; React', posted_by=self.recruiter,
+        )
+
+    def filter(self, skills, mode=''):
+        response = self.client.get('/jobs/', {'skills': skills, 'skills_match': mode})
+        return set(response.context['template_data']['jobs'])
+
+    def test_tokens_synced_on_save(self):
+        self.assertEqual(
+            set(self.backend.skill_tokens.values_list('name', flat=True)),
+            {'python', 'django', 'postgresql'},
+        )
+        self.backend.skills_required = 'Python'
+        self.backend.save()
+        self.assertEqual(
+            set(self.backend.skill_tokens.values_list('name', flat=True)),
+            {'python', 'postgresql'},
+        )
+
+    def test_requirements_prose_is_indexed_by_dictionary_skills(self):
+        job = Job.objects.create(
+            title='Data', company_name='Gamma', location='Remote',
+            requirements='3+ years of Python experience\nComfortable with ReactJS', posted_by=self.recruiter,
+        )
+        self.assertEqual(set(job.skill_tokens.values_list('name', flat=True)), {'python', 'react'})
+        job.description = 'Our stack is Django on AWS.'
+        job.save()
+        self.assertEqual(set(job.skill_tokens.values_list('name', flat=True)),
+                         {'python', 'react', 'django', 'aws'})
+        self.assertIn(job, self.filter('python'))
+        self.assertEqual(self.filter('reactjs'), {self.fullstack, job})
+
+    def test_any_and_all_modes(self):
+        self.assertEqual(self.filter('Django, React'), {self.backend, self.fullstack})
+        self.assertEqual(self.filter('Python, React', 'all'), {self.fullstack})
+        self.assertEqual(self.filter('Java'), set())
+
+
+class JobChangeTrackingTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username='rec', password='pass')
+        self.job = Job.objects.create(title='Backend', company_name='Acme', location='Remote',
+                                      skills_required='Python', posted_by=self.recruiter)
+
+    def test_unrelated_edit_is_a_single_update(self):
+        job = Job.objects.get(pk=self.job.pk)
+        job.salary_min = 100000
+        with self.assertNumQueries(1) as ctx:
+            job.save()
+        self.assertTrue(ctx.captured_queries[0]['sql'].startswith('UPDATE'))
+        self.assertNotIn('"description"', ctx.captured_queries[0]['sql'])
+
+
+class JobGeoQueryTests(TestCase):
+    def setUp(self):
+        recruiter = User.objects.create_user(username='rec', password='pass')
+        self.jobs = {}
+        for name, lat, lng in [('nyc', 40.7128, -74.0060), ('newark', 40.7357, -74.1724),
+                               ('philly', 39.9526, -75.1652), ('la', 34.0522, -118.2437),
+                               ('suva', -18.1416, 178.4419), ('apia', -13.8333, -171.7500)]:
+            self.jobs[name] = Job.objects.create(
+                title=name, company_name='Acme', location=f'{name} office',
+                latitude=lat, longitude=lng, posted_by=recruiter,
+            )
+
+    def geo(self, **params):
+        response = self.client.get('/jobs/api/geo-jobs/', params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.getvalue())['jobs']
+
+    def test_geohash_follows_coordinates(self):
+        from geocoding.geohash import encode
+
+        job = self.jobs['nyc']
+        self.assertEqual(job.geohash, encode(40.7128, -74.0060))
+        self.assertTrue(job.geohash.startswith('dr5r'))
+        job.location = 'Remote'
+        job.save()
+        self.assertEqual(Job.objects.get(pk=job.pk).geohash, '')
+
+    def test_radius_query_is_refined_and_sorted_by_distance(self):
+        jobs = self.geo(lat=40.72, lng=-74.0, radius_km=25)
+        self.assertEqual([j['title'] for j in jobs], ['nyc', 'newark'])
+        self.assertLess(jobs[0]['distance_km'], 2)
+
+        titles = [j['title'] for j in self.geo(lat=40.72, lng=-74.0, radius_km=200)]
+        self.assertEqual(titles, ['nyc', 'newark', 'philly'])
+
+    def test_bbox_query_including_the_antimeridian(self):
+        self.assertCountEqual([j['title'] for j in self.geo(bbox='-76,39,-73,41')], ['nyc', 'newark', 'philly'])
+        self.assertCountEqual([j['title'] for j in self.geo(bbox='170,-25,190,-10')], ['suva', 'apia'])
+        self.assertEqual(len(self.geo()), 6)
+
+    def test_feed_is_projected_and_conditional(self):
+        with self.assertNumQueries(2) as ctx:
+            response = self.client.get('/jobs/api/geo-jobs/')
+            jobs = json.loads(response.getvalue())['jobs']
+        self.assertNotIn('"description"', ctx.captured_queries[1]['sql'])
+        self.assertEqual(jobs[0]['url'], f'/jobs/{self.jobs["nyc"].pk}/')
+        etag = response['ETag']
+
+        self.assertEqual(self.client.get('/jobs/api/geo-jobs/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.jobs['la'].title = 'los angeles'
+        self.jobs['la'].save()
+        response = self.client.get('/jobs/api/geo-jobs/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_feed_rows_are_read_as_the_response_streams(self):
+        from unittest import mock
+
+        from . import views
+
+        pulled = []
+
+        def rows():
+            for job in self.jobs.values():
+                pulled.append(job.pk)
+                yield (job.pk, job.title, job.company_name, job.location, job.latitude, job.longitude, False)
+
+        with mock.patch.object(views, 'GEO_STREAM_BATCH', 2):
+            stream = views._stream_jobs(views._geo_items(views._start(rows())))
+            self.assertEqual(len(pulled), 1)  # the query has run, nothing more is read
+            self.assertEqual(next(stream), '{"jobs": [')
+            next(stream)
+            self.assertEqual(len(pulled), 2)
+            self.assertEqual(list(stream)[-1], ']}')
+            self.assertEqual(len(pulled), len(self.jobs))
+
+    @override_settings(QUERY_BUDGET_ACTION='raise')
+    def test_streamed_feed_queries_count_against_the_budget(self):
+        from unittest import mock
+
+        from monitoring.middleware import QueryBudgetExceeded
+        from . import views
+
+        # The ETag aggregate plus the feed's SELECT
+        with mock.patch.object(views.jobs_geo_json, 'query_budget', 1), \
+                self.assertRaisesMessage(QueryBudgetExceeded, 'ran 2 queries, budget is 1'):
+            self.client.get('/jobs/api/geo-jobs/')
+
+    def test_invalid_parameters(self):
+        for params in ({'lat': 40}, {'lat': 'x', 'lng': 1, 'radius_km': 5},
+                       {'lat': 40, 'lng': -74, 'radius_km': -1}, {'bbox': '1,2,3'}):
+            response = self.client.get('/jobs/api/geo-jobs/', params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+class GenerateFakeDataTests(TestCase):
+    def generate(self, prefix):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('generate_fake_data', jobs=40, profiles=30, recruiters=3, applications=60,
+                         messages=50, prefix=prefix, stdout=StringIO())
+        # Generated timestamps go in with the INSERT, not a second pass
+        self.assertFalse([q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "jobs_job"')])
+        return list(Job.objects.filter(posted_by__username__startswith=f'{prefix}_')
+                    .order_by('pk').values_list('title', 'location', 'skills_required', 'created_at', 'updated_at'))
+
+    def test_generates_requested_volumes_deterministically(self):
+        from applications.models import Application
+        from geocoding.models import GeocodeTask
+        from messaging.models import InternalMessage
+        from profiles.models import Profile
+        from recommendations.models import CandidateFeatureRecord
+        from .models import JobSkill
+        from .search import search_jobs
+
+        first = self.generate('a')
+        self.assertEqual(len(first), 40)
+        self.assertEqual(Profile.objects.filter(user_type='regular').count(), 30)
+        self.assertEqual(Application.objects.count(), 60)
+        self.assertEqual(InternalMessage.objects.count(), 50)
+        self.assertFalse(GeocodeTask.objects.exists())
+        self.assertFalse(Job.objects.filter(is_remote=False, latitude__isnull=True).exists())
+
+        # Derived indexes are filled in as if the rows had been saved one by one
+        self.assertTrue(JobSkill.objects.exists())
+        self.assertEqual(CandidateFeatureRecord.objects.count(), Profile.objects.count())
+        self.assertTrue(search_jobs(Job.objects.all(), first[0][0]).exists())
+
+        # Timestamps come from the fixed --now, and the models keep stamping their own saves
+        self.assertLessEqual(max(row[3] for row in first), datetime(2025, 1, 1, tzinfo=dt_timezone.utc))
+        self.assertTrue(Job._meta.get_field('updated_at').auto_now)
+        self.assertEqual(self.generate('b'), first)
+
+
+class JobClusterTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username='rec', password='pass')
+
+    def create_job(self, title, lat, lng, **kwargs):
+        return Job.objects.create(title=title, company_name='Acme', location=f'{title} office',
+                                  latitude=lat, longitude=lng, posted_by=self.recruiter, **kwargs)
+
+    def clusters(self, z, bbox=None):
+        params = {'z': z, 'bbox': bbox} if bbox else {'z': z}
+        response = self.client.get('/jobs/api/geo-clusters/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def assert_matches_rebuild(self):
+        from .clusters import rebuild_clusters
+        from .models import JobCluster
+
+        fields = ('precision', 'cell', 'count', 'sample_ids')
+        incremental = sorted(JobCluster.objects.values_list(*fields))
+        rebuild_clusters()
+        self.assertEqual(incremental, sorted(JobCluster.objects.values_list(*fields)))
+
+    def test_saves_and_deletes_keep_clusters_in_sync(self):
+        nyc = self.create_job('nyc', 40.7128, -74.0060)
+        newark = self.create_job('newark', 40.7357, -74.1724)
+        la = self.create_job('la', 34.0522, -118.2437)
+        self.create_job('remote', None, None, is_remote=True)
+        self.assert_matches_rebuild()
+
+        world = self.clusters(0)['clusters']
+        self.assertEqual(sum(c['count'] for c in world), 3)
+        east = self.clusters(6, '-76,39,-73,41')['clusters']
+        self.assertEqual([(c['count'], sorted(c['sample_ids'])) for c in east], [(2, [nyc.pk, newark.pk])])
+        self.assertAlmostEqual(east[0]['latitude'], (40.7128 + 40.7357) / 2)
+
+        newark.is_active = False
+        newark.save()
+        la.latitude, la.longitude = 47.6062, -122.3321
+        la.save()
+        nyc.delete()
+        self.assert_matches_rebuild()
+        self.assertEqual(self.clusters(6, '-76,39,-73,41')['clusters'], [])
+        self.assertEqual([c['sample_ids'] for c in self.clusters(0)['clusters']], [[la.pk]])
+
+    @override_settings(GEOCODER_BACKEND='geocoding.backends.StubGeocoder')
+    def test_geocode_worker_adds_the_job_to_clusters(self):
+        from geocoding.queue import process_due_tasks
+        from geocoding.services import clear_memory_cache
+
+        clear_memory_cache()
+        job = Job.objects.create(title='atl', company_name='Acme', location='Atlanta, GA', posted_by=self.recruiter)
+        self.assertEqual(self.clusters(0)['clusters'], [])
+        process_due_tasks()
+        self.assertEqual([c['sample_ids'] for c in self.clusters(0)['clusters']], [[job.pk]])
+        self.assert_matches_rebuild()
+
+    def test_samples_are_refilled_as_jobs_leave(self):
+        jobs = [self.create_job(f'nyc{i}', 40.7128 + i / 1000, -74.0060) for i in range(7)]
+        jobs[0].delete()
+        jobs[1].is_active = False
+        jobs[1].save()
+        self.assertEqual(self.clusters(0)['clusters'][0]['sample_ids'], [job.pk for job in jobs[2:]])
+        self.assert_matches_rebuild()
+
+    def test_cluster_created_by_a_concurrent_move_is_added_to(self):
+        from . import clusters
+
+        self.create_job('nyc', 40.7128, -74.0060)
+        lock = clusters._lock_clusters
+        calls = []
+
+        def miss_first(keys):
+            calls.append(keys)
+            return {} if len(calls) == 1 else lock(keys)
+
+        with mock.patch.object(clusters, '_lock_clusters', side_effect=miss_first):
+            newark = self.create_job('newark', 40.7357, -74.1724)
+        self.assertEqual(len(calls), 2)
+        east = self.clusters(6, '-76,39,-73,41')['clusters']
+        self.assertEqual([c['count'] for c in east], [2])
+        self.assertIn(newark.pk, east[0]['sample_ids'])
+
+    def test_individual_jobs_at_high_zoom(self):
+        self.create_job('nyc', 40.7128, -74.0060)
+        self.create_job('la', 34.0522, -118.2437)
+        data = self.clusters(15, '-74.05,40.68,-73.95,40.76')
+        self.assertEqual(data['clusters'], [])
+        self.assertEqual([j['title'] for j in data['jobs']], ['nyc'])
+        self.assertFalse(data['truncated'])
+
+        self.create_job('brooklyn', 40.6782, -73.9442)
+        with mock.patch('jobs.views.MAX_MAP_JOBS', 1):
+            data = self.clusters(15, '-74.05,40.6,-73.9,40.76')
+        self.assertEqual([j['title'] for j in data['jobs']], ['nyc'])
+        self.assertTrue(data['truncated'])
+
+        for params in ({}, {'z': 'x'}, {'z': 3, 'bbox': '1,2'}):
+            response = self.client.get('/jobs/api/geo-clusters/', params)
+            self.assertEqual(response.status_code, 400, params)
@@ -11,4 +11,5 @@ urlpatterns = [
     path('<int:id>/delete/', views.delete_job, name='jobs.delete'),
     path('map/', views.map_view, name='jobs.map'),
     path('api/geo-jobs/', views.jobs_geo_json, name='jobs.geo_json'),
+    path('api/geo-clusters/', views.jobs_geo_clusters, name='jobs.geo_clusters'),
 ]
\ No newline at end of file
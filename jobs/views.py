@@ -1,17 +1,28 @@
+import itertools
+import json
+import operator
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Count, Max, Q
 from django.http import HttpResponseForbidden
 
+from .clusters import MAPPABLE, MAX_CLUSTER_ZOOM, clusters_in_bbox
 from .models import Job
 from .forms import JobForm, JobSearchForm
+from .geo import jobs_in_bbox, jobs_near, parse_area, within_radius
+from .search import search_jobs
+from .skills import filter_jobs_by_skills
 from profiles.models import Profile
+from monitoring.decorators import query_budget
 from django.contrib.auth.models import User
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.urls import reverse
+from django.views.decorators.http import condition
 
+@query_budget(6)
 def index(request):
     """Display all job postings with enhanced search and filtering capabilities"""
     jobs = Job.objects.filter(is_active=True)
@@ -33,20 +44,13 @@ def index(request):
         
         # Apply filters
         if search_term:
-            jobs = jobs.filter(
-                Q(title__icontains=search_term) |
-                Q(company_name__icontains=search_term) |
-                Q(description__icontains=search_term) |
-                Q(requirements__icontains=search_term)
-            )
+            # Full-text index lookup, ranked by relevance (see jobs/search.py)
+            jobs = search_jobs(jobs, search_term)
         
         if skills:
-            # Split skills and search for any of them in the requirements field
-            skill_list = [skill.strip() for skill in skills.split(',') if skill.strip()]
-            skill_query = Q()
-            for skill in skill_list:
-                skill_query |= Q(requirements__icontains=skill)
-            jobs = jobs.filter(skill_query)
+            # Indexed JobSkill lookup; "any" or "all" of the comma-separated skills
+            skills_match = search_form.cleaned_data.get('skills_match') or 'any'
+            jobs = filter_jobs_by_skills(jobs, skills, mode=skills_match)
         
         if location:
             # Enhanced location search
@@ -73,8 +77,11 @@ def index(request):
         if visa_sponsorship:
             jobs = jobs.filter(visa_sponsorship=True)
     
-    # Order by most recent
-    jobs = jobs.order_by('-created_at')
+    # Order by relevance when searching, otherwise by most recent
+    if search_form.is_valid() and search_form.cleaned_data.get('search'):
+        jobs = jobs.order_by('search_rank', '-created_at')
+    else:
+        jobs = jobs.order_by('-created_at')
     
     # Pagination
     paginator = Paginator(jobs, 9)  # 9 jobs per page (3x3 grid)
@@ -207,6 +214,7 @@ def delete_job(request, id):
     return render(request, 'jobs/delete_job.html', {'template_data': template_data})
 
 
+@query_budget(8)
 @login_required
 def recommendations(request):
     """Recommend jobs to job seekers based on their profile skills.
@@ -283,31 +291,131 @@ def map_view(request):
     return render(request, 'jobs/map.html', {'template_data': template_data})
 
 
+# Columns of the map feed; the TextFields of a job are never loaded
+GEO_FIELDS = ('id', 'title', 'company_name', 'location', 'latitude', 'longitude', 'is_remote')
+# Jobs encoded per chunk of the streamed feed
+GEO_STREAM_BATCH = 500
+# Individual jobs returned for one viewport past MAX_CLUSTER_ZOOM
+MAX_MAP_JOBS = 500
+
+
+def geo_jobs_etag(request):
+    """Changes whenever a job is added to, changed on or removed from the map."""
+    stats = Job.objects.filter(MAPPABLE).aggregate(count=Count('id'), updated=Max('updated_at'))
+    updated = stats['updated'].timestamp() if stats['updated'] else 0
+    return f'"{stats["count"]}-{updated:.6f}"'
+
+
+def _geo_items(rows, distances=None):
+    """Feed items for ``GEO_FIELDS`` tuples, with each job's detail URL (and distance)."""
+    prefix, suffix = reverse('jobs.show', args=[0]).rsplit('0', 1)
+    for i, row in enumerate(rows):
+        item = dict(zip(GEO_FIELDS, row))
+        item['url'] = f'{prefix}{item["id"]}{suffix}'
+        if distances is not None:
+            item['distance_km'] = round(distances[i], 3)
+        yield item
+
+
+def _start(rows):
+    """Run the query behind the lazy ``rows`` now; the rest is fetched as it streams."""
+    rows = iter(rows)
+    first = next(rows, None)
+    return iter(()) if first is None else itertools.chain([first], rows)
+
+
+def _stream_jobs(items):
+    """Encode ``{"jobs": [...]}`` a batch of jobs at a time."""
+    yield '{"jobs": ['
+    separator = ''
+    batch = []
+    for item in items:
+        batch.append(json.dumps(item))
+        if len(batch) == GEO_STREAM_BATCH:
+            yield separator + ', '.join(batch)
+            separator = ', '
+            batch = []
+    if batch:
+        yield separator + ', '.join(batch)
+    yield ']}'
+
+
+@query_budget(3)
+@condition(etag_func=geo_jobs_etag)
 def jobs_geo_json(request):
-    """Return JSON list of active jobs with coordinates for map display.
+    """Stream the JSON list of active jobs with coordinates for map display.
     
     Excludes remote jobs since they don't have a physical location.
+    With ``lat``, ``lng`` and ``radius_km`` only jobs within the radius are
+    returned, nearest first and with their ``distance_km``; with
+    ``bbox=west,south,east,north`` only jobs inside the box. Responses
+    carry an ETag (``geo_jobs_etag``) and unchanged maps get a 304.
+
+    The query is started here, so it runs under the request's middleware
+    (query budget, metrics, slow-query log, profiler); its rows are then
+    read GEO_STREAM_BATCH at a time from the cursor while the response is
+    encoded, so memory stays flat however many jobs there are. Radius
+    results are sorted by distance and so are read in full.
     """
+    try:
+        area = parse_area(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
     # Only include non-remote jobs with valid coordinates
-    jobs = Job.objects.filter(
-        is_active=True,
-        is_remote=False
-    ).exclude(
-        latitude__isnull=True
-    ).exclude(
-        longitude__isnull=True
-    )
-    
-    data = []
-    for job in jobs:
-        data.append({
-            'id': job.id,
-            'title': job.title,
-            'company_name': job.company_name,
-            'location': job.location,
-            'latitude': job.latitude,
-            'longitude': job.longitude,
-            'is_remote': job.is_remote,
-            'url': reverse('jobs.show', args=[job.id])
+    jobs = Job.objects.filter(MAPPABLE)
+
+    if area and area[0] == 'bbox':
+        rows = jobs_in_bbox(jobs, area[1]).order_by('pk').values_list(*GEO_FIELDS)
+        items = _geo_items(_start(rows.iterator(chunk_size=GEO_STREAM_BATCH)))
+    elif area:
+        lat, lng, radius_km = area[1]
+        matches = within_radius(
+            jobs_near(jobs, lat, lng, radius_km).values_list(*GEO_FIELDS), lat, lng, radius_km,
+            coordinates=operator.itemgetter(GEO_FIELDS.index('latitude'), GEO_FIELDS.index('longitude')),
+        )
+        items = _geo_items([row for row, _ in matches], [distance for _, distance in matches])
+    else:
+        rows = jobs.order_by('pk').values_list(*GEO_FIELDS)
+        items = _geo_items(_start(rows.iterator(chunk_size=GEO_STREAM_BATCH)))
+    return StreamingHttpResponse(_stream_jobs(items), content_type='application/json')
+
+
+@query_budget(2)
+def jobs_geo_clusters(request):
+    """Return the map markers for zoom level ``z`` inside ``bbox=west,south,east,north``.
+
+    Up to ``MAX_CLUSTER_ZOOM`` these are precomputed clusters (count,
+    centroid and a few sample job ids); closer in, the individual jobs in
+    the same format as ``jobs_geo_json``, at most ``MAX_MAP_JOBS`` of them
+    (``truncated`` tells the map to zoom in further for the rest).
+    """
+    try:
+        zoom = int(request.GET.get('z', ''))
+        if zoom < 0:
+            raise ValueError
+    except ValueError:
+        return JsonResponse({'error': 'z must be a zoom level (0 or more)'}, status=400)
+    try:
+        area = parse_area({'bbox': request.GET.get('bbox') or '-180,-90,180,90'})
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    bbox = area[1]
+
+    if zoom > MAX_CLUSTER_ZOOM:
+        rows = jobs_in_bbox(Job.objects.filter(MAPPABLE), bbox).order_by('pk').values_list(*GEO_FIELDS)
+        jobs = list(_geo_items(rows[:MAX_MAP_JOBS + 1]))
+        return JsonResponse({'zoom': zoom, 'clusters': [], 'jobs': jobs[:MAX_MAP_JOBS],
+                             'truncated': len(jobs) > MAX_MAP_JOBS})
+
+    clusters = []
+    for cluster in clusters_in_bbox(bbox, zoom):
+        lat, lng = cluster.centroid
+        clusters.append({
+            'cell': cluster.cell,
+            'count': cluster.count,
+            'latitude': lat,
+            'longitude': lng,
+            'sample_ids': cluster.sample_ids,
         })
-    return JsonResponse({'jobs': data})
+    return JsonResponse({'zoom': zoom, 'clusters': clusters, 'jobs': [], 'truncated': False})
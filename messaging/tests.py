@@ -268,4 +268,42 @@ class InternalMessagingTestCase(TestCase):
         response = self.client.get(reverse('messaging:get_unread_count'))
         self.assertEqual(response.status_code, 200)
         data = response.json()
-        self.assertEqual(data['unread_count'], 1)
\ No newline at end of file
+        self.assertEqual(data['unread_count'], 1)
+
+class InboxQueryTests(TestCase):
+    def setUp(self):
+        # The profile is created by the User post_save signal
+        self.recruiter = User.objects.create_user(username='recruiter', password='testpass123')
+        self.recruiter.profile.user_type = 'recruiter'
+        self.recruiter.profile.save()
+
+    def start_conversations(self, start, stop):
+        for i in range(start, stop):
+            other = User.objects.create_user(username=f'seeker{i}')
+            conversation = Conversation.objects.create()
+            conversation.participants.add(self.recruiter, other)
+            for content in ('Hello', f'Reply {i}'):
+                InternalMessage.objects.create(
+                    conversation=conversation, sender=other, recipient=self.recruiter,
+                    content=content, message_type='text',
+                )
+
+    def test_inbox_runs_a_fixed_number_of_queries(self):
+        """The inbox annotates every conversation instead of querying per row."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.login(username='recruiter', password='testpass123')
+        self.start_conversations(0, 2)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(reverse('messaging:internal_messages'))
+        self.start_conversations(2, 8)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(reverse('messaging:internal_messages'))
+
+        self.assertEqual(len(many), len(few))
+        conversations = response.context['conversations']
+        self.assertEqual(len(conversations), 8)
+        first = next(c for c in conversations if c.other_participant.username == 'seeker1')
+        self.assertEqual(first.unread_count, 2)
+        self.assertEqual(first.latest_message.content, 'Reply 1')
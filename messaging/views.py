@@ -4,11 +4,13 @@ from django.contrib import messages
 from django.core.paginator import Paginator
 from django.core.mail import send_mail
 from django.conf import settings
-from django.db.models import Q
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.http import JsonResponse
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.db import transaction
+from monitoring.decorators import query_budget
 from .models import EmailMessage, Conversation, InternalMessage, MessageNotification
 from .forms import EmailCandidateForm, ReplyEmailForm, EmailSearchForm, InternalMessageForm, ConversationSearchForm, StartConversationForm
 
@@ -193,6 +195,7 @@ def mark_email_read(request, email_id):
 
 # Internal Messaging Views
 
+@query_budget(8)
 @login_required
 def internal_messages(request):
     """View for internal messaging inbox."""
@@ -202,7 +205,7 @@ def internal_messages(request):
     conversations = Conversation.objects.filter(
         participants=request.user,
         is_active=True
-    ).prefetch_related('participants', 'messages').order_by('-updated_at')
+    ).select_related('related_job').prefetch_related('participants').order_by('-updated_at')
     
     # Apply search filters
     if search_form.is_valid():
@@ -232,15 +235,27 @@ def internal_messages(request):
             ).values_list('conversation_id', flat=True).distinct()
             conversations = conversations.filter(id__in=unread_conversation_ids)
     
-    # Add unread counts and latest messages
-    conversation_list = []
-    for conversation in conversations:
-        conversation.unread_count = conversation.get_unread_count(request.user)
-        conversation.latest_message = conversation.get_latest_message()
-        conversation.other_participant = conversation.get_other_participant(request.user)
-        # Only include conversations that have messages
-        if conversation.latest_message:
-            conversation_list.append(conversation)
+    # Add unread counts and latest messages with subqueries rather than
+    # per-conversation queries; only include conversations that have messages
+    conversation_messages = InternalMessage.objects.filter(conversation=OuterRef('pk'))
+    conversations = conversations.annotate(
+        unread_count=Coalesce(Subquery(
+            conversation_messages.filter(read_at__isnull=True).exclude(sender=request.user)
+            .values('conversation').annotate(n=Count('pk')).values('n')
+        ), 0),
+        latest_message_id=Subquery(
+            conversation_messages.order_by('-created_at', '-pk').values('pk')[:1]
+        ),
+    ).filter(latest_message_id__isnull=False)
+    conversation_list = list(conversations)
+    latest_messages = InternalMessage.objects.select_related('sender').in_bulk(
+        [conversation.latest_message_id for conversation in conversation_list]
+    )
+    for conversation in conversation_list:
+        conversation.latest_message = latest_messages[conversation.latest_message_id]
+        conversation.other_participant = next(
+            (user for user in conversation.participants.all() if user.pk != request.user.pk), None
+        )
     
     context = {
         'conversations': conversation_list,
@@ -0,0 +1,65 @@
+from django.contrib import admin
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+
+from .models import ProfileCapture
+
+
+@admin.register(ProfileCapture)
+class ProfileCaptureAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'method', 'path', 'url_name', 'status_code', 'duration_ms',
+                    'query_count', 'sql_ms', 'trigger', 'user']
+    list_filter = ['trigger', 'url_name']
+    search_fields = ['path', 'url_name']
+    date_hierarchy = 'created_at'
+    fields = ['created_at', 'user', 'trigger', 'method', 'path', 'url_name', 'status_code',
+              'duration_ms', 'query_count', 'sql_ms', 'download', 'summary_text', 'timeline']
+    readonly_fields = fields
+
+    def get_queryset(self, request):
+        # The pstats dumps are only read by the download view
+        return super().get_queryset(request).defer('stats')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path('<int:pk>/download/', self.admin_site.admin_view(self.download_view),
+                 name='monitoring_profilecapture_download'),
+        ] + super().get_urls()
+
+    def download_view(self, request, pk):
+        if not self.has_view_permission(request):
+            return HttpResponse(status=403)
+        capture = get_object_or_404(ProfileCapture, pk=pk)
+        response = HttpResponse(bytes(capture.stats), content_type='application/octet-stream')
+        response['Content-Disposition'] = f'attachment; filename="capture-{capture.pk}.prof"'
+        return response
+
+    @admin.display(description='pstats dump')
+    def download(self, obj):
+        url = reverse('admin:monitoring_profilecapture_download', args=[obj.pk])
+        return format_html('<a href="{}">capture-{}.prof</a> (open with <code>python -m pstats</code> or snakeviz)',
+                           url, obj.pk)
+
+    @admin.display(description='Top functions')
+    def summary_text(self, obj):
+        return format_html('<pre style="white-space: pre; overflow-x: auto">{}</pre>', obj.summary)
+
+    @admin.display(description='SQL timeline')
+    def timeline(self, obj):
+        rows = format_html_join(
+            '\n', '<tr><td>{}</td><td>{}</td><td><code>{}</code></td><td>{}</td></tr>',
+            ((entry['start_ms'], entry['duration_ms'], entry['sql'], entry['call_site'] or '')
+             for entry in obj.sql_timeline),
+        )
+        return format_html(
+            '<table><thead><tr><th>start ms</th><th>ms</th><th>SQL</th><th>call site</th></tr></thead>'
+            '<tbody>{}</tbody></table>', rows,
+        )
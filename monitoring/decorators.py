@@ -0,0 +1,9 @@
+def query_budget(max_queries):
+    """Declare the most queries a view may run per request, session and auth lookups included.
+
+    Enforced by ``monitoring.middleware.QueryBudgetMiddleware``.
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
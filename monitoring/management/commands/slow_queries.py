@@ -0,0 +1,52 @@
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.slowlog import log_path, read_entries
+
+
+class Command(BaseCommand):
+    help = "Summarize the slow-query log: the statements that cost the most time, by call site."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20,
+                            help='Number of statements to show (default: 20)')
+        parser.add_argument('--file', default=None,
+                            help='Log file to read (default: settings.SLOW_QUERY_LOG)')
+        parser.add_argument('--url-name', default=None,
+                            help='Only count statements run by this URL name')
+        parser.add_argument('--sort', choices=['total', 'count', 'max'], default='total',
+                            help='Order by total time, number of occurrences or slowest run (default: total)')
+
+    def handle(self, *args, **options):
+        path = options['file'] or log_path()
+        if path is None:
+            raise CommandError("No log file: set SLOW_QUERY_LOG or pass --file.")
+
+        groups = defaultdict(lambda: {'count': 0, 'total': 0.0, 'max': 0.0, 'urls': Counter(), 'params': None})
+        for entry in read_entries(path):
+            if options['url_name'] and entry.get('url_name') != options['url_name']:
+                continue
+            group = groups[entry['shape'], entry.get('call_site')]
+            group['count'] += 1
+            group['total'] += entry['duration_ms']
+            if entry['duration_ms'] >= group['max']:
+                group['max'] = entry['duration_ms']
+                group['params'] = entry.get('params')
+            group['urls'][entry.get('url_name') or '-'] += 1
+
+        if not groups:
+            self.stdout.write("No slow queries logged.")
+            return
+
+        ranked = sorted(groups.items(), key=lambda item: item[1][options['sort']], reverse=True)
+        for rank, ((shape, site), group) in enumerate(ranked[:options['top']], 1):
+            urls = ', '.join(f'{name} ({count})' for name, count in group['urls'].most_common(3))
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{rank}. {group['total']:.0f} ms total, {group['count']} x, "
+                f"avg {group['total'] / group['count']:.1f} ms, max {group['max']:.1f} ms"
+            ))
+            self.stdout.write(f"   at   {site or '<unknown>'}")
+            self.stdout.write(f"   urls {urls}")
+            self.stdout.write(f"   sql  {shape}")
+            self.stdout.write(f"   slowest params {group['params']}")
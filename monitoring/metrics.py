@@ -0,0 +1,211 @@
+"""
+Per-view request metrics in the Prometheus text format.
+
+``MetricsMiddleware`` records, per URL name: request counts by method and
+status, a latency histogram, a histogram of SQL queries per request and
+the total time spent in SQL (measured with ``connection.execute_wrapper``).
+
+Metrics are aggregated in the process. When several processes serve the
+site (gunicorn workers), set ``METRICS_MULTIPROCESS_DIR``: every process
+then also dumps its metrics to a file in that directory (at most every
+``METRICS_FLUSH_INTERVAL`` seconds) and ``/metrics`` sums all the files.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# name -> (type, help, buckets)
+METRICS = {
+    'jobby_http_requests_total': ('counter', 'Requests by view, method and status.', None),
+    'jobby_http_request_duration_seconds': ('histogram', 'Request latency by view.', LATENCY_BUCKETS),
+    'jobby_http_request_queries': ('histogram', 'SQL queries per request by view.', QUERY_BUCKETS),
+    'jobby_http_request_sql_seconds_total': ('counter', 'Time spent in SQL by view.', None),
+}
+
+UNRESOLVED = '<unresolved>'
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by metric name and labels.
+
+    Counters map ``(name, labels)`` to a value; histograms map it to
+    ``[bucket counts..., +Inf count, sum]`` with non-cumulative buckets.
+    ``labels`` is a tuple of ``(label, value)`` pairs.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+
+    def inc(self, name, labels, amount=1):
+        with self.lock:
+            self.counters[name, labels] += amount
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        with self.lock:
+            hist = self.histograms.get((name, labels))
+            if hist is None:
+                hist = self.histograms[name, labels] = [0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    break
+            else:
+                i = len(buckets)
+            hist[i] += 1
+            hist[-1] += value
+
+    def dump(self):
+        """A JSON-serializable snapshot."""
+        with self.lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, list(labels), list(hist)] for (name, labels), hist in self.histograms.items()],
+            }
+
+    def merge(self, snapshot):
+        """Add a ``dump()`` (of another process) to this registry."""
+        with self.lock:
+            for name, labels, value in snapshot['counters']:
+                self.counters[name, tuple(map(tuple, labels))] += value
+            for name, labels, values in snapshot['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                hist = self.histograms.setdefault(key, [0] * len(values))
+                for i, value in enumerate(values):
+                    hist[i] += value
+
+    def render(self):
+        """The registry in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name, (kind, help_text, buckets) in METRICS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                if kind == 'counter':
+                    for (metric, labels), value in sorted(self.counters.items()):
+                        if metric == name:
+                            lines.append(f'{name}{_labels(labels)} {_number(value)}')
+                    continue
+                for (metric, labels), hist in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(buckets + ('+Inf',), hist):
+                        cumulative += count
+                        le = bound if bound == '+Inf' else _number(bound)
+                        lines.append(f'{name}_bucket{_labels(labels + (("le", le),))} {cumulative}')
+                    lines.append(f'{name}_sum{_labels(labels)} {_number(hist[-1])}')
+                    lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+registry = MetricsRegistry()
+
+
+# -- multiprocess files --------------------------------------------------------
+
+_last_flush = [0.0]
+
+
+def multiprocess_dir():
+    path = getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+    return Path(path) if path else None
+
+
+def flush(force=False):
+    """Write this process's metrics to the multiprocess directory (if configured)."""
+    directory = multiprocess_dir()
+    if directory is None:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush[0] < getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0):
+        return
+    _last_flush[0] = now
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / f'metrics-{os.getpid()}.json'
+    tmp = target.with_suffix(f'.tmp{threading.get_ident()}')
+    tmp.write_text(json.dumps(registry.dump()))
+    os.replace(tmp, target)
+
+
+def collect():
+    """The metrics to expose: this process's, or the sum over every process's file."""
+    directory = multiprocess_dir()
+    if directory is None:
+        return registry
+    flush(force=True)
+    combined = MetricsRegistry()
+    for path in sorted(directory.glob('metrics-*.json')):
+        try:
+            combined.merge(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue  # being replaced, or left half-written by a killed worker
+    return combined
+
+
+# -- middleware ----------------------------------------------------------------
+
+class _SqlTimer:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = _SqlTimer()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(timer):
+                response = self.get_response(request)
+        except Exception:
+            self.record(request, 500, start, timer)
+            raise
+        self.record(request, response.status_code, start, timer)
+        return response
+
+    def record(self, request, status, start, timer):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else None) or UNRESOLVED
+        labels = (('view', view),)
+        registry.inc('jobby_http_requests_total', labels + (('method', request.method), ('status', str(status))))
+        registry.observe('jobby_http_request_duration_seconds', labels, time.perf_counter() - start)
+        registry.observe('jobby_http_request_queries', labels, timer.count)
+        registry.inc('jobby_http_request_sql_seconds_total', labels, timer.duration)
+        flush()
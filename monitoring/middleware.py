@@ -0,0 +1,66 @@
+"""
+Query budgets for views.
+
+``QueryBudgetMiddleware`` records every statement a request runs. When the
+view declares a budget with ``monitoring.decorators.query_budget(n)`` (or
+``QUERY_BUDGET_DEFAULT`` is set) and the request ran more than ``n``
+queries, it logs a warning or raises ``QueryBudgetExceeded``
+(``QUERY_BUDGET_ACTION = 'raise'``). Either way, statements repeated
+``QUERY_REPEAT_THRESHOLD`` times from the same line are reported as
+likely N+1 queries.
+
+It is meant for development and tests: it is only installed when
+``QUERY_BUDGET_ENABLED`` (``DEBUG`` by default) is true.
+"""
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .sql import QueryRecorder
+
+logger = logging.getLogger('monitoring.queries')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def _describe(repeated):
+    return '\n'.join(f'  {count} x {sql}\n      at {site or "<unknown>"}' for count, sql, site in repeated)
+
+
+class QueryBudgetMiddleware:
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        self.check(request, recorder)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(
+            view_func, 'query_budget', getattr(settings, 'QUERY_BUDGET_DEFAULT', None)
+        )
+
+    def check(self, request, recorder):
+        repeated = recorder.repeated(getattr(settings, 'QUERY_REPEAT_THRESHOLD', 5))
+        if repeated:
+            logger.warning('Repeated queries in %s %s:\n%s', request.method, request.path, _describe(repeated))
+
+        budget = getattr(request, 'query_budget', None)
+        if budget is None or recorder.count <= budget:
+            return
+        message = f'{request.method} {request.path} ran {recorder.count} queries, budget is {budget}'
+        if repeated:
+            message += '\n' + _describe(repeated)
+        if getattr(settings, 'QUERY_BUDGET_ACTION', 'warn') == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
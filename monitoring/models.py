@@ -0,0 +1,42 @@
+from django.contrib.auth.models import User
+from django.db import models
+from django.utils import timezone
+
+
+class ProfileCapture(models.Model):
+    """A request run under cProfile, kept for later inspection.
+
+    ``stats`` is the marshalled pstats data (the format of
+    ``pstats.Stats.dump_stats``, loadable with ``pstats.Stats(path)``),
+    ``summary`` the top functions by cumulative time and ``sql_timeline``
+    the statements the request ran, in order.
+    """
+
+    TRIGGER_CHOICES = [
+        ('explicit', 'Requested by staff'),
+        ('sampled', 'Sampled'),
+    ]
+
+    created_at = models.DateTimeField(default=timezone.now)
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL,
+                             related_name='profile_captures')
+    trigger = models.CharField(max_length=10, choices=TRIGGER_CHOICES)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2000)
+    url_name = models.CharField(max_length=200, blank=True)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField(default=0)
+    sql_ms = models.FloatField(default=0)
+
+    stats = models.BinaryField()
+    summary = models.TextField(blank=True)
+    sql_timeline = models.JSONField(default=list)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['url_name', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
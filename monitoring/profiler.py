@@ -0,0 +1,123 @@
+"""
+On-demand request profiling.
+
+Staff users can profile any request by adding ``__profile=1`` to its query
+string or sending an ``X-Profile: 1`` header; the response then carries an
+``X-Profile-Capture`` header with the id of the stored capture.
+``PROFILER_SAMPLE_RATES`` maps URL names to N to also profile one in N
+requests of those views, whoever makes them.
+
+A capture (``ProfileCapture``, browsable in the admin) holds the pstats
+dump, the top ``PROFILER_TOP_N`` functions by cumulative time and the
+timeline of SQL statements the request ran.
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.urls import Resolver404, resolve
+
+from .models import ProfileCapture
+from .sql import call_site
+
+PROFILE_PARAM = '__profile'
+PROFILE_HEADER = 'X-Profile'
+
+# Longer timelines are cut, the statement count and SQL time stay exact
+MAX_TIMELINE = 1000
+
+
+class SqlTimeline:
+    """An execute wrapper that records when each statement ran and for how long."""
+
+    def __init__(self, start):
+        self.start = start
+        self.count = 0
+        self.duration = 0.0
+        self.entries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            if len(self.entries) < MAX_TIMELINE:
+                self.entries.append({
+                    'start_ms': round((started - self.start) * 1000, 3),
+                    'duration_ms': round(duration * 1000, 3),
+                    'sql': sql,
+                    'call_site': call_site(),
+                })
+
+
+def _requested(request):
+    flag = request.GET.get(PROFILE_PARAM) or request.headers.get(PROFILE_HEADER)
+    return flag not in (None, '', '0')
+
+
+def _sampled(request):
+    rates = getattr(settings, 'PROFILER_SAMPLE_RATES', None)
+    if not rates:
+        return False
+    try:
+        url_name = resolve(request.path_info).view_name
+    except Resolver404:
+        return False
+    rate = rates.get(url_name)
+    return bool(rate) and random.randrange(rate) == 0
+
+
+class ProfilerMiddleware:
+    """Must come after ``AuthenticationMiddleware``."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if _requested(request) and request.user.is_staff:
+            return self.profile(request, 'explicit')
+        if _sampled(request):
+            return self.profile(request, 'sampled')
+        return self.get_response(request)
+
+    def profile(self, request, trigger):
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        timeline = SqlTimeline(start)
+        with connection.execute_wrapper(timeline):
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - start
+
+        summary = io.StringIO()
+        stats = pstats.Stats(profiler, stream=summary)
+        stats.sort_stats('cumulative').print_stats(getattr(settings, 'PROFILER_TOP_N', 40))
+        match = getattr(request, 'resolver_match', None)
+        capture = ProfileCapture.objects.create(
+            user=request.user if request.user.is_authenticated else None,
+            trigger=trigger,
+            method=request.method,
+            path=request.get_full_path()[:2000],
+            url_name=(match.view_name if match else '') or '',
+            status_code=response.status_code,
+            duration_ms=duration * 1000,
+            query_count=timeline.count,
+            sql_ms=timeline.duration * 1000,
+            stats=marshal.dumps(stats.stats),
+            summary=summary.getvalue(),
+            sql_timeline=timeline.entries,
+        )
+        if trigger == 'explicit':
+            response['X-Profile-Capture'] = str(capture.pk)
+        return response
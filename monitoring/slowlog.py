@@ -0,0 +1,130 @@
+"""
+Slow-query log.
+
+``SlowQueryMiddleware`` times every statement a request runs and appends
+the ones slower than ``SLOW_QUERY_THRESHOLD_MS`` to ``SLOW_QUERY_LOG`` as
+JSON lines: the SQL and its parameters, the duration, the URL name and the
+application line that issued the statement. The file is rotated at
+``SLOW_QUERY_LOG_MAX_BYTES`` keeping ``SLOW_QUERY_LOG_BACKUPS`` old files;
+``manage.py slow_queries`` aggregates them.
+
+Logging is off when ``SLOW_QUERY_LOG`` is not set.
+"""
+import json
+import logging
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .sql import call_site, normalize_sql
+
+MAX_PARAM_LENGTH = 200
+
+_handler_lock = threading.Lock()
+_handlers = {}
+
+
+def log_path():
+    path = getattr(settings, 'SLOW_QUERY_LOG', None)
+    return Path(path) if path else None
+
+
+def _handler(path):
+    """One rotating handler per log file, shared by every thread of the process."""
+    with _handler_lock:
+        handler = _handlers.get(path)
+        if handler is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                path, encoding='utf-8',
+                maxBytes=getattr(settings, 'SLOW_QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024),
+                backupCount=getattr(settings, 'SLOW_QUERY_LOG_BACKUPS', 5),
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            _handlers[path] = handler
+        return handler
+
+
+def _param(value):
+    text = value if isinstance(value, (int, float, bool, type(None))) else str(value)
+    if isinstance(text, str) and len(text) > MAX_PARAM_LENGTH:
+        text = text[:MAX_PARAM_LENGTH] + '...'
+    return text
+
+
+def _params(params, many):
+    if params is None:
+        return None
+    if many:
+        return 'executemany'  # possibly a consumed iterator by now
+    if isinstance(params, dict):
+        return {key: _param(value) for key, value in params.items()}
+    return [_param(value) for value in params]
+
+
+class SlowQueryRecorder:
+    """An execute wrapper that writes statements over the threshold to the log."""
+
+    def __init__(self, path, threshold_ms, request=None):
+        self.handler = _handler(path)
+        self.threshold = threshold_ms / 1000
+        self.request = request
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            if duration >= self.threshold:
+                self.write(sql, params, many, duration)
+
+    def write(self, sql, params, many, duration):
+        match = getattr(self.request, 'resolver_match', None)
+        entry = {
+            'time': timezone.now().isoformat(),
+            'duration_ms': round(duration * 1000, 3),
+            'url_name': match.view_name if match else None,
+            'path': self.request.path if self.request is not None else None,
+            'call_site': call_site(),
+            'shape': normalize_sql(sql),
+            'sql': sql,
+            'params': _params(params, many),
+        }
+        record = logging.makeLogRecord({'msg': json.dumps(entry, default=str), 'levelno': logging.WARNING})
+        self.handler.handle(record)
+
+
+class SlowQueryMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        path = log_path()
+        if path is None:
+            return self.get_response(request)
+        recorder = SlowQueryRecorder(path, getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 100), request)
+        with connection.execute_wrapper(recorder):
+            return self.get_response(request)
+
+
+def read_entries(path):
+    """Every entry of the log at ``path`` and its rotated backups, oldest file first."""
+    path = Path(path)
+    backups = [p for p in path.parent.glob(f'{path.name}.*') if p.suffix[1:].isdigit()]
+    backups.sort(key=lambda p: int(p.suffix[1:]), reverse=True)
+    for file in backups + [path]:
+        if not file.exists():
+            continue
+        with open(file, encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
@@ -0,0 +1,79 @@
+"""
+Helpers for looking at the SQL a request runs.
+
+``normalize_sql`` reduces a statement to its shape (literals and parameter
+lists replaced by placeholders) so the same ORM expression run in a loop
+groups together, and ``call_site`` finds the application code that issued
+it. ``QueryRecorder`` is a ``connection.execute_wrapper`` that collects
+both for every statement.
+"""
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """The shape of ``sql``: literals become ``?`` and ``IN`` lists ``IN (...)``."""
+    sql = sql.replace('%s', '?')
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def call_site(frame=None, skip=None):
+    """``path:line in function`` of the innermost application frame on the stack.
+
+    Frames from Django, installed packages and modules starting with one of
+    the ``skip`` prefixes (default: the ``QUERY_CALL_SITE_SKIP`` setting,
+    this app's instrumentation) are skipped; returns None when no
+    application frame is found.
+    """
+    if skip is None:
+        skip = getattr(settings, 'QUERY_CALL_SITE_SKIP', ['monitoring.'])
+    skip = tuple(skip)
+    root = str(settings.BASE_DIR)
+    frame = frame or sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        internal = skip and frame.f_globals.get('__name__', '').startswith(skip)
+        if filename.startswith(root) and not internal and 'site-packages' not in filename:
+            path = Path(filename).relative_to(root)
+            return f'{path}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return None
+
+
+class QueryRecorder:
+    """Counts statements by (shape, call site) while installed as an execute wrapper."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.groups = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.groups[normalize_sql(sql), call_site()] += 1
+
+    def repeated(self, threshold):
+        """``(count, sql, site)`` of every group run at least ``threshold`` times, worst first."""
+        return [
+            (count, sql, site)
+            for (sql, site), count in self.groups.most_common()
+            if count >= threshold
+        ]
@@ -0,0 +1,207 @@
+import json
+import marshal
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import include, path
+
+from . import metrics, slowlog
+from .models import ProfileCapture
+from .decorators import query_budget
+from .middleware import QueryBudgetExceeded
+from .sql import call_site, normalize_sql
+
+
+@query_budget(3)
+def loop_view(request):
+    for i in range(int(request.GET.get('n', 1))):
+        User.objects.filter(pk=i).exists()
+    return HttpResponse('ok')
+
+
+urlpatterns = [path('loop/', loop_view, name='loop'), path('', include('monitoring.urls'))]
+
+# The default QUERY_CALL_SITE_SKIP (all of monitoring) would hide loop_view
+# above; skip only the instrumentation so this module counts as the app
+INSTRUMENTATION = [
+    'monitoring.decorators', 'monitoring.metrics', 'monitoring.middleware',
+    'monitoring.profiler', 'monitoring.slowlog', 'monitoring.sql',
+]
+
+
+class NormalizeSqlTests(TestCase):
+    def test_literals_and_in_lists_collapse(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t1 WHERE a = 'x''y' AND b = 42 AND c IN (%s, %s,%s)"),
+            'SELECT * FROM t1 WHERE a = ? AND b = ? AND c IN (...)',
+        )
+        self.assertEqual(normalize_sql('SELECT 1\n  FROM  t'), normalize_sql('SELECT 2 FROM t'))
+
+
+class CallSiteTests(TestCase):
+    def test_skipped_modules_are_configurable(self):
+        self.assertNotIn('monitoring/', call_site() or '')
+        self.assertRegex(call_site(skip=[]), r'^monitoring/tests\.py:\d+ in test_skipped_modules_are_configurable$')
+        with override_settings(QUERY_CALL_SITE_SKIP=INSTRUMENTATION):
+            self.assertIn('in test_skipped_modules_are_configurable', call_site())
+
+
+@override_settings(ROOT_URLCONF='monitoring.tests', QUERY_REPEAT_THRESHOLD=3, QUERY_CALL_SITE_SKIP=INSTRUMENTATION)
+class QueryBudgetMiddlewareTests(TestCase):
+    def test_within_budget_is_silent(self):
+        with self.assertNoLogs('monitoring.queries'):
+            self.assertEqual(self.client.get('/loop/?n=2').status_code, 200)
+
+    @override_settings(QUERY_BUDGET_ACTION='warn')
+    def test_over_budget_warns_with_repeated_query_and_call_site(self):
+        with self.assertLogs('monitoring.queries', 'WARNING') as logs:
+            self.client.get('/loop/?n=4')
+        output = '\n'.join(logs.output)
+        self.assertIn('ran 4 queries, budget is 3', output)
+        self.assertIn('4 x SELECT ? AS "a" FROM "auth_user"', output)
+        self.assertIn('monitoring/tests.py', output)
+        self.assertIn('in loop_view', output)
+
+    @override_settings(QUERY_BUDGET_ACTION='raise')
+    def test_over_budget_raises_when_configured(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'ran 5 queries, budget is 3'), \
+                self.assertLogs('monitoring.queries', 'WARNING'):
+            self.client.get('/loop/?n=5')
+
+
+class MetricsRegistryTests(TestCase):
+    def test_renders_counters_and_cumulative_histograms(self):
+        registry = metrics.MetricsRegistry()
+        labels = (('view', 'jobs.index'),)
+        registry.inc('jobby_http_requests_total', labels + (('method', 'GET'), ('status', '200')), 2)
+        for seconds in (0.004, 0.03, 20):
+            registry.observe('jobby_http_request_duration_seconds', labels, seconds)
+        output = registry.render()
+
+        self.assertIn('# TYPE jobby_http_requests_total counter', output)
+        self.assertIn('jobby_http_requests_total{view="jobs.index",method="GET",status="200"} 2', output)
+        self.assertIn('jobby_http_request_duration_seconds_bucket{view="jobs.index",le="0.005"} 1', output)
+        self.assertIn('jobby_http_request_duration_seconds_bucket{view="jobs.index",le="0.05"} 2', output)
+        self.assertIn('jobby_http_request_duration_seconds_bucket{view="jobs.index",le="10"} 2', output)
+        self.assertIn('jobby_http_request_duration_seconds_bucket{view="jobs.index",le="+Inf"} 3', output)
+        self.assertIn('jobby_http_request_duration_seconds_count{view="jobs.index"} 3', output)
+        self.assertIn('jobby_http_request_duration_seconds_sum{view="jobs.index"} 20.034', output)
+
+    def test_multiprocess_files_are_summed(self):
+        other = metrics.MetricsRegistry()
+        other.inc('jobby_http_requests_total', (('view', 'other'), ('method', 'GET'), ('status', '200')), 5)
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_MULTIPROCESS_DIR=directory):
+            with open(os.path.join(directory, 'metrics-1.json'), 'w') as fh:
+                json.dump(other.dump(), fh)
+            with open(os.path.join(directory, 'metrics-2.json'), 'w') as fh:
+                json.dump(other.dump(), fh)
+            output = metrics.collect().render()
+            self.assertTrue(os.path.exists(os.path.join(directory, f'metrics-{os.getpid()}.json')))
+        self.assertIn('jobby_http_requests_total{view="other",method="GET",status="200"} 10', output)
+
+
+@override_settings(ROOT_URLCONF='monitoring.tests')
+class MetricsEndpointTests(TestCase):
+    def test_staff_only(self):
+        user = User.objects.create_user('someone', password='pw')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+        user.is_staff = True
+        user.save()
+        self.client.get('/loop/?n=2')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('jobby_http_requests_total{view="loop",method="GET",status="200"}', response.content.decode())
+        self.assertIn('jobby_http_request_queries_bucket{view="loop",le="5"}', response.content.decode())
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_bearer_token(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer nope').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+
+
+@override_settings(ROOT_URLCONF='monitoring.tests', SLOW_QUERY_THRESHOLD_MS=0, QUERY_CALL_SITE_SKIP=INSTRUMENTATION)
+class SlowQueryLogTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'slow.jsonl')
+
+    def test_logs_statements_with_url_name_and_call_site(self):
+        with override_settings(SLOW_QUERY_LOG=self.path):
+            self.client.get('/loop/?n=3')
+        entries = [e for e in slowlog.read_entries(self.path) if e['url_name'] == 'loop']
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries[0]['params'], [1, 0])
+        self.assertRegex(entries[0]['call_site'], r'^monitoring/tests\.py:\d+ in loop_view$')
+        self.assertEqual(entries[0]['path'], '/loop/')
+
+        out = StringIO()
+        call_command('slow_queries', file=self.path, top=1, url_name='loop', stdout=out)
+        output = out.getvalue()
+        self.assertIn('3 x', output)
+        self.assertIn('in loop_view', output)
+        self.assertIn('loop (3)', output)
+
+    def test_disabled_without_a_log_file(self):
+        with override_settings(SLOW_QUERY_LOG=None):
+            self.client.get('/loop/?n=1')
+        self.assertFalse(os.path.exists(self.path))
+
+
+@override_settings(ROOT_URLCONF='monitoring.tests', QUERY_CALL_SITE_SKIP=INSTRUMENTATION)
+class ProfilerTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user('staff', password='pw', is_staff=True)
+
+    def test_staff_profile_a_request_on_demand(self):
+        self.client.force_login(self.staff)
+        response = self.client.get('/loop/?n=2&__profile=1')
+        capture = ProfileCapture.objects.get()
+        self.assertEqual(response['X-Profile-Capture'], str(capture.pk))
+        self.assertEqual((capture.trigger, capture.url_name, capture.status_code), ('explicit', 'loop', 200))
+        self.assertEqual(capture.user, self.staff)
+        self.assertIn('loop_view', capture.summary)
+        self.assertIn('loop_view', str(marshal.loads(bytes(capture.stats)).keys()))
+        loop_queries = [e for e in capture.sql_timeline if 'in loop_view' in (e['call_site'] or '')]
+        self.assertEqual(len(loop_queries), 2)
+
+        self.client.get('/loop/', HTTP_X_PROFILE='1')
+        self.assertEqual(ProfileCapture.objects.count(), 2)
+
+    def test_ignored_for_other_users(self):
+        self.client.get('/loop/?__profile=1')
+        self.client.force_login(User.objects.create_user('someone'))
+        response = self.client.get('/loop/?__profile=1')
+        self.assertNotIn('X-Profile-Capture', response)
+        self.assertFalse(ProfileCapture.objects.exists())
+
+    def test_sampling_by_url_name(self):
+        with override_settings(PROFILER_SAMPLE_RATES={'loop': 1}):
+            self.client.get('/loop/')
+            self.client.get('/metrics')
+        self.assertEqual(list(ProfileCapture.objects.values_list('trigger', 'url_name')), [('sampled', 'loop')])
+
+
+class ProfileCaptureAdminTests(TestCase):
+    def test_change_page_and_download(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(admin)
+        self.client.get('/jobs/?__profile=1')
+        capture = ProfileCapture.objects.get()
+
+        response = self.client.get(f'/admin/monitoring/profilecapture/{capture.pk}/change/')
+        self.assertContains(response, 'Top functions')
+        self.assertContains(response, 'SQL timeline')
+
+        response = self.client.get(f'/admin/monitoring/profilecapture/{capture.pk}/download/')
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="capture-{capture.pk}.prof"')
+        self.assertIsInstance(marshal.loads(response.content), dict)
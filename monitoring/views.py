@@ -0,0 +1,26 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+
+from . import metrics as metrics_module
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _authorized(request):
+    """Staff users, or a scraper sending ``Authorization: Bearer <METRICS_TOKEN>``."""
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    header = request.headers.get('Authorization', '')
+    return bool(token) and hmac.compare_digest(header, f'Bearer {token}')
+
+
+@require_GET
+def metrics(request):
+    """Per-view request, latency and SQL metrics in the Prometheus text format."""
+    if not _authorized(request):
+        return HttpResponseForbidden('Staff only')
+    return HttpResponse(metrics_module.collect().render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -3,12 +3,9 @@ from django.contrib.auth.models import User
 from django.urls import reverse
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-import urllib.request
-import urllib.parse
-import json
-import ssl
+from jobby.tracking import DirtyFieldsMixin
 
-class Profile(models.Model):
+class Profile(DirtyFieldsMixin, models.Model):
     USER_TYPE_CHOICES = (
         ('recruiter', 'Recruiter'),
         ('regular', 'Job Seeker'),
@@ -70,55 +67,45 @@ class Profile(models.Model):
     # --- MOVED THESE METHODS INSIDE THE CLASS ---
     def _geocode_location(self, location):
         """
-        Geocodes the location string to lat/long. 
-        Uses the specific User-Agent that we confirmed works in the script.
+        Synchronously geocodes the location string to lat/long through the
+        shared geocode cache. Saves never call this; they enqueue a lookup
+        for ``manage.py run_worker`` instead.
         """
-        if not location:
-            return None
+        from geocoding.backends import GeocoderError
+        from geocoding.services import geocode
         try:
-            base = 'https://nominatim.openstreetmap.org/search?format=json&limit=1&q='
-            url = base + urllib.parse.quote(location)
-            
-            headers = {'User-Agent': 'Jobby/1.0 (admin@jobby.example)'} 
-            req = urllib.request.Request(url, headers=headers)
-            
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            
-            with urllib.request.urlopen(req, timeout=5, context=ctx) as resp:
-                data = resp.read().decode('utf-8')
-                arr = json.loads(data)
-                if arr:
-                    return float(arr[0]['lat']), float(arr[0]['lon'])
-        except Exception as e:
+            return geocode(location)
+        except GeocoderError as e:
             print(f"Geocoding error: {e}")
             return None
-        return None
 
     def save(self, *args, **kwargs):
         """
-        Automatic trigger: If location changes, fetch new coordinates.
+        Automatic trigger: If location changes, queue a lookup of the new coordinates.
         """
-        if self.location:
-            old_location = None
-            if self.pk:
-                try:
-                    old_profile = Profile.objects.get(pk=self.pk)
-                    old_location = old_profile.location
-                except Profile.DoesNotExist:
-                    pass
-            
-            if (self.location != old_location) or (self.latitude is None):
-                print(f"Auto-geocoding location for {self.user.username}...")
-                coords = self._geocode_location(self.location)
+        need_geocode = False
+        update_fields = kwargs.get('update_fields')
+        if (update_fields is None or 'location' in update_fields) and self.has_changed('location'):
+            self.latitude = None
+            self.longitude = None
+            need_geocode = bool(self.location)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'latitude', 'longitude'}
+
+        if need_geocode:
+            # Known locations are answered by the geocode cache without queueing
+            from geocoding.services import cached_coordinates
+            hit, coords = cached_coordinates(self.location)
+            if hit:
+                need_geocode = False
                 if coords:
                     self.latitude, self.longitude = coords
-                    print(f"  > Saved coordinates: {self.latitude}, {self.longitude}")
-                else:
-                    print("  > Could not geocode location.")
                     
         super().save(*args, **kwargs)
+
+        if need_geocode:
+            from geocoding.queue import enqueue_geocode
+            enqueue_geocode(self)
     # --- END OF PROFILE CLASS ---
 
 # Other models stay below Profile
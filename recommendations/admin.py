@@ -24,3 +24,4 @@ class CandidateRecommendationAdmin(admin.ModelAdmin):
             'fields': ('recommended_at', 'last_updated')
         }),
     )
+
@@ -0,0 +1,142 @@
+"""
+Parallel recomputation of every active job's recommendations.
+
+The parent process loads the candidate pool once (from the materialized
+feature records) and hands it to a ``ProcessPoolExecutor``; with the fork
+start method the workers inherit it without pickling. Workers only do
+NumPy scoring on shards of jobs and never touch the database; the parent
+writes each job's results back with one bulk upsert.
+"""
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from applications.models import Application
+from jobs.models import Job
+from .features import load_candidate_features
+from .models import CandidateRecommendation
+from .scoring import CandidateMatrix
+from .utils import (
+    MIN_MATCH_SCORE, delete_stale_recommendations, get_job_skills, upsert_recommendations,
+    visible_candidates,
+)
+
+JOB_FIELDS = (
+    'pk', 'skills_required', 'requirements', 'description',
+    'experience_level', 'location', 'is_remote',
+)
+
+# The candidate pool of a worker process, set by _init_worker
+_matrix = None
+_rows_by_user = None
+
+
+def _init_worker(matrix):
+    global _matrix, _rows_by_user
+    _matrix = matrix
+    _rows_by_user = {int(user_id): row for row, user_id in enumerate(matrix.user_ids)}
+
+
+def score_jobs(jobs, applied, min_score=MIN_MATCH_SCORE):
+    """Score a shard of jobs against the worker's candidate pool.
+
+    ``applied`` maps job ids to the user ids to leave out. Returns
+    ``(job_id, rows)`` pairs, ``rows`` being (user_id, profile_id, overall,
+    skills, experience, location) tuples, best first.
+    """
+    results = []
+    for job in jobs:
+        excluded = [_rows_by_user[u] for u in applied.get(job.pk, ()) if u in _rows_by_user]
+        rows = np.delete(np.arange(len(_matrix)), excluded) if excluded else None
+        job_skills = get_job_skills(job)
+        scores = _matrix.score_job(job, min_score=min_score, rows=rows, job_skills=job_skills)
+        results.append((job.pk, [
+            (int(_matrix.user_ids[row]), int(_matrix.profile_ids[row]),
+             float(scores.overall[i]), float(scores.skills[i]),
+             float(scores.experience[i]), float(scores.location[i]))
+            for i, row in enumerate(scores.rows)
+            # Same rule as the skill index: jobs listing skills need one shared
+            if scores.skills[i] > 0 or not job_skills
+        ]))
+    return results
+
+
+def save_job_scores(job_id, rows):
+    """Write one job's scored rows with a bulk upsert and drop its stale ones."""
+    started = timezone.now()
+    objs = [
+        CandidateRecommendation(
+            job_id=job_id,
+            candidate_id=user_id,
+            candidate_profile_id=profile_id,
+            match_score=round(overall, 2),
+            skills_match_score=skills,
+            experience_match_score=experience,
+            location_match_score=location,
+            status='new',
+        )
+        for user_id, profile_id, overall, skills, experience, location in rows
+    ]
+    with transaction.atomic():
+        upsert_recommendations(objs)
+        delete_stale_recommendations(started, job_id=job_id)
+
+
+def _shards(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def rebuild_all_recommendations(workers=None, chunk_size=50, on_progress=None):
+    """Recompute the recommendations of every active job.
+
+    Returns ``(jobs, recommendations)`` counts. ``workers=1`` scores in the
+    current process, which is handy for debugging.
+    """
+    matrix = CandidateMatrix(load_candidate_features(visible_candidates()))
+    jobs = list(Job.objects.filter(is_active=True).only(*JOB_FIELDS).order_by('pk'))
+    applied = defaultdict(list)
+    for job_id, user_id in Application.objects.filter(job__is_active=True).values_list(
+        'job_id', 'applicant_id'
+    ):
+        applied[job_id].append(user_id)
+
+    def shard_applied(shard):
+        return {job.pk: applied[job.pk] for job in shard if job.pk in applied}
+
+    done = written = 0
+
+    def save(results):
+        nonlocal done, written
+        for job_id, rows in results:
+            save_job_scores(job_id, rows)
+            done += 1
+            written += len(rows)
+        if on_progress:
+            on_progress(done, len(jobs))
+
+    workers = workers or multiprocessing.cpu_count()
+    if workers <= 1:
+        _init_worker(matrix)
+        for shard in _shards(jobs, chunk_size):
+            save(score_jobs(shard, shard_applied(shard)))
+        return done, written
+
+    # Forked children must not share the parent's database connections
+    connections.close_all()
+    start_methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in start_methods else None)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(matrix,)) as pool:
+        futures = [
+            pool.submit(score_jobs, shard, shard_applied(shard))
+            for shard in _shards(jobs, chunk_size)
+        ]
+        for future in as_completed(futures):
+            save(future.result())
+    return done, written
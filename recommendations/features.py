@@ -0,0 +1,111 @@
+"""
+Materialized candidate features.
+
+``CandidateFeatureRecord`` holds everything the scorer needs about a
+profile: the normalized skill set, the work experience total and the
+location. ``sync_candidate_features`` rebuilds it (together with the
+CandidateSkill index) when the profile or one of its child rows changes,
+and ``load_candidate_features`` reads a whole candidate pool in one query.
+"""
+from datetime import date
+
+from .scoring import CandidateFeatures
+from .skill_index import MAX_TOKEN_LENGTH, sync_candidate_skills
+from .utils import get_candidate_skills, years_to_level
+
+# Profile fields copied into the feature record
+PROFILE_FEATURE_FIELDS = {'skills_text', 'location', 'latitude', 'longitude'}
+
+
+def experience_totals(work_experiences):
+    """Split work experience into days of ended positions and start dates of ongoing ones."""
+    days = 0
+    ongoing = []
+    for exp in work_experiences:
+        if exp.end_date:
+            days += (exp.end_date - exp.start_date).days
+        else:
+            ongoing.append(exp.start_date.isoformat())
+    return days, sorted(ongoing)
+
+
+def experience_years(experience_days, ongoing_since, today=None):
+    """Total years of experience as of ``today``, like ``get_experience_years``."""
+    today = today or date.today()
+    days = experience_days + sum(
+        (today - date.fromisoformat(start)).days for start in ongoing_since
+    )
+    return days / 365.25
+
+
+def build_feature_record(profile):
+    """An unsaved CandidateFeatureRecord for ``profile`` (children prefetched or not)."""
+    from .models import CandidateFeatureRecord
+
+    days, ongoing = experience_totals(profile.work_experience.all())
+    return CandidateFeatureRecord(
+        profile=profile,
+        skills=sorted(get_candidate_skills(profile)),
+        has_skills=bool(profile.skills.all()) or bool(profile.skills_text),
+        experience_days=max(days, 0),
+        ongoing_since=ongoing,
+        location=profile.location or '',
+        latitude=profile.latitude,
+        longitude=profile.longitude,
+    )
+
+
+def sync_candidate_features(profile):
+    """Rebuild the feature record and the skill index rows of ``profile``."""
+    record = build_feature_record(profile)
+    record.save()
+    sync_candidate_skills(
+        profile, {token for token in record.skills if len(token) <= MAX_TOKEN_LENGTH}
+    )
+    return record
+
+
+def record_features(profile_id, user_id, skills, has_skills, experience_days, ongoing_since,
+                    location, today=None):
+    return CandidateFeatures(
+        profile_id=profile_id,
+        user_id=user_id,
+        skills=frozenset(skills),
+        has_skills=has_skills,
+        experience_level=years_to_level(experience_years(experience_days, ongoing_since, today)),
+        location=location,
+    )
+
+
+def load_candidate_features(profiles):
+    """``CandidateFeatures`` for every profile of a Profile queryset.
+
+    Read from the feature records in one query; profiles that have no
+    record yet (e.g. bulk imported) get one built and saved on the way.
+    """
+    from profiles.models import Profile
+
+    today = date.today()
+    rows = profiles.order_by().values_list(
+        'pk', 'user_id', 'feature_record__skills', 'feature_record__has_skills',
+        'feature_record__experience_days', 'feature_record__ongoing_since', 'feature_record__location',
+    )
+    features, missing = [], []
+    for row in rows:
+        # has_skills is never NULL on a record, so NULL means there is none
+        if row[3] is None:
+            missing.append(row[0])
+        else:
+            features.append(record_features(*row, today=today))
+
+    if missing:
+        profiles = Profile.objects.filter(pk__in=missing).prefetch_related(
+            'skills', 'work_experience', 'projects'
+        )
+        for profile in profiles:
+            record = sync_candidate_features(profile)
+            features.append(record_features(
+                profile.pk, profile.user_id, record.skills, record.has_skills,
+                record.experience_days, record.ongoing_since, record.location, today=today,
+            ))
+    return features
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from profiles.models import Profile
+from recommendations.features import build_feature_record
+from recommendations.models import CandidateFeatureRecord, CandidateSkill
+from recommendations.skill_index import MAX_TOKEN_LENGTH
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the candidate feature records and the CandidateSkill index for every "
+            "profile, working through them in primary-key batches.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of profiles processed per transaction (default: 500)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        profiles = Profile.objects.order_by('pk').prefetch_related(
+            'skills', 'projects', 'work_experience'
+        )
+        last_pk = 0
+        processed = 0
+        tokens_written = 0
+
+        while True:
+            batch = list(profiles.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            records = [build_feature_record(profile) for profile in batch]
+            tokens = [
+                CandidateSkill(profile_id=record.profile_id, name=name)
+                for record in records
+                for name in record.skills
+                if len(name) <= MAX_TOKEN_LENGTH
+            ]
+            batch_ids = [profile.pk for profile in batch]
+            with transaction.atomic():
+                CandidateFeatureRecord.objects.filter(profile_id__in=batch_ids).delete()
+                CandidateFeatureRecord.objects.bulk_create(records, batch_size=batch_size)
+                CandidateSkill.objects.filter(profile_id__in=batch_ids).delete()
+                CandidateSkill.objects.bulk_create(tokens, batch_size=batch_size)
+            last_pk = batch[-1].pk
+            processed += len(batch)
+            tokens_written += len(tokens)
+            self.stdout.write(f"  {processed} profiles processed...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt features and {tokens_written} skill tokens for {processed} profiles."
+        ))
@@ -0,0 +1,31 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+
+from recommendations.batch import rebuild_all_recommendations
+
+
+class Command(BaseCommand):
+    help = ("Recompute candidate recommendations for every active job, scoring "
+            "shards of jobs in parallel worker processes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help='Scoring processes (default: one per CPU core)')
+        parser.add_argument('--chunk-size', type=int, default=50,
+                            help='Jobs scored per task sent to a worker (default: 50)')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        def progress(done, total):
+            self.stdout.write(f"  {done}/{total} jobs written...")
+
+        jobs, written = rebuild_all_recommendations(
+            workers=options['workers'], chunk_size=options['chunk_size'], on_progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {written} recommendations for {jobs} jobs "
+            f"in {time.monotonic() - started:.1f}s."
+        ))
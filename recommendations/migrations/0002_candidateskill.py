@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_profile_latitude_profile_longitude'),
+        ('recommendations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_index', to='profiles.profile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['name', 'profile'], name='recommendat_name_720e93_idx')],
+                'unique_together': {('profile', 'name')},
+            },
+        ),
+    ]
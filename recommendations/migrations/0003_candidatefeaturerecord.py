@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_profile_latitude_profile_longitude'),
+        ('recommendations', '0002_candidateskill'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateFeatureRecord',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feature_record', serialize=False, to='profiles.profile')),
+                ('skills', models.JSONField(default=list, help_text='Normalized skill tokens')),
+                ('has_skills', models.BooleanField(default=False)),
+                ('experience_days', models.PositiveIntegerField(default=0, help_text='Days worked in ended positions')),
+                ('ongoing_since', models.JSONField(default=list, help_text='ISO start dates of ongoing positions')),
+                ('location', models.CharField(blank=True, max_length=255)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
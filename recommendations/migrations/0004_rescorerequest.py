@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0003_candidatefeaturerecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RescoreRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('job', 'Job'), ('candidate', 'Candidate')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('requested_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('claimed_until', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['requested_at'],
+                'indexes': [models.Index(fields=['requested_at'], name='recommendat_request_b572e8_idx')],
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+    ]
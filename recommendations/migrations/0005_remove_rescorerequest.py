@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:35
+
+from django.db import migrations
+
+TASK_NAMES = {
+    'job': 'recommendations.tasks.rescore_job_recommendations',
+    'candidate': 'recommendations.tasks.rescore_candidate_recommendations',
+}
+
+
+def queue_pending_rescores(apps, schema_editor):
+    """Carry rescores still waiting in RescoreRequest over to the task queue."""
+    from tasks.registry import dedupe_key
+
+    RescoreRequest = apps.get_model('recommendations', 'RescoreRequest')
+    Task = apps.get_model('tasks', 'Task')
+    tasks = {}
+    for request in RescoreRequest.objects.all():
+        name = TASK_NAMES[request.kind]
+        key = dedupe_key(name, [request.object_id])
+        tasks[key] = Task(name=name, args=[request.object_id], dedupe_key=key,
+                          created_at=request.requested_at)
+    pending = set(Task.objects.filter(dedupe_key__in=tasks, status='pending')
+                  .values_list('dedupe_key', flat=True))
+    Task.objects.bulk_create([task for key, task in tasks.items() if key not in pending])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0004_rescorerequest'),
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(queue_pending_rescores, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name='RescoreRequest',
+        ),
+    ]
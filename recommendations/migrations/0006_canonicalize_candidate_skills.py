@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def canonicalize_skills(apps, schema_editor):
+    """Map Skill-row aliases ("reactjs") already in the index to their canonical skill."""
+    from jobby.skills import get_skill_dictionary
+
+    aliases = {alias: canonical for alias, canonical in get_skill_dictionary().aliases.items()
+               if alias != canonical}
+    CandidateSkill = apps.get_model('recommendations', 'CandidateSkill')
+    CandidateFeatureRecord = apps.get_model('recommendations', 'CandidateFeatureRecord')
+
+    stale = list(CandidateSkill.objects.filter(name__in=aliases))
+    profile_ids = {row.profile_id for row in stale}
+    indexed = set(CandidateSkill.objects.filter(profile_id__in=profile_ids)
+                  .values_list('profile_id', 'name'))
+    CandidateSkill.objects.filter(pk__in=[row.pk for row in stale]).delete()
+    wanted = {(row.profile_id, aliases[row.name]) for row in stale} - indexed
+    CandidateSkill.objects.bulk_create(
+        [CandidateSkill(profile_id=profile_id, name=name) for profile_id, name in wanted]
+    )
+
+    records = list(CandidateFeatureRecord.objects.filter(profile_id__in=profile_ids))
+    for record in records:
+        record.skills = sorted({aliases.get(name, name) for name in record.skills})
+    CandidateFeatureRecord.objects.bulk_update(records, ['skills'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0005_remove_rescorerequest'),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalize_skills, migrations.RunPython.noop),
+    ]
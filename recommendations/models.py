@@ -67,3 +67,49 @@ class CandidateRecommendation(models.Model):
         """Calculate days since recommendation was created."""
         from django.utils import timezone
         return (timezone.now() - self.recommended_at).days
+
+
+class CandidateSkill(models.Model):
+    """A normalized skill token a candidate profile is indexed under.
+
+    This is the inverted skill -> candidate index used to narrow the pool
+    before scoring. Rows mirror ``get_candidate_skills`` and are rebuilt
+    whenever a profile's skills_text or one of its skills, projects or work
+    experiences changes (see recommendations.skill_index).
+    """
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='skill_index')
+    name = models.CharField(max_length=255)
+
+    class Meta:
+        unique_together = ('profile', 'name')
+        indexes = [
+            models.Index(fields=['name', 'profile']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.profile_id})"
+
+
+class CandidateFeatureRecord(models.Model):
+    """Pre-computed scoring inputs of one candidate profile.
+
+    Parsing skills and summing work experience is done once per change to
+    the profile or its skills, projects and work experiences (see
+    recommendations.features) instead of for every job the candidate is
+    scored against. Ongoing positions are kept as start dates so the
+    experience total stays correct as time passes.
+    """
+    profile = models.OneToOneField(Profile, on_delete=models.CASCADE, primary_key=True,
+                                   related_name='feature_record')
+    skills = models.JSONField(default=list, help_text="Normalized skill tokens")
+    has_skills = models.BooleanField(default=False)
+    experience_days = models.PositiveIntegerField(default=0, help_text="Days worked in ended positions")
+    ongoing_since = models.JSONField(default=list, help_text="ISO start dates of ongoing positions")
+    location = models.CharField(max_length=255, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Features of profile {self.profile_id}"
+
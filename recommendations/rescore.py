@@ -0,0 +1,113 @@
+"""
+Change-driven recommendation maintenance.
+
+Saving a job or a candidate's profile (or one of its skills, projects or
+work experiences) only queues a task (see recommendations.tasks);
+``manage.py run_worker`` then rescores that one job against the candidate
+pool, or that one candidate against every active job. A pending rescore is
+not queued twice, so a burst of edits costs a single run.
+"""
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from applications.models import Application
+from jobs.models import Job, JobSkill
+from .features import load_candidate_features
+from .models import CandidateRecommendation
+from .scoring import CandidateMatrix
+from .utils import (
+    delete_stale_recommendations, generate_recommendations_for_job, get_job_skills,
+    upsert_recommendations, visible_candidates,
+)
+
+# Job fields the match score depends on
+JOB_SCORING_FIELDS = {
+    'skills_required', 'requirements', 'description', 'experience_level',
+    'location', 'is_remote', 'is_active',
+}
+
+# Profile fields deciding whether the candidate is recommended at all
+PROFILE_VISIBILITY_FIELDS = {'user_type', 'profile_visibility'}
+
+
+# Both are called from post_save/post_delete receivers: the task is only
+# queued once the change is committed, so a worker never picks it up before
+# it can see the row, or for a change that was rolled back.
+
+def enqueue_job_rescore(job):
+    """Queue a rescore of ``job`` against the candidate pool."""
+    from .tasks import rescore_job_recommendations
+
+    job_id = job.pk
+    transaction.on_commit(lambda: rescore_job_recommendations.enqueue(job_id))
+
+
+def enqueue_candidate_rescore(profile):
+    """Queue a rescore of ``profile`` against every active job."""
+    from .tasks import rescore_candidate_recommendations
+
+    profile_id = profile.pk
+    transaction.on_commit(lambda: rescore_candidate_recommendations.enqueue(profile_id))
+
+
+def rescore_job(job_id):
+    """Recompute the recommendations of one job; a deactivated job loses its untouched ones."""
+    job = Job.objects.filter(pk=job_id, is_active=True).first()
+    if job is not None:
+        generate_recommendations_for_job(job, limit=0)
+    else:
+        delete_stale_recommendations(timezone.now(), job_id=job_id)
+
+
+def rescore_candidate(profile_id):
+    """Recompute one candidate's recommendations for every active job.
+
+    Follows the same rules as ``generate_recommendations_for_job``: jobs
+    the candidate applied to are skipped, and jobs listing skills need at
+    least one of them shared. The JobSkill index picks those jobs (and the
+    ones listing no skills), so only they are parsed and scored.
+    """
+    started = timezone.now()
+    features = load_candidate_features(visible_candidates().filter(pk=profile_id))
+    if not features:
+        # No longer a visible job seeker
+        delete_stale_recommendations(started, candidate_profile_id=profile_id)
+        return
+
+    candidate = features[0]
+    matrix = CandidateMatrix(features)
+    applied = Application.objects.filter(applicant_id=candidate.user_id).values('job_id')
+    sharing = JobSkill.objects.filter(name__in=candidate.skills).values('job_id')
+    jobs = Job.objects.filter(is_active=True).exclude(pk__in=applied).filter(
+        Q(pk__in=sharing) | ~Exists(JobSkill.objects.filter(job=OuterRef('pk')))
+    ).only(
+        'pk', 'skills_required', 'requirements', 'description',
+        'experience_level', 'location', 'is_remote',
+    )
+
+    objs = []
+    for job in jobs.iterator():
+        job_skills = get_job_skills(job)
+        if job_skills and not job_skills & candidate.skills:
+            continue
+        scores = matrix.score_job(job, job_skills=job_skills)
+        if not len(scores):
+            continue
+        objs.append(CandidateRecommendation(
+            job_id=job.pk,
+            candidate_id=candidate.user_id,
+            candidate_profile_id=candidate.profile_id,
+            match_score=round(float(scores.overall[0]), 2),
+            skills_match_score=float(scores.skills[0]),
+            experience_match_score=float(scores.experience[0]),
+            location_match_score=float(scores.location[0]),
+            status='new',
+        ))
+
+    with transaction.atomic():
+        upsert_recommendations(objs)
+        delete_stale_recommendations(
+            started, candidate_profile_id=profile_id, job__is_active=True
+        )
+
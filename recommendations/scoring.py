@@ -0,0 +1,192 @@
+"""
+Vectorized candidate scoring.
+
+``CandidateMatrix`` turns a pool of candidate profiles into NumPy arrays
+once: a sparse candidate-by-skill matrix (CSR style ``indptr``/``indices``),
+an experience level per candidate and integer-coded location parts. A job
+is then scored against every candidate with a handful of array operations,
+using the same rules and weights as the per-candidate ``calculate_*``
+functions in ``recommendations.utils``.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from .utils import (
+    EXPERIENCE_LEVELS, EXPERIENCE_WEIGHT, LEVEL_DIFF_SCORES, LOCATION_WEIGHT,
+    MIN_MATCH_SCORE, SKILLS_WEIGHT, get_candidate_skills, get_experience_years,
+    get_job_skills, years_to_level,
+)
+
+_LEVEL_DIFF_SCORES = np.array(LEVEL_DIFF_SCORES)
+
+
+@dataclass
+class CandidateFeatures:
+    """The inputs the scoring engine needs about one candidate."""
+    profile_id: int
+    user_id: int
+    skills: frozenset
+    has_skills: bool
+    experience_level: int
+    location: str
+
+
+@dataclass
+class JobScores:
+    """Component and overall scores for the candidates that passed the threshold."""
+    rows: np.ndarray
+    overall: np.ndarray
+    skills: np.ndarray
+    experience: np.ndarray
+    location: np.ndarray
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def profile_features(profile):
+    """Build ``CandidateFeatures`` from a Profile (with its related rows prefetched)."""
+    return CandidateFeatures(
+        profile_id=profile.pk,
+        user_id=profile.user_id,
+        skills=frozenset(get_candidate_skills(profile)),
+        has_skills=bool(profile.skills.all()) or bool(profile.skills_text),
+        experience_level=years_to_level(get_experience_years(profile.work_experience.all())),
+        location=profile.location or '',
+    )
+
+
+def _location_parts(location):
+    loc = location.lower().strip()
+    parts = loc.split(',')
+    city = parts[0].strip()
+    state = parts[1].strip() if len(parts) > 1 else None
+    return loc, city, state
+
+
+class CandidateMatrix:
+    """Column-oriented candidate features, built once and scored against many jobs."""
+
+    def __init__(self, features):
+        features = list(features)
+        n = len(features)
+        self.features = features
+        self.profile_ids = np.fromiter((f.profile_id for f in features), dtype=np.int64, count=n)
+        self.user_ids = np.fromiter((f.user_id for f in features), dtype=np.int64, count=n)
+        self.has_skills = np.fromiter((f.has_skills for f in features), dtype=bool, count=n)
+        self.experience_level = np.fromiter((f.experience_level for f in features), dtype=np.int8, count=n)
+
+        # Sparse candidate x skill matrix: row i owns indices[indptr[i]:indptr[i+1]]
+        self.skill_ids = {}
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        indices = []
+        for i, f in enumerate(features):
+            for skill in f.skills:
+                indices.append(self.skill_ids.setdefault(skill, len(self.skill_ids)))
+            indptr[i + 1] = len(indices)
+        self.indptr = indptr
+        self.indices = np.array(indices, dtype=np.int32)
+        self.skill_rows = np.repeat(np.arange(n, dtype=np.int32), np.diff(indptr))
+        self.skill_counts = np.diff(indptr)
+
+        # Locations as integer codes so equality checks are vectorized
+        self.location_codes = {}
+        full = np.full(n, -1, dtype=np.int32)
+        city = np.full(n, -1, dtype=np.int32)
+        state = np.full(n, -1, dtype=np.int32)
+        self.has_location = np.zeros(n, dtype=bool)
+        self.remote_location = np.zeros(n, dtype=bool)
+        for i, f in enumerate(features):
+            if not f.location:
+                continue
+            self.has_location[i] = True
+            loc, city_part, state_part = _location_parts(f.location)
+            full[i] = self.location_codes.setdefault(loc, len(self.location_codes))
+            city[i] = self.location_codes.setdefault(city_part, len(self.location_codes))
+            if state_part is not None:
+                state[i] = self.location_codes.setdefault(state_part, len(self.location_codes))
+            self.remote_location[i] = 'remote' in loc
+        self.location_full = full
+        self.location_city = city
+        self.location_state = state
+
+    def __len__(self):
+        return len(self.features)
+
+    @classmethod
+    def from_profiles(cls, profiles):
+        return cls(profile_features(profile) for profile in profiles)
+
+    def skills_scores(self, job_skills):
+        n = len(self)
+        if not job_skills:
+            return np.zeros(n)
+        job_mask = np.zeros(len(self.skill_ids), dtype=bool)
+        for skill in job_skills:
+            column = self.skill_ids.get(skill)
+            if column is not None:
+                job_mask[column] = True
+        matched = np.bincount(self.skill_rows[job_mask[self.indices]], minlength=n)
+        scores = np.minimum(matched / len(job_skills) * 100, 100.0)
+        scores[self.skill_counts == 0] = 0.0
+        return scores
+
+    def experience_scores(self, job):
+        job_level = EXPERIENCE_LEVELS.get(job.experience_level, 2)
+        diff = np.minimum(np.abs(self.experience_level.astype(np.int16) - job_level), 3)
+        return _LEVEL_DIFF_SCORES[diff]
+
+    def location_scores(self, job):
+        n = len(self)
+        if job.is_remote:
+            return np.full(n, 100.0)
+        if not job.location:
+            return np.full(n, 50.0)
+
+        loc, city, state = _location_parts(job.location)
+        # Codes unknown to the candidate pool can never match (-2 never occurs)
+        job_full = self.location_codes.get(loc, -2)
+        job_city = self.location_codes.get(city, -2)
+        job_state = self.location_codes.get(state, -2) if state is not None else -2
+
+        # Apply the rules from lowest to highest precedence
+        scores = np.full(n, 30.0)
+        scores[self.remote_location] = 70.0
+        scores[self.location_state == job_state] = 60.0
+        scores[self.location_city == job_city] = 80.0
+        scores[self.location_full == job_full] = 100.0
+        scores[~self.has_location] = 50.0
+        return scores
+
+    def score_job(self, job, min_score=MIN_MATCH_SCORE, rows=None, job_skills=None):
+        """Score ``job`` against the pool and keep candidates at or above ``min_score``.
+
+        ``rows`` optionally restricts scoring to a subset of candidate rows
+        (e.g. excluding those who already applied). ``job_skills`` can be
+        passed when ``get_job_skills(job)`` was already computed.
+        """
+        if job_skills is None:
+            job_skills = get_job_skills(job)
+        skills = self.skills_scores(job_skills)
+        experience = self.experience_scores(job)
+        location = self.location_scores(job)
+        overall = np.round(
+            skills * SKILLS_WEIGHT + experience * EXPERIENCE_WEIGHT + location * LOCATION_WEIGHT, 2
+        )
+
+        eligible = self.has_skills & (overall >= min_score)
+        if rows is not None:
+            subset = np.zeros(len(self), dtype=bool)
+            subset[rows] = True
+            eligible &= subset
+        selected = np.flatnonzero(eligible)
+        order = np.argsort(-overall[selected], kind='stable')
+        selected = selected[order]
+        return JobScores(
+            rows=selected,
+            overall=overall[selected],
+            skills=skills[selected],
+            experience=experience[selected],
+            location=location[selected],
+        )
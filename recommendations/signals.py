@@ -0,0 +1,49 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from geocoding.signals import coordinates_applied
+from jobs.models import Job
+from profiles.models import Profile, Project, Skill, WorkExperience
+from .features import PROFILE_FEATURE_FIELDS, sync_candidate_features
+from .rescore import (
+    JOB_SCORING_FIELDS, PROFILE_VISIBILITY_FIELDS, enqueue_candidate_rescore, enqueue_job_rescore,
+)
+
+
+@receiver(post_save, sender=Profile)
+def update_profile_features(sender, instance, created=False, **kwargs):
+    if created and not instance.skills_text:
+        return  # nothing to index or score yet; built on first use
+    changed = instance.changed_fields
+    if changed & PROFILE_FEATURE_FIELDS:
+        sync_candidate_features(instance)
+    if changed & (PROFILE_FEATURE_FIELDS | PROFILE_VISIBILITY_FIELDS):
+        enqueue_candidate_rescore(instance)
+
+
+@receiver(coordinates_applied, sender=Profile)
+def update_geocoded_profile_features(sender, object_id, **kwargs):
+    # The geocode worker stores coordinates with an update(), skipping post_save
+    profile = Profile.objects.filter(pk=object_id).first()
+    if profile is not None:
+        sync_candidate_features(profile)
+        enqueue_candidate_rescore(profile)
+
+
+def update_owner_features(sender, instance, origin=None, **kwargs):
+    # Deletes cascading from a Profile/User remove the feature rows themselves.
+    if origin is not None and getattr(origin, 'model', type(origin)) is not sender:
+        return
+    sync_candidate_features(instance.profile)
+    enqueue_candidate_rescore(instance.profile)
+
+
+for model in (Skill, Project, WorkExperience):
+    post_save.connect(update_owner_features, sender=model, dispatch_uid=f'features_{model.__name__}')
+    post_delete.connect(update_owner_features, sender=model, dispatch_uid=f'unfeature_{model.__name__}')
+
+
+@receiver(post_save, sender=Job)
+def queue_job_rescore(sender, instance, **kwargs):
+    if instance.changed_fields & JOB_SCORING_FIELDS:
+        enqueue_job_rescore(instance)
@@ -0,0 +1,93 @@
+"""
+The CandidateSkill inverted index and the candidate pruning built on it.
+
+The recommendation engine only considers profiles that share at least
+one indexed skill with a job (a rule, not a consequence of the score: a
+strong experience and location match can outweigh a skills score of 0),
+and of those only the ones that could still reach the threshold if their
+experience and location scored perfectly.
+"""
+import math
+
+from django.db.models import Count
+
+from jobby.skills import extract_skills_from_text
+from .utils import (
+    EXPERIENCE_WEIGHT, LOCATION_WEIGHT, MIN_MATCH_SCORE, SKILLS_WEIGHT, get_candidate_skills,
+)
+
+MAX_TOKEN_LENGTH = 255
+
+
+def candidate_skill_tokens(profile):
+    """Skill tokens a profile is indexed under (``get_candidate_skills``, minus oversized ones)."""
+    return {token for token in get_candidate_skills(profile) if len(token) <= MAX_TOKEN_LENGTH}
+
+
+def sync_candidate_skills(profile, tokens=None):
+    """Bring the CandidateSkill rows of ``profile`` in line with its current skills.
+
+    ``tokens`` can be passed when they were already computed.
+    """
+    from .models import CandidateSkill
+
+    wanted = candidate_skill_tokens(profile) if tokens is None else set(tokens)
+    existing = set(CandidateSkill.objects.filter(profile=profile).values_list('name', flat=True))
+    if existing - wanted:
+        CandidateSkill.objects.filter(profile=profile, name__in=existing - wanted).delete()
+    if wanted - existing:
+        CandidateSkill.objects.bulk_create(
+            [CandidateSkill(profile=profile, name=name) for name in wanted - existing],
+            ignore_conflicts=True,
+        )
+
+
+def filter_candidates_by_skills(queryset, skills, mode='any'):
+    """Restrict a Profile queryset through the CandidateSkill index.
+
+    ``skills`` is a comma separated list, normalized like profile skills.
+    ``mode='any'`` keeps profiles with at least one of them, ``mode='all'``
+    only those carrying every one of them.
+    """
+    from .models import CandidateSkill
+
+    tokens = set(extract_skills_from_text(skills))
+    if not tokens:
+        return queryset
+    matches = CandidateSkill.objects.filter(name__in=tokens)
+    if mode == 'all':
+        matches = matches.values('profile_id').annotate(matched=Count('name')).filter(matched=len(tokens))
+    return queryset.filter(id__in=matches.values('profile_id'))
+
+
+def min_shared_skills(job, job_skills, min_score=MIN_MATCH_SCORE):
+    """Fewest shared skills a candidate needs to be considered for ``job``.
+
+    Assumes the best possible experience and location scores for ``job``,
+    so the score alone never prunes anybody who could reach ``min_score``.
+    The result is still at least 1: candidates sharing no skill are left
+    out even when their experience and location would carry them past
+    ``min_score``. Returns None when nobody can reach it.
+    """
+    best_location = 50 if not job.is_remote and not job.location else 100
+    best_without_skills = EXPERIENCE_WEIGHT * 100 + LOCATION_WEIGHT * best_location
+    needed_ratio = (min_score - best_without_skills) / (SKILLS_WEIGHT * 100)
+    if needed_ratio > 1:
+        return None  # unreachable even with every skill
+    return max(1, math.ceil(needed_ratio * len(job_skills) - 1e-9))
+
+
+def candidates_sharing_skills(job, job_skills, min_score=MIN_MATCH_SCORE):
+    """Profile ids (as a subquery) that share enough indexed skills with ``job``.
+
+    Returns None when no candidate can reach ``min_score``.
+    """
+    from .models import CandidateSkill
+
+    minimum = min_shared_skills(job, job_skills, min_score)
+    if minimum is None:
+        return None
+    matches = CandidateSkill.objects.filter(name__in=job_skills).values('profile_id')
+    if minimum > 1:
+        matches = matches.annotate(shared=Count('name')).filter(shared__gte=minimum)
+    return matches.values('profile_id')
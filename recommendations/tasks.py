@@ -0,0 +1,24 @@
+from jobs.models import Job
+from tasks.registry import task
+from .rescore import rescore_candidate, rescore_job
+from .utils import refresh_recommendations_for_job
+
+
+@task
+def refresh_job_recommendations(task, job_id):
+    """Recompute the recommendations of one job in the background."""
+    job = Job.objects.get(pk=job_id)
+    recommendations = refresh_recommendations_for_job(job, progress=task.set_progress)
+    return {'recommendations': len(recommendations)}
+
+
+@task
+def rescore_job_recommendations(task, job_id):
+    """Rescore one changed job against the candidate pool."""
+    rescore_job(job_id)
+
+
+@task
+def rescore_candidate_recommendations(task, profile_id):
+    """Rescore one changed candidate against every active job."""
+    rescore_candidate(profile_id)
@@ -1,3 +1,451 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from applications.models import Application
+from jobby.skills import SkillDictionary, find_skills_in_text
+from jobs.models import Job
+from profiles.models import Profile, Project, Skill, WorkExperience
+from tasks.models import Task
+from tasks.worker import run_worker
+from .batch import rebuild_all_recommendations
+from .features import experience_years, load_candidate_features
+from .models import CandidateFeatureRecord, CandidateRecommendation, CandidateSkill
+from .scoring import CandidateMatrix, profile_features
+from .skill_index import min_shared_skills
+from .tasks import refresh_job_recommendations
+from .utils import (
+    calculate_experience_match, calculate_location_match, calculate_overall_match_score,
+    calculate_skills_match, generate_recommendations_for_job, get_job_skills,
+)
+
+
+class RecommendationTestMixin:
+    CANDIDATES = [
+        # username, location, skills_text, skills, years of experience
+        ('alice', 'Atlanta, GA', 'Python, Django', ['SQL'], 6),
+        ('bob', 'Atlanta', 'Java', [], 1),
+        ('carol', 'Savannah, GA', '', ['python', 'React'], 3),
+        ('dave', 'Remote', 'Go; Rust', [], 12),
+        ('erin', '', 'Python', [], 0),
+        ('frank', 'Boston, MA', '', [], 4),
+    ]
+
+    def create_candidates(self):
+        for username, location, skills_text, skills, years in self.CANDIDATES:
+            user = User.objects.create_user(username=username, password='pw')
+            profile = Profile.objects.get(user=user)
+            profile.location = location
+            profile.skills_text = skills_text
+            profile.save()
+            for name in skills:
+                Skill.objects.create(profile=profile, name=name)
+            if years:
+                WorkExperience.objects.create(
+                    profile=profile, company='Acme', position='Dev',
+                    start_date=date(2000, 1, 1), end_date=date(2000 + years, 1, 2),
+                )
+
+    def create_job(self, **kwargs):
+        defaults = dict(
+            title='Backend Engineer', company_name='Acme', location='Atlanta, GA',
+            skills_required='Python, Django, SQL', experience_level='senior',
+            posted_by=self.recruiter,
+        )
+        defaults.update(kwargs)
+        return Job.objects.create(**defaults)
+
+
+class CandidateMatrixTests(RecommendationTestMixin, TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username='rec', password='pass')
+        self.create_candidates()
+        self.profiles = list(
+            Profile.objects.filter(user_type='regular').exclude(user=self.recruiter)
+            .prefetch_related('skills', 'work_experience', 'projects')
+        )
+        self.matrix = CandidateMatrix.from_profiles(self.profiles)
+
+    def assert_matches_reference(self, job):
+        skills = self.matrix.skills_scores(get_job_skills(job))
+        experience = self.matrix.experience_scores(job)
+        location = self.matrix.location_scores(job)
+        for row, profile in enumerate(self.profiles):
+            self.assertAlmostEqual(skills[row], calculate_skills_match(job, profile))
+            self.assertEqual(experience[row], calculate_experience_match(job, profile))
+            self.assertEqual(location[row], calculate_location_match(job, profile), profile.location)
+
+        scored = self.matrix.score_job(job, min_score=0)
+        for row, overall in zip(scored.rows, scored.overall):
+            self.assertAlmostEqual(overall, calculate_overall_match_score(job, self.profiles[row]))
+
+    def test_scores_match_per_candidate_functions(self):
+        self.assert_matches_reference(self.create_job())
+        self.assert_matches_reference(self.create_job(location='Macon, GA', experience_level='entry'))
+        self.assert_matches_reference(self.create_job(location='Remote', skills_required='Go'))
+        self.assert_matches_reference(self.create_job(location='Atlanta', skills_required=''))
+
+    def test_threshold_and_skill_less_candidates_excluded(self):
+        scored = self.matrix.score_job(self.create_job())
+        usernames = {self.profiles[row].user.username for row in scored.rows}
+        self.assertNotIn('frank', usernames)  # no skills at all
+        self.assertTrue(all(score >= 30 for score in scored.overall))
+        self.assertEqual(list(scored.overall), sorted(scored.overall, reverse=True))
+
+
+class GenerateRecommendationsTests(RecommendationTestMixin, TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username='rec', password='pass')
+        self.recruiter.profile.user_type = 'recruiter'
+        self.recruiter.profile.save()
+        self.create_candidates()
+
+    def test_generates_ranked_recommendations(self):
+        job = self.create_job()
+        recommendations = generate_recommendations_for_job(job)
+        self.assertEqual(recommendations[0].candidate.username, 'alice')
+        self.assertEqual(
+            CandidateRecommendation.objects.filter(job=job).count(), len(recommendations)
+        )
+        alice = Profile.objects.get(user__username='alice')
+        self.assertAlmostEqual(recommendations[0].match_score,
+                               calculate_overall_match_score(job, alice))
+
+    def test_skill_row_aliases_match_canonical_job_skills(self):
+        carol = Profile.objects.get(user__username='carol')
+        Skill.objects.filter(profile=carol, name='React').update(name='ReactJS')
+        Skill.objects.create(profile=carol, name='Golang')  # saving resyncs the index
+        self.assertEqual(sorted(carol.feature_record.skills), ['go', 'python', 'react'])
+        self.assertTrue(CandidateSkill.objects.filter(profile=carol, name='react').exists())
+
+        job = self.create_job(skills_required='React', location='Remote')
+        usernames = {r.candidate.username for r in generate_recommendations_for_job(job)}
+        self.assertEqual(usernames, {'carol'})
+
+    def test_refresh_keeps_recruiter_fields_and_drops_stale_rows(self):
+        job = self.create_job()
+        generate_recommendations_for_job(job)
+        recs = CandidateRecommendation.objects.filter(job=job)
+        recs.filter(candidate__username='alice').update(
+            status='contacted', is_favorite=True, recruiter_notes='Call back', match_score=0,
+        )
+        # A stale, untouched recommendation is removed, a favorited one is kept
+        frank = Profile.objects.get(user__username='frank')
+        CandidateRecommendation.objects.create(
+            job=job, candidate=frank.user, candidate_profile=frank, match_score=10,
+        )
+        bob = Profile.objects.get(user__username='bob')
+        CandidateRecommendation.objects.filter(job=job, candidate=bob.user).delete()
+        CandidateRecommendation.objects.create(
+            job=job, candidate=bob.user, candidate_profile=bob, match_score=5, is_favorite=True,
+        )
+        Job.objects.filter(pk=job.pk).update(skills_required='Python, Django, SQL, Go')
+
+        job.refresh_from_db()
+        generate_recommendations_for_job(job)
+
+        alice = CandidateRecommendation.objects.get(job=job, candidate__username='alice')
+        self.assertEqual(alice.status, 'contacted')
+        self.assertTrue(alice.is_favorite)
+        self.assertEqual(alice.recruiter_notes, 'Call back')
+        self.assertAlmostEqual(alice.match_score, calculate_overall_match_score(job, alice.candidate_profile))
+        self.assertFalse(CandidateRecommendation.objects.filter(job=job, candidate=frank.user).exists())
+        self.assertTrue(CandidateRecommendation.objects.filter(job=job, candidate=bob.user).exists())
+
+    def test_query_count_does_not_grow_with_candidates(self):
+        job = self.create_job()
+        # features, upsert, stale delete, top-N select
+        with self.assertNumQueries(4):
+            generate_recommendations_for_job(job)
+        with self.assertNumQueries(3):
+            generate_recommendations_for_job(job, limit=0)
+
+
+class CandidateSkillIndexTests(RecommendationTestMixin, TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username='rec', password='pass')
+        self.create_candidates()
+        self.carol = Profile.objects.get(user__username='carol')
+
+    def indexed(self, profile):
+        return set(CandidateSkill.objects.filter(profile=profile).values_list('name', flat=True))
+
+    def test_index_follows_profile_changes(self):
+        self.assertEqual(self.indexed(self.carol), {'python', 'react'})
+
+        Skill.objects.filter(profile=self.carol, name='React').get().delete()
+        Project.objects.create(profile=self.carol, title='Site', technologies='Vue, TypeScript',
+                               start_date=date(2020, 1, 1))
+        self.carol.skills_text = 'Docker'
+        self.carol.save()
+        self.assertEqual(self.indexed(self.carol), {'python', 'vue', 'typescript', 'docker'})
+
+    def test_deleting_a_user_cascades_through_the_index(self):
+        self.carol.user.delete()
+        self.assertFalse(CandidateSkill.objects.filter(profile_id=self.carol.pk).exists())
+
+    def test_only_candidates_sharing_a_skill_are_recommended(self):
+        job = self.create_job()
+        usernames = {r.candidate.username for r in generate_recommendations_for_job(job)}
+        self.assertEqual(usernames, {'alice', 'carol', 'erin'})
+
+    def test_upper_bound_prunes_candidates_that_cannot_qualify(self):
+        job = self.create_job()
+        job_skills = get_job_skills(job)
+        # Experience and location alone can reach the default 30; one shared skill is still required
+        self.assertEqual(min_shared_skills(job, job_skills), 1)
+        # 80 needs a skills score of at least 60: two of the three skills
+        self.assertEqual(min_shared_skills(job, job_skills, min_score=80), 2)
+        usernames = {r.candidate.username for r in generate_recommendations_for_job(job, min_score=80)}
+        self.assertEqual(usernames, {'alice'})
+
+
+class CandidateFeatureRecordTests(RecommendationTestMixin, TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username='rec', password='pass')
+        self.create_candidates()
+
+    def candidates(self):
+        return Profile.objects.filter(user__username__in=[c[0] for c in self.CANDIDATES])
+
+    def assert_records_match_profiles(self):
+        expected = {
+            f.profile_id: f for f in map(profile_features, self.candidates().prefetch_related(
+                'skills', 'work_experience', 'projects'))
+        }
+        loaded = {f.profile_id: f for f in load_candidate_features(self.candidates())}
+        self.assertEqual(loaded, expected)
+
+    def test_records_follow_profile_changes(self):
+        self.assert_records_match_profiles()
+        carol = Profile.objects.get(user__username='carol')
+        WorkExperience.objects.create(profile=carol, company='Acme', position='Lead',
+                                      start_date=date(2010, 1, 1))
+        carol.location = 'Denver, CO'
+        carol.save()
+        self.assert_records_match_profiles()
+
+    def test_ongoing_positions_count_until_today(self):
+        carol = Profile.objects.get(user__username='carol')
+        WorkExperience.objects.create(profile=carol, company='Acme', position='Lead',
+                                      start_date=date(2020, 1, 1))
+        record = CandidateFeatureRecord.objects.get(profile=carol)
+        self.assertEqual(record.ongoing_since, ['2020-01-01'])
+        self.assertAlmostEqual(
+            experience_years(record.experience_days, record.ongoing_since, today=date(2021, 1, 1)),
+            (1097 + 366) / 365.25,  # 2000-01-01..2003-01-02 plus all of 2020
+        )
+
+    @override_settings(GEOCODER_BACKEND='geocoding.backends.StubGeocoder')
+    def test_records_pick_up_coordinates_from_the_geocode_worker(self):
+        from geocoding.queue import process_due_tasks
+        from geocoding.services import clear_memory_cache
+
+        clear_memory_cache()
+        carol = Profile.objects.get(user__username='carol')
+        carol.location = 'Dallas, TX'
+        carol.save()
+        self.assertIsNone(CandidateFeatureRecord.objects.get(profile=carol).latitude)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            process_due_tasks()
+        record = CandidateFeatureRecord.objects.get(profile=carol)
+        self.assertEqual((record.latitude, record.longitude), (32.7767, -96.7970))
+        self.assertTrue(Task.objects.filter(
+            name='recommendations.tasks.rescore_candidate_recommendations', args=[carol.pk],
+        ).exists())
+
+    def test_missing_records_are_built_on_load(self):
+        CandidateFeatureRecord.objects.all().delete()
+        self.assert_records_match_profiles()
+        self.assertEqual(CandidateFeatureRecord.objects.count(), len(self.CANDIDATES))
+
+
+class RescoreQueueTests(RecommendationTestMixin, TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username='rec', password='pass')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_candidates()
+            self.job = self.create_job()
+        run_worker(once=True)
+
+    def recommended(self):
+        return set(CandidateRecommendation.objects.filter(job=self.job)
+                   .values_list('candidate__username', flat=True))
+
+    def queued(self):
+        return {(task.name, *task.args) for task in Task.objects.filter(status='pending')}
+
+    def test_changes_are_queued_once_per_target(self):
+        self.assertFalse(self.queued())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.title = 'Senior Backend Engineer'
+            self.job.save()
+        self.assertFalse(self.queued())  # title does not affect scores
+
+        bob = Profile.objects.get(user__username='bob')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.location = 'Dallas, TX'
+            self.job.save()
+            self.job.experience_level = 'mid'
+            self.job.save()
+            Skill.objects.create(profile=bob, name='Django')
+            Skill.objects.create(profile=bob, name='SQL')
+        self.assertEqual(self.queued(), {
+            ('recommendations.tasks.rescore_job_recommendations', self.job.pk),
+            ('recommendations.tasks.rescore_candidate_recommendations', bob.pk),
+        })
+
+    def test_candidate_changes_rescore_only_that_candidate(self):
+        self.assertEqual(self.recommended(), {'alice', 'carol', 'erin'})
+        bob = Profile.objects.get(user__username='bob')
+        carol = Profile.objects.get(user__username='carol')
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(profile=bob, name='Django')
+            carol.profile_visibility = 'private'
+            carol.save()
+
+        self.assertEqual(run_worker(once=True), 2)
+        self.assertEqual(self.recommended(), {'alice', 'bob', 'erin'})
+        self.assertFalse(self.queued())
+
+    def test_candidate_rescore_only_parses_jobs_sharing_a_skill(self):
+        from . import rescore
+
+        self.create_job(title='Haskell Dev', skills_required='Haskell', description='Functional work')
+        run_worker(once=True)
+        bob = Profile.objects.get(user__username='bob')
+        with mock.patch.object(rescore, 'get_job_skills', wraps=get_job_skills) as parsed:
+            rescore.rescore_candidate(bob.pk)
+            Skill.objects.create(profile=bob, name='Django')
+            rescore.rescore_candidate(bob.pk)
+        self.assertEqual([call.args[0].pk for call in parsed.call_args_list], [self.job.pk])
+        self.assertIn('bob', self.recommended())
+
+    def test_deactivated_job_loses_its_untouched_recommendations(self):
+        CandidateRecommendation.objects.filter(job=self.job, candidate__username='alice').update(is_favorite=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.is_active = False
+            self.job.save()
+        run_worker(once=True)
+        self.assertEqual(self.recommended(), {'alice'})
+
+    def test_job_changes_rescore_the_job(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.skills_required = 'Go, Rust'
+            self.job.requirements = ''
+            self.job.save()
+        run_worker(once=True)
+        self.assertEqual(self.recommended(), {'dave'})
+
+    def test_rolled_back_changes_queue_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.job.skills_required = 'Go, Rust'
+                    self.job.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertFalse(self.queued())
+
+
+class RefreshRecommendationsViewTests(RecommendationTestMixin, TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username='rec', password='pass')
+        self.recruiter.profile.user_type = 'recruiter'
+        self.recruiter.profile.save()
+        self.create_candidates()
+        self.job = self.create_job()
+        self.client.login(username='rec', password='pass')
+
+    def test_refresh_is_queued_and_shown_as_progress(self):
+        url = reverse('recommendations:refresh_recommendations', args=[self.job.pk])
+        response = self.client.post(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 202)
+        self.client.post(url)
+        refreshes = Task.objects.filter(name=refresh_job_recommendations.task_name)
+        self.assertEqual(refreshes.filter(status='pending').count(), 1)
+        self.assertFalse(CandidateRecommendation.objects.exists())
+
+        page = self.client.get(reverse('recommendations:job_recommendations', args=[self.job.pk]))
+        self.assertContains(page, 'id="refresh-progress"')
+
+        run_worker(once=True)
+        task = refreshes.get()
+        self.assertEqual((task.status, task.result), ('done', {'recommendations': 3}))
+        page = self.client.get(reverse('recommendations:job_recommendations', args=[self.job.pk]))
+        self.assertNotContains(page, 'id="refresh-progress"')
+
+
+class RebuildRecommendationsTests(RecommendationTestMixin, TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username='rec', password='pass')
+        self.create_candidates()
+
+    def test_batch_rebuild_matches_per_job_generation(self):
+        jobs = [
+            self.create_job(),
+            self.create_job(title='Go Developer', skills_required='Go, Rust', requirements='',
+                            location='Remote', is_remote=True, experience_level='executive'),
+            self.create_job(title='Office Manager', skills_required='', requirements='',
+                            description='', location='Savannah, GA', experience_level='entry'),
+        ]
+        Application.objects.create(job=jobs[0], applicant=User.objects.get(username='carol'))
+        expected = {}
+        for job in jobs:
+            generate_recommendations_for_job(job, limit=0)
+            expected[job.pk] = set(CandidateRecommendation.objects.filter(job=job)
+                                   .values_list('candidate__username', 'match_score'))
+        CandidateRecommendation.objects.all().delete()
+
+        self.assertEqual(rebuild_all_recommendations(workers=1, chunk_size=2)[0], 3)
+        for job in jobs:
+            self.assertEqual(set(CandidateRecommendation.objects.filter(job=job)
+                                 .values_list('candidate__username', 'match_score')),
+                             expected[job.pk])
+        self.assertNotIn('carol', {name for name, _ in expected[jobs[0].pk]})
+
+
+class SkillDictionaryTests(TestCase):
+    def setUp(self):
+        self.dictionary = SkillDictionary.parse([
+            '# comment', 'python = python3', 'c++', '!go = golang', 'machine learning = ml',
+            'react = reactjs, react.js', '.net = dotnet',
+        ])
+
+    def test_finds_whole_word_terms_in_one_pass(self):
+        text = ('Senior engineer: Python3 and C++ services, some ReactJS;\n'
+                'Machine   Learning pipelines on .NET. Go-getters welcome, golang a plus. Pythonista? HTML')
+        self.assertEqual(self.dictionary.find(text),
+                         {'python', 'c++', 'react', 'machine learning', '.net', 'go'})
+        self.assertEqual(self.dictionary.find('Let us go to the mall and talk about html'), set())
+
+    def test_canonical_names_for_listed_skills(self):
+        self.assertEqual(self.dictionary.canonical('golang'), 'go')
+        self.assertEqual(self.dictionary.canonical('go'), 'go')
+        self.assertEqual(self.dictionary.canonical('cobol'), 'cobol')
+
+    def test_dictionary_file_is_reloaded_when_it_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'skills.txt')
+            with open(path, 'w') as fh:
+                fh.write('python\n')
+            with override_settings(SKILL_DICTIONARY_PATH=path):
+                self.assertEqual(find_skills_in_text('Python and Rust'), {'python'})
+                with open(path, 'w') as fh:
+                    fh.write('python\nrust\n')
+                os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+                with mock.patch('jobby.skills.RELOAD_CHECK_INTERVAL', 0):
+                    self.assertEqual(find_skills_in_text('Python and Rust'), {'python', 'rust'})
+
+    def test_descriptions_no_longer_turn_into_skills(self):
+        job = Job(skills_required='Python', requirements='3+ years of Django experience',
+                  description='You will build REST APIs, with Postgres, in a friendly team.')
+        self.assertEqual(get_job_skills(job), {'python', 'django', 'rest', 'postgresql'})
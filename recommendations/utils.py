@@ -1,28 +1,21 @@
 """
 Utility functions for candidate recommendation algorithm.
 """
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
 from profiles.models import Profile, Skill, WorkExperience, Education, Project
 from jobs.models import Job
 from applications.models import Application
-import re
+from jobby.skills import canonical_skill, extract_skills_from_text, find_skills_in_text
 
+# Weights of the component scores in the overall match score
+SKILLS_WEIGHT = 0.5
+EXPERIENCE_WEIGHT = 0.3
+LOCATION_WEIGHT = 0.2
 
-def normalize_skill(skill):
-    """Normalize skill name for comparison."""
-    return skill.strip().lower()
-
-
-def extract_skills_from_text(text):
-    """Extract skills from text (comma-separated or space-separated)."""
-    if not text:
-        return []
-    
-    # Split by comma or newline
-    skills = re.split(r'[,;\n]', text)
-    # Clean and normalize
-    skills = [normalize_skill(s) for s in skills if s.strip()]
-    return skills
+# Candidates scoring below this are not recommended
+MIN_MATCH_SCORE = 30
 
 
 def get_candidate_skills(candidate_profile):
@@ -31,7 +24,7 @@ def get_candidate_skills(candidate_profile):
     
     # From Skill model
     for skill in candidate_profile.skills.all():
-        skills.add(normalize_skill(skill.name))
+        skills.add(canonical_skill(skill.name))
     
     # From skills_text field
     if candidate_profile.skills_text:
@@ -47,29 +40,32 @@ def get_candidate_skills(candidate_profile):
     # From work experience descriptions
     for exp in candidate_profile.work_experience.all():
         if exp.description:
-            # Try to extract common tech terms
-            desc_skills = extract_skills_from_text(exp.description)
-            skills.update(desc_skills)
+            skills.update(find_skills_in_text(exp.description))
     
     return skills
 
 
-def calculate_skills_match(job, candidate_profile):
-    """Calculate skills match score between job and candidate."""
+def get_job_skills(job):
+    """Get the set of skills a job asks for."""
     job_skills = set()
     
     # Get required skills from job
     if job.skills_required:
         job_skills = set(extract_skills_from_text(job.skills_required))
     
-    # Also extract from requirements and description
+    # Also extract the dictionary skills mentioned in requirements and description
     if job.requirements:
-        req_skills = extract_skills_from_text(job.requirements)
-        job_skills.update(req_skills)
+        job_skills.update(find_skills_in_text(job.requirements))
     
     if job.description:
-        desc_skills = extract_skills_from_text(job.description)
-        job_skills.update(desc_skills)
+        job_skills.update(find_skills_in_text(job.description))
+    
+    return job_skills
+
+
+def calculate_skills_match(job, candidate_profile):
+    """Calculate skills match score between job and candidate."""
+    job_skills = get_job_skills(job)
     
     if not job_skills:
         return 0.0
@@ -86,47 +82,52 @@ def calculate_skills_match(job, candidate_profile):
     return min(match_percentage, 100.0)
 
 
-def calculate_experience_match(job, candidate_profile):
-    """Calculate experience level match."""
-    # Map experience levels to numeric values
-    experience_map = {
-        'entry': 1,
-        'mid': 2,
-        'senior': 3,
-        'executive': 4,
-    }
-    
-    job_level = experience_map.get(job.experience_level, 2)
-    
-    # Calculate candidate experience based on work experience
+# Map experience levels to numeric values
+EXPERIENCE_LEVELS = {
+    'entry': 1,
+    'mid': 2,
+    'senior': 3,
+    'executive': 4,
+}
+
+# Experience score by distance between job and candidate level
+LEVEL_DIFF_SCORES = (100.0, 75.0, 50.0, 25.0)
+
+
+def get_experience_years(work_experiences):
+    """Total years across work experience entries (ongoing ones count until today)."""
+    from datetime import date
     total_years = 0
-    for exp in candidate_profile.work_experience.all():
-        from datetime import date
+    for exp in work_experiences:
         start = exp.start_date
         end = exp.end_date if exp.end_date else date.today()
         years = (end - start).days / 365.25
         total_years += years
-    
-    # Map years to experience level
+    return total_years
+
+
+def years_to_level(total_years):
+    """Map years of experience to an experience level."""
     if total_years < 2:
-        candidate_level = 1  # entry
+        return 1  # entry
     elif total_years < 5:
-        candidate_level = 2  # mid
+        return 2  # mid
     elif total_years < 10:
-        candidate_level = 3  # senior
-    else:
-        candidate_level = 4  # executive
+        return 3  # senior
+    return 4  # executive
+
+
+def calculate_experience_match(job, candidate_profile):
+    """Calculate experience level match."""
+    job_level = EXPERIENCE_LEVELS.get(job.experience_level, 2)
+    
+    # Calculate candidate experience based on work experience
+    total_years = get_experience_years(candidate_profile.work_experience.all())
+    candidate_level = years_to_level(total_years)
     
     # Calculate match score
     level_diff = abs(job_level - candidate_level)
-    if level_diff == 0:
-        return 100.0
-    elif level_diff == 1:
-        return 75.0
-    elif level_diff == 2:
-        return 50.0
-    else:
-        return 25.0
+    return LEVEL_DIFF_SCORES[min(level_diff, 3)]
 
 
 def calculate_location_match(job, candidate_profile):
@@ -175,35 +176,43 @@ def calculate_overall_match_score(job, candidate_profile):
     # Weighted average
     # Skills: 50%, Experience: 30%, Location: 20%
     overall_score = (
-        skills_score * 0.5 +
-        experience_score * 0.3 +
-        location_score * 0.2
+        skills_score * SKILLS_WEIGHT +
+        experience_score * EXPERIENCE_WEIGHT +
+        location_score * LOCATION_WEIGHT
     )
     
     return round(overall_score, 2)
 
 
-def generate_recommendations_for_job(job, limit=20, exclude_applied=True):
+def visible_candidates():
+    """Job seeker profiles that are visible to recruiters."""
+    return Profile.objects.filter(
+        user_type='regular'
+    ).filter(
+        Q(profile_visibility='public') | Q(profile_visibility='recruiters')
+    )
+
+
+def generate_recommendations_for_job(job, limit=20, exclude_applied=True, min_score=MIN_MATCH_SCORE,
+                                     progress=None):
     """
     Generate candidate recommendations for a job.
     
+    Only candidates sharing at least one indexed skill with the job (and
+    enough of them to possibly reach ``min_score``) are scored; jobs that
+    list no skills are scored against every visible candidate.
+    
     Args:
         job: Job instance
         limit: Maximum number of recommendations to return
         exclude_applied: Whether to exclude candidates who already applied
+        min_score: Lowest overall score that is recommended
+        progress: Optional ``progress(percent, message)`` callback
     
     Returns:
         List of CandidateRecommendation objects
     """
-    from .models import CandidateRecommendation
-    from django.utils import timezone
-    
-    # Get all job seeker profiles that are visible to recruiters
-    candidate_profiles = Profile.objects.filter(
-        user_type='regular'
-    ).filter(
-        Q(profile_visibility='public') | Q(profile_visibility='recruiters')
-    ).select_related('user').prefetch_related('skills', 'work_experience', 'education', 'projects')
+    candidate_profiles = visible_candidates()
     
     # Exclude candidates who already applied
     if exclude_applied:
@@ -212,54 +221,119 @@ def generate_recommendations_for_job(job, limit=20, exclude_applied=True):
         ).values_list('applicant_id', flat=True)
         candidate_profiles = candidate_profiles.exclude(user_id__in=applied_candidate_ids)
     
-    # Calculate match scores for each candidate
-    recommendations = []
-    for profile in candidate_profiles:
-        # Skip if no skills or experience
-        if not profile.skills.exists() and not profile.skills_text:
-            continue
-        
-        # Calculate scores
-        skills_score = calculate_skills_match(job, profile)
-        experience_score = calculate_experience_match(job, profile)
-        location_score = calculate_location_match(job, profile)
-        overall_score = calculate_overall_match_score(job, profile)
-        
-        # Only recommend if match score is above threshold (e.g., 30%)
-        if overall_score < 30:
-            continue
-        
-        # Get or create recommendation
-        recommendation, created = CandidateRecommendation.objects.get_or_create(
+    progress = progress or (lambda percent, message='': None)
+    
+    # Narrow the pool through the skill index
+    from .skill_index import candidates_sharing_skills
+    job_skills = get_job_skills(job)
+    if job_skills:
+        sharing = candidates_sharing_skills(job, job_skills, min_score)
+        if sharing is None:
+            candidate_profiles = candidate_profiles.none()
+        else:
+            candidate_profiles = candidate_profiles.filter(pk__in=sharing)
+    
+    # Score the remaining candidates in one vectorized pass over their
+    # materialized features
+    from .features import load_candidate_features
+    from .scoring import CandidateMatrix
+    progress(10, 'Loading candidates')
+    matrix = CandidateMatrix(load_candidate_features(candidate_profiles))
+    progress(60, f'Scoring {len(matrix)} candidates')
+    scores = matrix.score_job(job, min_score=min_score, job_skills=job_skills)
+    progress(80, f'Saving {len(scores)} recommendations')
+    
+    return save_recommendations(job, matrix, scores, limit=limit)
+
+
+# Columns refreshed when a recommendation is recomputed; recruiter-owned
+# fields (status, is_favorite, recruiter_notes, viewed_*) are left alone.
+RECOMPUTED_FIELDS = [
+    'candidate_profile', 'match_score', 'skills_match_score',
+    'experience_match_score', 'location_match_score', 'last_updated',
+]
+
+
+def save_recommendations(job, matrix, scores, limit=20):
+    """
+    Persist the scores of one job with a set-based upsert.
+    
+    Qualifying candidates are written with a single INSERT ... ON CONFLICT
+    (job, candidate) DO UPDATE (batched only by the backend's parameter
+    limit), and untouched recommendations that fell below the threshold
+    are deleted in one statement. Rows a recruiter has acted on (favorite,
+    notes, contacted/applied/dismissed) are never deleted, and neither are
+    rows of candidates who were not scored because they already applied.
+    
+    Returns the top ``limit`` CandidateRecommendation objects (none, and no
+    query for them, with ``limit=0``).
+    """
+    from .models import CandidateRecommendation
+    
+    started = timezone.now()
+    objs = [
+        CandidateRecommendation(
             job=job,
-            candidate=profile.user,
-            defaults={
-                'candidate_profile': profile,
-                'match_score': overall_score,
-                'skills_match_score': skills_score,
-                'experience_match_score': experience_score,
-                'location_match_score': location_score,
-                'status': 'new',
-            }
+            candidate_id=int(matrix.user_ids[row]),
+            candidate_profile_id=int(matrix.profile_ids[row]),
+            match_score=round(float(scores.overall[i]), 2),
+            skills_match_score=float(scores.skills[i]),
+            experience_match_score=float(scores.experience[i]),
+            location_match_score=float(scores.location[i]),
+            status='new',
         )
-        
-        # Update if not new
-        if not created:
-            recommendation.match_score = overall_score
-            recommendation.skills_match_score = skills_score
-            recommendation.experience_match_score = experience_score
-            recommendation.location_match_score = location_score
-            recommendation.last_updated = timezone.now()
-            recommendation.save()
-        
-        recommendations.append(recommendation)
-    
-    # Sort by match score and return top candidates
-    recommendations.sort(key=lambda x: x.match_score, reverse=True)
-    return recommendations[:limit]
-
-
-def refresh_recommendations_for_job(job):
+        for i, row in enumerate(scores.rows)
+    ]
+    
+    # No savepoint when called inside a transaction (rescores, tests): both
+    # statements succeed or the caller's transaction rolls back anyway
+    with transaction.atomic(savepoint=False):
+        upsert_recommendations(objs)
+        delete_stale_recommendations(started, job=job)
+    
+    if not limit:
+        return []
+    top_candidates = [int(matrix.user_ids[row]) for row in scores.rows[:limit]]
+    return list(
+        CandidateRecommendation.objects.filter(job=job, candidate_id__in=top_candidates)
+        .select_related('candidate', 'candidate_profile')
+        .order_by('-match_score', '-recommended_at')
+    )
+
+
+def upsert_recommendations(objs):
+    """Insert new recommendations and refresh the scores of existing ones."""
+    from .models import CandidateRecommendation
+    
+    if objs:
+        CandidateRecommendation.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=['job', 'candidate'],
+            update_fields=RECOMPUTED_FIELDS,
+        )
+
+
+def delete_stale_recommendations(started, **lookup):
+    """
+    Delete recommendations matching ``lookup`` that were not refreshed since
+    ``started``, keeping the ones a recruiter acted on and those of
+    candidates who applied in the meantime.
+    """
+    from .models import CandidateRecommendation
+    
+    CandidateRecommendation.objects.filter(
+        last_updated__lt=started,
+        status__in=['new', 'viewed'],
+        is_favorite=False,
+        recruiter_notes='',
+        **lookup,
+    ).exclude(
+        Exists(Application.objects.filter(job=OuterRef('job'), applicant=OuterRef('candidate')))
+    ).delete()
+
+
+def refresh_recommendations_for_job(job, progress=None):
     """Refresh recommendations for a specific job."""
-    return generate_recommendations_for_job(job, limit=50)
+    return generate_recommendations_for_job(job, limit=50, progress=progress)
 
@@ -1,4 +1,5 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
@@ -8,10 +9,14 @@ from django.views.decorators.http import require_POST
 from django.utils import timezone
 
 from jobs.models import Job
+from monitoring.decorators import query_budget
 from .models import CandidateRecommendation
-from .utils import generate_recommendations_for_job, refresh_recommendations_for_job
+from tasks.models import Task
+from tasks.registry import dedupe_key
+from .tasks import refresh_job_recommendations
 
 
+@query_budget(10)
 @login_required
 def job_recommendations(request, job_id):
     """View to show candidate recommendations for a specific job."""
@@ -25,7 +30,9 @@ def job_recommendations(request, job_id):
     # Get recommendations for this job
     recommendations = CandidateRecommendation.objects.filter(
         job=job
-    ).select_related('candidate', 'candidate_profile').order_by('-match_score', '-recommended_at')
+    ).select_related('candidate', 'candidate_profile').prefetch_related(
+        'candidate_profile__skills'
+    ).order_by('-match_score', '-recommended_at')
     
     # Filter by status if provided
     status_filter = request.GET.get('status', '')
@@ -47,8 +54,15 @@ def job_recommendations(request, job_id):
     page_number = request.GET.get('page')
     recommendations_page = paginator.get_page(page_number)
     
+    # A queued or running refresh of this job, shown as a progress bar
+    refresh_task = Task.objects.filter(
+        dedupe_key=dedupe_key(refresh_job_recommendations.task_name, [job.id]),
+        status__in=['pending', 'running'],
+    ).order_by('-created_at').first()
+    
     context = {
         'job': job,
+        'refresh_task': refresh_task,
         'recommendations': recommendations_page,
         'status_filter': status_filter,
         'search_query': search_query,
@@ -126,13 +140,17 @@ def refresh_recommendations(request, job_id):
     
     job = get_object_or_404(Job, id=job_id, posted_by=request.user)
     
-    try:
-        recommendations = refresh_recommendations_for_job(job)
-        messages.success(request, f'Generated {len(recommendations)} new candidate recommendations!')
-        return redirect('recommendations:job_recommendations', job_id=job_id)
-    except Exception as e:
-        messages.error(request, f'Failed to refresh recommendations: {str(e)}')
-        return redirect('recommendations:job_recommendations', job_id=job_id)
+    # Scoring a large candidate pool can outlive the request; run_worker does it
+    task = refresh_job_recommendations.enqueue(job.id, owner=request.user)
+    
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse({
+            'task_id': task.pk,
+            'status_url': reverse('tasks:status', args=[task.pk]),
+        }, status=202)
+    
+    messages.info(request, 'Refreshing recommendations in the background. This page updates when done.')
+    return redirect('recommendations:job_recommendations', job_id=job_id)
 
 
 @login_required
@@ -84,3 +84,66 @@ class SavedSearchTests(TestCase):
 		
 		# Verify search was deleted
 		self.assertEqual(SavedSearch.objects.filter(id=search.id).count(), 0)
+
+
+class CandidateMapDataTests(TestCase):
+	def setUp(self):
+		self.recruiter = User.objects.create_user(username='recruiter', password='pass')
+		self.recruiter.profile.user_type = 'recruiter'
+		self.recruiter.profile.save()
+		self.profiles = []
+		for username, first, headline, skills, lat in [('ann', 'Ann', 'Engineer', 'Python, SQL', 40.0),
+		                                               ('bob', '', 'Engineer', 'ReactJS', 41.0),
+		                                               ('cat', 'Cat', '', 'Python', None)]:
+			profile = User.objects.create_user(username=username, password='pw', first_name=first).profile
+			profile.headline, profile.skills_text = headline, skills
+			profile.latitude, profile.longitude = lat, -74.0 if lat else None
+			profile.save()
+			self.profiles.append(profile)
+		self.client.login(username='recruiter', password='pass')
+
+	def get(self, **extra):
+		return self.client.get('/recruiter/api/map-data/', **extra)
+
+	def test_columnar_payload(self):
+		data = self.get().json()
+		ann, bob = self.profiles[:2]
+		self.assertEqual(data['ids'], [ann.pk, bob.pk])
+		self.assertEqual(data['lats'], [40.0, 41.0])
+		self.assertEqual([data['strings'][i] for i in data['name_idx']], ['Ann', 'bob'])
+		self.assertEqual(data['headline_idx'][0], data['headline_idx'][1])
+		self.assertEqual(data['profile_url'], '/profiles/profile/0/')
+
+	def test_skill_filter_uses_the_index(self):
+		self.assertEqual(self.client.get('/recruiter/api/map-data/', {'skill': 'python'}).json()['ids'],
+		                 [self.profiles[0].pk])
+		self.assertEqual(self.client.get('/recruiter/api/map-data/', {'skill': 'react'}).json()['ids'],
+		                 [self.profiles[1].pk])
+
+	def test_gzip_and_conditional_get(self):
+		for n in range(20):  # tiny bodies are not worth compressing
+			profile = User.objects.create_user(username=f'user{n}', password='pw').profile
+			profile.latitude, profile.longitude = 40 + n / 100, -74.0
+			profile.save()
+		response = self.get(HTTP_ACCEPT_ENCODING='gzip')
+		self.assertEqual(response['Content-Encoding'], 'gzip')
+		etag = response['ETag']
+		self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+		self.profiles[1].headline = 'Designer'
+		self.profiles[1].save()
+		self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+	def test_renaming_a_candidate_changes_the_etag(self):
+		etag = self.get()['ETag']
+		user = self.profiles[0].user
+		user.first_name = 'Annie'
+		user.save()
+		response = self.get(HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(response.status_code, 200)
+		data = response.json()
+		self.assertEqual(data['strings'][data['name_idx'][0]], 'Annie')
+
+	def test_job_seekers_are_refused(self):
+		self.client.login(username='ann', password='pw')
+		self.assertEqual(self.get().status_code, 403)
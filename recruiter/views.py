@@ -11,9 +11,18 @@ from django.db import transaction
 from applications.models import Application
 from .models import Stage, CandidateCard, SavedSearch
 from jobs.models import Job
-from django.core.serializers.json import DjangoJSONEncoder
+from monitoring.decorators import query_budget
+from recommendations.models import CandidateSkill
+from recommendations.skill_index import filter_candidates_by_skills
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.gzip import gzip_page
 import json
 
+# Candidates shown on the recruiter map
+MAP_CANDIDATES = models.Q(user_type='regular', latitude__isnull=False, longitude__isnull=False)
+
 @login_required
 def recruiter_dashboard(request):
     """Dashboard view for recruiters."""
@@ -25,7 +34,8 @@ def recruiter_dashboard(request):
     return render(request, 'recruiter/recruiter_dashboard.html', {'template_data': template_data})
 
 
-@login_required  
+@query_budget(12)
+@login_required
 def candidate_search(request):
     """Search view for recruiters to find candidates."""
     if not hasattr(request.user, 'profile') or request.user.profile.user_type != 'recruiter':
@@ -144,7 +154,7 @@ def kanban_board(request, job_id=None):
         stages = list(Stage.objects.filter(job=job).order_by('order'))
 
     # Ensure each application has a CandidateCard. If not, place by application.status mapping.
-    apps = Application.objects.filter(job=job).select_related('applicant')
+    apps = Application.objects.filter(job=job, kanban_card__isnull=True)
     # mapping from application.status to stage name heuristically
     status_map = {
         'applied': 'Applied',
@@ -156,12 +166,11 @@ def kanban_board(request, job_id=None):
 
     stage_by_name = {s.name: s for s in stages}
     for app in apps:
-        if not hasattr(app, 'kanban_card'):
-            stage_name = status_map.get(app.status, 'Applied')
-            stage = stage_by_name.get(stage_name, stages[0])
-            # determine next order
-            next_order = (CandidateCard.objects.filter(stage=stage).aggregate(models.Max('order'))['order__max'] or 0) + 1
-            CandidateCard.objects.create(application=app, stage=stage, order=next_order)
+        stage_name = status_map.get(app.status, 'Applied')
+        stage = stage_by_name.get(stage_name, stages[0])
+        # determine next order
+        next_order = (CandidateCard.objects.filter(stage=stage).aggregate(models.Max('order'))['order__max'] or 0) + 1
+        CandidateCard.objects.create(application=app, stage=stage, order=next_order)
 
     # Reload stages with cards
     stages = Stage.objects.filter(job=job).order_by('order').prefetch_related('cards__application__applicant')
@@ -318,33 +327,64 @@ def candidate_map(request):
     }
     return render(request, 'recruiter/candidate_map.html', context)
 
+def candidate_map_etag(skills=''):
+    """Changes whenever a geocoded candidate (or, with ``skills``, the skill index) does.
+
+    Renaming a user bumps the profile's ``updated_at`` (accounts.signals).
+    """
+    stats = Profile.objects.filter(MAP_CANDIDATES).aggregate(count=models.Count('id'), updated=models.Max('updated_at'))
+    updated = stats['updated'].timestamp() if stats['updated'] else 0
+    tag = f'{stats["count"]}-{updated:.6f}'
+    if skills:
+        index = CandidateSkill.objects.aggregate(count=models.Count('id'), last=models.Max('id'))
+        tag += f'-{index["count"]}-{index["last"]}'
+    return quote_etag(tag)
+
+
+@query_budget(6)
 @login_required
+@gzip_page
 def candidate_map_data(request):
-    """Return JSON data of candidate locations."""
+    """Return candidate locations as parallel arrays.
+
+    ``ids``, ``lats`` and ``lngs`` hold one entry per candidate;
+    ``name_idx`` and ``headline_idx`` point into the shared ``strings``
+    table, and ``profile_url`` has a ``0`` to replace with the id. An
+    optional ``skill`` (comma separated) is matched through the
+    CandidateSkill index. Responses are gzipped and carry an ETag.
+    """
     if not hasattr(request.user, 'profile') or request.user.profile.user_type != 'recruiter':
         return JsonResponse({'error': 'Access denied'}, status=403)
 
-    # Get candidates with valid coordinates
-    candidates = Profile.objects.filter(
-        user_type='regular',
-        latitude__isnull=False,
-        longitude__isnull=False
-    ).select_related('user')
+    skill_query = request.GET.get('skill', '').strip()
+    etag = candidate_map_etag(skill_query)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
 
-    # Optional: Filter by skills if query param exists
-    skill_query = request.GET.get('skill')
+    candidates = Profile.objects.filter(MAP_CANDIDATES)
     if skill_query:
-        candidates = candidates.filter(skills_text__icontains=skill_query)
-
-    data = []
-    for profile in candidates:
-        data.append({
-            'id': profile.id,
-            'name': profile.user.get_full_name() or profile.user.username,
-            'headline': profile.headline,
-            'lat': profile.latitude,
-            'lng': profile.longitude,
-            'url': f"/profiles/profile/{profile.id}/" # Hardcoded based on urls.py
-        })
-
-    return JsonResponse({'candidates': data}, encoder=DjangoJSONEncoder)
\ No newline at end of file
+        candidates = filter_candidates_by_skills(candidates, skill_query)
+
+    strings = {}
+    columns = {'ids': [], 'lats': [], 'lngs': [], 'name_idx': [], 'headline_idx': []}
+    rows = candidates.order_by('pk').values_list(
+        'id', 'latitude', 'longitude', 'headline', 'user__first_name', 'user__last_name', 'user__username',
+    )
+    for pk, lat, lng, headline, first_name, last_name, username in rows.iterator(chunk_size=2000):
+        name = f'{first_name} {last_name}'.strip() or username
+        columns['ids'].append(pk)
+        # 5 decimals is about a metre
+        columns['lats'].append(round(lat, 5))
+        columns['lngs'].append(round(lng, 5))
+        columns['name_idx'].append(strings.setdefault(name, len(strings)))
+        columns['headline_idx'].append(strings.setdefault(headline, len(strings)))
+
+    response = JsonResponse({
+        'profile_url': reverse('profiles:profile_detail', args=[0]),
+        'strings': list(strings),
+        **columns,
+    }, json_dumps_params={'separators': (',', ':')})
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
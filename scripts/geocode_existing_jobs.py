@@ -13,6 +13,8 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'jobby.settings')
 django.setup()
 
 from jobs.models import Job
+from geocoding.backends import GeocoderError
+from geocoding.services import cached_coordinates, geocode
 
 def geocode_existing_jobs():
     """Geocode all non-remote jobs that don't have coordinates."""
@@ -36,46 +38,28 @@ def geocode_existing_jobs():
     success_count = 0
     fail_count = 0
     
-    import time
-    
     for i, job in enumerate(jobs_to_geocode, 1):
         print(f"\n[{i}/{total}] Processing: {job.title} at {job.company_name}")
         print(f"  Location: {job.location}")
         print(f"  Is Remote: {job.is_remote}")
         
-        # Add delay to respect Nominatim usage policy (max 1 request per second)
-        if i > 1:
-            print("  Waiting 1 second...")
-            time.sleep(1)
-        
-        # Save the job, which will trigger geocoding
-        old_lat = job.latitude
-        old_lon = job.longitude
+        # Shared cache first; the backend spaces out its own Nominatim requests
+        hit, coords = cached_coordinates(job.location)
+        if not hit:
+            try:
+                coords = geocode(job.location)
+            except GeocoderError as e:
+                print(f"  ✗ Error: {e}")
+                fail_count += 1
+                continue
         
-        try:
+        if coords:
+            job.latitude, job.longitude = coords
             job.save()
-            
-            if job.latitude and job.longitude:
-                print(f"  ✓ Geocoded to: ({job.latitude}, {job.longitude})")
-                success_count += 1
-            else:
-                print(f"  ✗ Failed to geocode (no results from geocoding service)")
-                # Try manual geocoding to debug
-                print(f"  Attempting manual geocode test...")
-                coords = job._geocode_location(job.location)
-                if coords:
-                    print(f"  Manual geocode returned: {coords}")
-                    job.latitude, job.longitude = coords
-                    job.save()
-                    print(f"  ✓ Successfully geocoded on retry")
-                    success_count += 1
-                else:
-                    print(f"  ✗ Manual geocode also failed")
-                    fail_count += 1
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-            import traceback
-            traceback.print_exc()
+            print(f"  ✓ Geocoded to: ({job.latitude}, {job.longitude}){' [cached]' if hit else ''}")
+            success_count += 1
+        else:
+            print(f"  ✗ Failed to geocode (no results from geocoding service)")
             fail_count += 1
     
     print(f"\n{'='*60}")
@@ -1,9 +1,5 @@
 import os
 import sys
-import time
-import urllib.request
-import urllib.parse
-import json
 
 # Bootstrap Django
 PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
@@ -15,22 +11,19 @@ import django
 django.setup()
 
 from jobs.models import Job
-
-NOMINATIM = 'https://nominatim.openstreetmap.org/search?format=json&limit=1&q='
+from geocoding.backends import GeocoderError
+from geocoding.services import cached_coordinates, geocode
 
 def geocode_location(location):
+    """Resolve through the shared geocode cache, then the configured backend."""
     if not location:
         return None
-    url = NOMINATIM + urllib.parse.quote(location)
-    headers = { 'User-Agent': 'JobbyGeocoder/1.0 (your-email@example.com)' }
-    req = urllib.request.Request(url, headers=headers)
+    hit, coords = cached_coordinates(location)
+    if hit:
+        return coords
     try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = resp.read().decode('utf-8')
-            arr = json.loads(data)
-            if arr:
-                return float(arr[0]['lat']), float(arr[0]['lon'])
-    except Exception as e:
+        return geocode(location)
+    except GeocoderError as e:
         print('Geocode error for', location, ':', e)
     return None
 
@@ -51,8 +44,6 @@ def main():
             print('  Saved coords:', coords)
         else:
             print('  No coords found')
-        # Be polite to Nominatim: 1 second between requests
-        time.sleep(1)
     print('Done. Updated', updated, 'jobs.')
 
 if __name__ == '__main__':
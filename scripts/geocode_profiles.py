@@ -1,10 +1,5 @@
 import os
 import sys
-import time
-import json
-import urllib.request
-import urllib.parse
-import ssl
 import django
 
 # 1. Setup Django environment
@@ -14,38 +9,22 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'jobby.settings')
 django.setup()
 
 from profiles.models import Profile
+from geocoding.backends import GeocoderError
+from geocoding.services import cached_coordinates, geocode
 
 def direct_geocode(location):
-    """Geocode function defined directly in the script to ensure it runs."""
-    print(f"  > Querying Nominatim for: '{location}'")
+    """Resolve through the shared geocode cache, then the configured backend."""
+    print(f"  > Resolving: '{location}'")
     if not location:
         return None
-        
+
+    hit, coords = cached_coordinates(location)
+    if hit:
+        print("  > Answered from geocode cache.")
+        return coords
     try:
-        base = 'https://nominatim.openstreetmap.org/search?format=json&limit=1&q='
-        url = base + urllib.parse.quote(location)
-        # Use a descriptive User-Agent
-        headers = {'User-Agent': 'Jobby/1.0 (admin@jobby.example)'} 
-        req = urllib.request.Request(url, headers=headers)
-        
-        # Ignore SSL certificate errors for development
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        
-        with urllib.request.urlopen(req, timeout=10, context=ctx) as resp:
-            raw_data = resp.read().decode('utf-8')
-            # Print the raw response to debug API issues
-            print(f"  > API Response: {raw_data[:100]}...") 
-            
-            data = json.loads(raw_data)
-            if data:
-                lat = float(data[0]['lat'])
-                lon = float(data[0]['lon'])
-                return lat, lon
-            else:
-                print("  > API returned no results (empty list).")
-    except Exception as e:
+        return geocode(location)
+    except GeocoderError as e:
         print(f"  > Error during request: {e}")
     return None
 
@@ -68,9 +47,6 @@ def run():
                 Profile.objects.filter(pk=p.pk).update(latitude=lat, longitude=lon)
             else:
                 print("  > Failed to resolve coordinates.")
-            
-            # Sleep to be nice to the API
-            time.sleep(1.5)
         else:
             print(f"Skipping {p.user.username} (already has coordinates)")
 
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'progress', 'owner', 'created_at', 'finished_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'dedupe_key', 'error']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
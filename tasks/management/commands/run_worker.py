@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from tasks.registry import get_pollers
+from tasks.worker import run_worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks (recommendation refreshes and rescores) and geocoding lookups."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Number of tasks run in parallel, one thread each (default: 1)')
+        parser.add_argument('--once', action='store_true',
+                            help='Run the currently queued tasks and lookups, then exit')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Seconds to sleep when the queue is empty (default: 2)')
+        parser.add_argument('--poll-interval', type=float, default=10.0,
+                            help='Seconds between geocoding batches while tasks keep coming (default: 10)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Task worker started (concurrency {options['concurrency']}).")
+        try:
+            processed = run_worker(
+                concurrency=options['concurrency'],
+                once=options['once'],
+                interval=options['interval'],
+                on_finish=self.report,
+                pollers=get_pollers(),
+                poll_interval=options['poll_interval'],
+            )
+        except KeyboardInterrupt:
+            self.stdout.write("Task worker stopped.")
+            return
+        self.stdout.write(f"Processed {processed} task(s) and lookup(s).")
+
+    def report(self, task):
+        line = f"Task {task.pk} {task.name}: {task.status}"
+        if task.status == 'failed':
+            self.stdout.write(self.style.ERROR(line))
+        else:
+            self.stdout.write(line)
@@ -0,0 +1,82 @@
+from django.contrib.auth.models import User
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """A unit of background work run by ``manage.py run_worker``.
+
+    ``name`` is the registered name of a ``@task`` function and ``args`` its
+    JSON-serializable positional arguments. At most one *pending* task may
+    exist per ``dedupe_key`` (name plus arguments), so repeated requests for
+    the same work collapse into one queued task.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    dedupe_key = models.CharField(max_length=255)
+    owner = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL,
+                              related_name='tasks')
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Percent complete (0-100)")
+    progress_message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['dedupe_key', 'status']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'], condition=Q(status='pending'),
+                name='tasks_task_one_pending_per_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name}{tuple(self.args)} [{self.status}]"
+
+    @property
+    def is_finished(self):
+        return self.status in ('done', 'failed')
+
+    def set_progress(self, percent, message=''):
+        """Record progress from inside a running task (also renews its lease)."""
+        from .worker import CLAIM_LEASE
+
+        self.progress = max(0, min(int(percent), 100))
+        self.progress_message = message[:255]
+        self.claimed_until = timezone.now() + CLAIM_LEASE
+        Task.objects.filter(pk=self.pk, status='running').update(
+            progress=self.progress,
+            progress_message=self.progress_message,
+            claimed_until=self.claimed_until,
+        )
+
+    def as_dict(self):
+        return {
+            'id': self.pk,
+            'name': self.name,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.progress_message,
+            'result': self.result,
+            'error': self.error if self.status == 'failed' else '',
+        }
@@ -0,0 +1,81 @@
+"""
+Task registration and enqueueing.
+
+    from tasks.registry import task
+
+    @task
+    def rebuild_something(task, some_id):
+        task.set_progress(50, 'Halfway')
+        return {'done': True}
+
+    rebuild_something.enqueue(some_id, owner=request.user)
+
+Task functions receive the running ``Task`` row first, then the arguments
+they were enqueued with; whatever they return (JSON-serializable) is kept
+as the task result.
+
+Apps with a queue of their own (geocoding lookups) register a ``poller``
+instead: a callable that processes one batch of that queue and returns how
+many items it handled. ``manage.py run_worker`` calls it whenever no task
+is pending, so one worker process drains every queue.
+"""
+import json
+
+from django.db import IntegrityError, transaction
+
+_registry = {}
+_pollers = []
+
+
+class TaskNotRegistered(KeyError):
+    pass
+
+
+def task(func):
+    """Register ``func`` as a background task under ``module.name``."""
+    name = f'{func.__module__}.{func.__name__}'
+    _registry[name] = func
+    func.task_name = name
+    func.enqueue = lambda *args, owner=None: enqueue(name, *args, owner=owner)
+    return func
+
+
+def poller(func):
+    """Register ``func()`` as a queue for the worker to drain between tasks."""
+    if func not in _pollers:
+        _pollers.append(func)
+    return func
+
+
+def get_pollers():
+    return list(_pollers)
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise TaskNotRegistered(name) from None
+
+
+def dedupe_key(name, args):
+    return f'{name}:{json.dumps(list(args), sort_keys=True, separators=(",", ":"))}'[:255]
+
+
+def enqueue(name, *args, owner=None):
+    """Queue ``name(*args)`` unless an identical task is already pending.
+
+    Returns the new or the already pending Task.
+    """
+    from .models import Task
+
+    get_task(name)
+    key = dedupe_key(name, args)
+    try:
+        with transaction.atomic():
+            return Task.objects.create(name=name, args=list(args), dedupe_key=key, owner=owner)
+    except IntegrityError:
+        pending = Task.objects.filter(dedupe_key=key, status='pending').first()
+        if pending is None:  # picked up in the meantime; queue a fresh one
+            return Task.objects.create(name=name, args=list(args), dedupe_key=key, owner=owner)
+        return pending
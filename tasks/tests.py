@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Task
+from .registry import enqueue, task
+from .worker import claim_next, run_worker
+
+
+@task
+def add(task, a, b):
+    task.set_progress(50, 'Adding')
+    return a + b
+
+
+@task
+def explode(task):
+    raise ValueError('boom')
+
+
+class TaskQueueTests(TestCase):
+    def test_identical_pending_tasks_are_deduplicated(self):
+        first = add.enqueue(1, 2)
+        self.assertEqual(add.enqueue(1, 2).pk, first.pk)
+        self.assertNotEqual(add.enqueue(2, 1).pk, first.pk)
+
+        # Once it is running, the same work can be queued again
+        self.assertEqual(claim_next().pk, first.pk)
+        self.assertNotEqual(add.enqueue(1, 2).pk, first.pk)
+
+    def test_worker_records_results_and_errors(self):
+        ok = add.enqueue(2, 3)
+        failing = explode.enqueue()
+        self.assertEqual(run_worker(once=True), 2)
+
+        ok.refresh_from_db()
+        self.assertEqual((ok.status, ok.result, ok.progress), ('done', 5, 100))
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, 'failed')
+        self.assertIn('ValueError: boom', failing.error)
+
+    def test_abandoned_task_is_reclaimed_after_its_lease(self):
+        queued = add.enqueue(1, 1)
+        claim_next()
+        self.assertIsNone(claim_next())
+        Task.objects.update(claimed_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(claim_next().pk, queued.pk)
+
+    def test_pollers_are_drained_when_no_task_is_pending(self):
+        backlog = [3, 2]
+        calls = []
+
+        def drain():
+            calls.append(Task.objects.filter(status='pending').count())
+            return backlog.pop() if backlog else 0
+
+        add.enqueue(1, 2)
+        self.assertEqual(run_worker(once=True, pollers=[drain]), 1 + 2 + 3)
+        self.assertEqual(calls, [0, 0, 0])  # the task ran before the first poll
+
+    def test_pollers_also_run_while_tasks_keep_coming(self):
+        calls = []
+
+        def drain():
+            calls.append(Task.objects.filter(status='pending').count())
+            return 0
+
+        for n in range(3):
+            add.enqueue(n, n)
+        run_worker(once=True, pollers=[drain], poll_interval=0)
+        self.assertEqual(calls[:3], [3, 2, 1])
+
+    def test_unknown_task_names_are_rejected(self):
+        with self.assertRaises(KeyError):
+            enqueue('tasks.tests.missing')
+
+    def test_status_endpoint_is_limited_to_the_owner(self):
+        owner = User.objects.create_user(username='owner', password='pass')
+        User.objects.create_user(username='other', password='pass')
+        queued = add.enqueue(1, 2, owner=owner)
+        url = reverse('tasks:status', args=[queued.pk])
+
+        self.client.login(username='other', password='pass')
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.login(username='owner', password='pass')
+        data = self.client.get(url).json()
+        self.assertEqual((data['status'], data['progress']), ('pending', 0))
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'tasks'
+
+urlpatterns = [
+    path('<int:task_id>/', views.task_status, name='status'),
+]
@@ -0,0 +1,16 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from .models import Task
+
+
+@login_required
+@require_GET
+def task_status(request, task_id):
+    """Poll the status and progress of a task the user started."""
+    task = get_object_or_404(Task, pk=task_id)
+    if task.owner_id != request.user.pk and not request.user.is_staff:
+        return JsonResponse({'error': 'Access denied'}, status=403)
+    return JsonResponse(task.as_dict())
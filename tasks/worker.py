@@ -0,0 +1,140 @@
+"""
+Claiming and running queued tasks; driven by ``manage.py run_worker``.
+
+A worker claims a task with a conditional UPDATE (pending -> running), so
+several worker threads or processes can share the table without a broker.
+A claim is a lease: a task whose worker died is picked up again once
+``claimed_until`` has passed. Long tasks renew it through ``set_progress``.
+Other DB-backed queues (geocoding) claim with the same ``CLAIM_LEASE`` and
+are drained by the same loop through their registered pollers: whenever
+the task queue is empty, and every ``poll_interval`` seconds while it is
+not, so a steady stream of tasks cannot starve them. With
+``claim_tasks=False`` the loop runs the pollers alone (``geocode_worker``).
+"""
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.db import close_old_connections, connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Task
+from .registry import get_task
+
+# How long a claimed item stays invisible to other workers before it is
+# considered abandoned (worker crashed mid-run) and picked up again.
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def _claimable(now):
+    return Q(status='pending') | Q(status='running', claimed_until__lt=now)
+
+
+def claim_next():
+    """Lease the oldest runnable task, or return None when there is none."""
+    now = timezone.now()
+    candidates = Task.objects.filter(_claimable(now)).order_by('created_at').values_list('pk', flat=True)[:10]
+    for pk in candidates:
+        claimed = Task.objects.filter(_claimable(now), pk=pk).update(
+            status='running', claimed_until=now + CLAIM_LEASE, started_at=now,
+        )
+        if claimed:
+            return Task.objects.get(pk=pk)
+    return None
+
+
+def run_task(task):
+    """Run a claimed task and record its result or error."""
+    try:
+        result = get_task(task.name)(task, *task.args)
+    except Exception:
+        task.status = 'failed'
+        task.error = traceback.format_exc()
+    else:
+        task.status = 'done'
+        task.result = result
+        task.progress = 100
+    task.claimed_until = None
+    task.finished_at = timezone.now()
+    task.save(update_fields=[
+        'status', 'result', 'error', 'progress', 'progress_message', 'claimed_until', 'finished_at',
+    ])
+    return task
+
+
+def poll(pollers):
+    """Run one batch of every poller. Returns the number of items they handled."""
+    return sum(poller() or 0 for poller in pollers)
+
+
+def work(stop=None, once=False, interval=2.0, on_finish=None, pollers=(), poll_interval=10.0,
+         claim_tasks=True):
+    """Claim and run tasks until ``stop`` is set (or, with ``once``, the queues are empty).
+
+    ``pollers`` (see ``registry.poller``) run whenever no task is pending and
+    at least every ``poll_interval`` seconds in between tasks. Without
+    ``claim_tasks`` only the pollers run.
+    """
+    stop = stop or threading.Event()
+    processed = 0
+    last_poll = time.monotonic()
+    while not stop.is_set():
+        # Drop connections the database closed or that outlived CONN_MAX_AGE
+        # (not inside a transaction, as when tests drive the loop)
+        if not connection.in_atomic_block:
+            close_old_connections()
+        polled = None
+        if pollers and time.monotonic() - last_poll >= poll_interval:
+            polled = poll(pollers)
+        task = claim_next() if claim_tasks else None
+        if task is None and polled is None:
+            polled = poll(pollers)
+        if polled is not None:
+            last_poll = time.monotonic()
+            processed += polled
+        if task is None:
+            if polled:
+                continue
+            if once:
+                break
+            stop.wait(interval)
+            continue
+        run_task(task)
+        processed += 1
+        if on_finish:
+            on_finish(task)
+    return processed
+
+
+def run_worker(concurrency=1, once=False, interval=2.0, on_finish=None, pollers=(), poll_interval=10.0,
+               claim_tasks=True):
+    """Run ``concurrency`` worker loops; each thread uses its own DB connection."""
+    if concurrency <= 1:
+        return work(once=once, interval=interval, on_finish=on_finish, pollers=pollers,
+                    poll_interval=poll_interval, claim_tasks=claim_tasks)
+
+    stop = threading.Event()
+    counts = []
+
+    def loop():
+        try:
+            counts.append(work(stop, once, interval, on_finish, pollers, poll_interval, claim_tasks))
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=loop, name=f'task-worker-{i}', daemon=True)
+               for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=0.5)
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        raise
+    return sum(counts)